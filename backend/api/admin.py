@@ -1,9 +1,12 @@
 # api/admin.py
 from django.contrib import admin
-from .models import EmployeeProfile, Project, Task, AvailabilitySlot
+from .models import EmployeeProfile, Project, Task, AvailabilitySlot, Job, Skill, MemberSkill
 
 # This tells the admin site to show these models
 admin.site.register(EmployeeProfile)
 admin.site.register(Project)
 admin.site.register(Task)
-admin.site.register(AvailabilitySlot)
\ No newline at end of file
+admin.site.register(AvailabilitySlot)
+admin.site.register(Job)
+admin.site.register(Skill)
+admin.site.register(MemberSkill)
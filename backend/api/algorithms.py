@@ -1,22 +1,25 @@
 # api/algorithms.py
 
 # --- V2.0 IMPORTS ---
-from .models import Project, Task, EmployeeProfile, AvailabilitySlot
+from .models import Project, Task, EmployeeProfile, AvailabilitySlot, SyncCounter
 from django.contrib.auth.models import User
 from django.utils import timezone # For getting 'now()' when setting deadlines
+from django.db import transaction # V5.0: One atomic write per assignment run
 from .utils import DateCalculator # Our new business-aware date tool
-
-# --- V4.0 IMPORTS ---
-# We need these for our new dynamic workload query
-from django.db.models import Sum, F, FloatField, Q
-from django.db.models.functions import Coalesce
-# --- END V4.0 IMPORTS ---
+from .workload import workload_snapshot, record_bulk_task_changes
+from .cache import get_member_features
+from .etags import bump_etags
+from .skills import qualified_candidates, required_skill_names, skill_holders
+from .instrumentation import end_phase, start_phase # V5.0: Per-request phase timings
 
 import random
 import json
-from deap import base, creator, tools, algorithms
+import time as time_module # 'time' is taken by datetime.time below
+import numpy as np
+from deap import base, creator, tools
 from datetime import datetime, timedelta, time
 import math
+from bisect import bisect_right
 # Assuming DateCalculator and Project, Task, and UserProfile models are imported or accessible
 # from .models import Project, Task, UserProfile # Example import
 # from .utils import DateCalculator # Example import
@@ -25,21 +28,55 @@ import math
 MAX_STRIKES_ALLOWED = 5 
 DEADLINE_BUFFER_MULTIPLIER = 1.25 
 
-# NEW ALGORITHM WEIGHTS (from our discussion, tuned for balance)
-WEIGHT_WORKLOAD = 2        # Lower weight for workload cost, to avoid always picking the freest.
-WEIGHT_SKILL = 5           # High weight for skill mismatch cost, making skills very important.
-WEIGHT_PREFERENCE = 3      # Medium weight for preference mismatch cost.
-MAX_SKILL_LEVEL = 5        # Assuming skill levels are 0-5
-MAX_PREFERENCE_LEVEL = 5   # Assuming preference levels are 0-5
+# The SoSTA weights and skill/preference scales now live in scoring.py,
+# next to the vectorized cost engine that uses them.
+from .scoring import (
+    WEIGHT_WORKLOAD, WEIGHT_SKILL, WEIGHT_PREFERENCE,
+    MAX_SKILL_LEVEL, MAX_PREFERENCE_LEVEL,
+    CostMatrix, greedy_assign, optimal_assign, DEFAULT_MEMBER_HOUR_CAP,
+)
+
+# Solver modes accepted by run_weighted_task_assignment
+ASSIGNMENT_SOLVERS = ('greedy', 'optimal')
+
+# --- V5.0 BULK PERSISTENCE ---
+# The columns an assignment run writes, all in one bulk UPDATE
+ASSIGNMENT_FIELDS = ['assigned_to', 'status', 'progress', 'due_date', 'updated_at', 'sync_version']
+BULK_UPDATE_BATCH_SIZE = 500
+
+
+class AssignmentConflict(Exception):
+    """Raised (and rolled back) when a concurrent run already assigned some of our tasks."""
 # --- END V2.0 CONSTANTS ---
 
-def run_weighted_task_assignment(project_id):
+def choose_members(cost_matrix, hours, workloads, solver='greedy', member_hour_cap=None, candidates=None):
+    """
+    Runs the selected solver over a CostMatrix. 'workloads' is updated in place.
+    Returns [(member_index or None, cost or None)], one per task row.
+    'candidates' (skills.qualified_candidates) lets the greedy pass skip
+    members without any required skill; the whole-batch solve ignores it.
+    """
+    if solver == 'optimal':
+        # One whole-batch solve (min-cost flow, rounded and repaired; see scoring.py).
+        cap = DEFAULT_MEMBER_HOUR_CAP if member_hour_cap is None else member_hour_cap
+        print(f"[V5.0] Solving whole-batch assignment with a {cap:.1f}h cap per member...")
+        return optimal_assign(cost_matrix, hours, workloads, cap)
+    # Same semantics as before: tasks in database order, cheapest member
+    # wins (first one on ties), max_workload re-normalized after each pick.
+    return greedy_assign(cost_matrix, hours, workloads, candidates)
+
+
+def run_weighted_task_assignment(project_id, solver='greedy', member_hour_cap=None):
     """
     V4.0 - SoSTA/Weighted Scoring algorithm.
     - DYNAMIC WORKLOAD: Calculates 'remaining_workload' in real-time.
     - Filters out "fired" employees (>= 5 strikes).
     - Calculates and sets a business-aware deadline for tasks.
     - Uses a cost-based formula (Workload_cost + Skill_mismatch_cost + Preference_mismatch_cost).
+    - V5.0: The cost formula is evaluated as NumPy arrays (see scoring.py).
+    - V5.0: solver='optimal' solves the whole batch at once (an LP-rounding
+      heuristic over a min-cost flow, see scoring.optimal_assign),
+      keeping every member's remaining workload under 'member_hour_cap' hours.
     """
     
     print(f"--- RUNNING V4.0 TASK ASSIGNMENT for Project {project_id} ---")
@@ -47,9 +84,14 @@ def run_weighted_task_assignment(project_id):
     calculator = DateCalculator() # Instantiate our calculator utility once
 
     try:
+        start_phase('load')
         project = Project.objects.get(id=project_id)
         
         # 1. GET ALL DATA
+        # V5.0: Loading and scoring run OUTSIDE any transaction: on SQLite a
+        # transaction (IMMEDIATE, see database.py) holds the database-wide write
+        # lock, which would stall every other writer for the whole solve.
+        # A concurrent run is caught by the guarded write in step 5 instead.
         tasks = list(project.tasks.filter(assigned_to=None))
         
         # Fetch members with their profiles eagerly to avoid N+1 queries later
@@ -80,32 +122,9 @@ def run_weighted_task_assignment(project_id):
         
         eligible_member_ids = [m.id for m in eligible_members]
         
-        # This one query calculates the remaining work for ALL eligible members
-        # It groups all non-completed tasks by user and sums their remaining work
-        workload_data = Task.objects.filter(
-            assigned_to__id__in=eligible_member_ids,
-            progress__lt=100 # Only count tasks that are not 100% done
-        ).annotate(
-            # Calculate remaining work for *each* task: hours * (1 - progress_percent)
-            remaining_work_per_task=F('estimated_hours') * (1.0 - F('progress') / 100.0)
-        ).values(
-            'assigned_to' # Group by user
-        ).annotate(
-            # Sum the remaining work for that user
-            total_remaining_workload=Coalesce(
-                Sum('remaining_work_per_task', output_field=FloatField()), 
-                0.0 # Use Coalesce to turn NULL sums (no tasks) into 0.0
-            )
-        ).values(
-            'assigned_to', 'total_remaining_workload' # Select the user ID and their total
-        )
-        
-        # Create a lookup map for workloads: {member_id: remaining_workload}
-        # Start by defaulting everyone to 0.0
-        member_workloads = {member_id: 0.0 for member_id in eligible_member_ids}
-        # Then, fill in the calculated workloads from the query
-        for item in workload_data:
-            member_workloads[item['assigned_to']] = item['total_remaining_workload']
+        # V5.0: Read from the maintained workload ledger on the profiles we
+        # already loaded - no SUM over the task table (see workload.py)
+        member_workloads = {m.id: m.profile.remaining_workload for m in eligible_members}
 
         print(f"[V4.0] Calculated workloads: {member_workloads}")
 
@@ -115,144 +134,339 @@ def run_weighted_task_assignment(project_id):
         # --- END V4.0 WORKLOAD CALCULATION ---
 
 
-        # 2. THE GREEDY ASSIGNMENT LOGIC
-        for task in tasks:
-            task_data = task.task_data
-            required_skills = task_data.get('required_skills', []) # e.g., ['Python', 'Django']
-            task_category = task_data.get('category', '').lower() # e.g., 'backend', 'frontend'
-            
-            best_member = None
-            lowest_cost = float('inf')
-
-            # 3. THE SCORING ALGORITHM
-            for member in eligible_members:
-                profile = profiles_map[member.id]
-                profile_data = profile.profile_data # Assuming this is a JSONField
-                
-                # --- V4.0 CHANGE: Get REAL-TIME workload ---
-                # Get the workload from our in-memory map
-                current_remaining_workload = member_workloads[member.id]
-                # --- END V4.0 CHANGE ---
-                
-                # --- START: REVISED NORMALIZATION & COST FORMULA INTEGRATION ---
-                
-                # A. Calculate Normalized Workload Cost (Range 0 - WEIGHT_WORKLOAD)
-                if max_workload > 0:
-                    # Use the new dynamic workload
-                    workload_ratio = current_remaining_workload / max_workload
-                else:
-                    workload_ratio = 0 # If all workloads are zero, everyone has 0 workload cost
-                workload_cost = workload_ratio * WEIGHT_WORKLOAD
-                
-                # B. Calculate Skill Mismatch Cost (Range 0 - WEIGHT_SKILL)
-                raw_skill_score = 0
-                member_skills = profile_data.get('skills', {}) # e.g., {'Python': 4, 'Django': 5, 'React': 3}
-
-                if required_skills:
-                    # Sum up skill levels for required skills for the member
-                    for skill_name in required_skills:
-                        raw_skill_score += member_skills.get(skill_name, 0) # Get skill level, 0 if not present
-
-                    # Max possible score for this task (if member had all required skills at MAX_SKILL_LEVEL)
-                    max_possible_skill_score_for_task = len(required_skills) * MAX_SKILL_LEVEL 
-                else:
-                    max_possible_skill_score_for_task = 1 # Prevent ZeroDivisionError if no skills required
-
-                # Normalize the raw score to a 0-1 scale
-                normalized_skill = (raw_skill_score / max_possible_skill_score_for_task) if max_possible_skill_score_for_task > 0 else 0
-                
-                # If no skills required for the task, it's considered a perfect skill match (no skill cost)
-                if not required_skills:
-                    normalized_skill = 1.0 
-                
-                # Invert the normalized_skill (1.0 perfect match -> 0.0 cost; 0.0 no match -> WEIGHT_SKILL cost)
-                skill_cost = (1.0 - normalized_skill) * WEIGHT_SKILL
-
-                # C. Calculate Preference Mismatch Cost (Range 0 - WEIGHT_PREFERENCE)
-                raw_preference_score = 0
-                member_prefs = profile_data.get('preferences', {}) # e.g., {'frontend': 4, 'backend': 5}
-                
-                if task_category:
-                    # Get preference level for the task's category from member's profile
-                    raw_preference_score = member_prefs.get(task_category, 0)
-                
-                # Normalize the raw preference score to a 0-1 scale
-                normalized_preference = (raw_preference_score / MAX_PREFERENCE_LEVEL) if MAX_PREFERENCE_LEVEL > 0 else 0
-                
-                # If no task category or preference data, treat as neutral (no preference cost)
-                if not task_category:
-                    normalized_preference = 1.0 # No preference mismatch cost
-
-                # Invert the normalized_preference (1.0 perfect match -> 0.0 cost; 0.0 no match -> WEIGHT_PREFERENCE cost)
-                pref_cost = (1.0 - normalized_preference) * WEIGHT_PREFERENCE
-
-                # D. Calculate Final Cost (Sum of all costs)
-                final_cost = workload_cost + skill_cost + pref_cost
-                
-                # --- END: REVISED NORMALIZATION & COST FORMULA INTEGRATION ---
-
-                # --- DEBUGGING OUTPUT (V4.0 Updated) ---
-                print(
-                    f"  - Task '{task.title}' for Member: {member.username} (Remaining Workload: {current_remaining_workload:.1f}h) "
-                    f"--> FINAL_COST: {final_cost:.2f} "
-                    f"(W:{workload_cost:.2f}, S:{skill_cost:.2f}, P:{pref_cost:.2f})"
-                )
-                # --- END DEBUGGING ---
-                
-                if final_cost < lowest_cost:
-                    lowest_cost = final_cost
-                    best_member = member
-            
-            # 4. ASSIGN THE TASK
-            if best_member:
-                # --- V2.0 DEADLINE CALCULATION (FEATURE 3) ---
-                start_time = timezone.now()
-                hours_with_buffer = task.estimated_hours * DEADLINE_BUFFER_MULTIPLIER
-                due_date = calculator.add_business_hours(start_time, hours_with_buffer)
-                task.due_date = due_date
-                # --- END V2.0 ---
-                
-                task.assigned_to = best_member
-                task.status = 'IN_PROGRESS' # As per V2.0 logic
-                task.progress = 0 # A new task always starts at 0
-                task.save() 
-
-                # --- V4.0 DYNAMIC WORKLOAD UPDATE ---
-                # We no longer save to profile. We update our in-memory map
-                # for the next task's calculation in this *same run*.
-                
-                # A new task (0% progress) adds its full duration to the workload
-                member_workloads[best_member.id] += task.estimated_hours
-                
-                # CRITICAL: Update max_workload for the next loop's normalization
-                max_workload = max(member_workloads.values() or [0.0])
-                # --- END V4.0 ---
-                
-                # --- V2.0: Updated log message ---
-                assignment_msg = (
-                    f"Assigned '{task.title}' to '{best_member.username}' "
-                    f"(Cost: {lowest_cost:.2f}) - Due: {due_date.strftime('%Y-%m-%d %H:%M')}"
-                )
-                assignments_made.append(assignment_msg)
-                print(assignment_msg)
-                # --- V4.0: New log message ---
-                print(f"   -> [V4.0] Updated {best_member.username}'s in-memory workload to: {member_workloads[best_member.id]:.1f}h. New max_workload: {max_workload:.1f}h")
-            else:
-                print(f"WARNING: Could not find any eligible member for task '{task.title}' after evaluation. Task remains unassigned.")
+        # 2. ENCODE ONCE, SCORE EVERYTHING (V5.0)
+        start_phase('score')
+        # Skills, preferences and workloads are turned into dense arrays a
+        # single time, and the skill/preference cost of every (task, member)
+        # pair is computed in a few matrix operations.
+        cost_matrix = CostMatrix(
+            [task.task_data for task in tasks],
+            [profiles_map[member.id].profile_data for member in eligible_members],
+        )
+        workloads = np.array([member_workloads[m_id] for m_id in eligible_member_ids], dtype=np.float64)
+        hours = np.array([task.estimated_hours for task in tasks], dtype=np.float64)
+
+        # 3. THE ASSIGNMENT LOGIC
+        # (V5.0) The skill index narrows each task to the members who have
+        # at least one of its required skills (greedy only; see greedy_assign).
+        candidates = None
+        if solver == 'greedy':
+            candidates = qualified_candidates([task.task_data for task in tasks], eligible_member_ids)
+        choices = choose_members(cost_matrix, hours, workloads, solver, member_hour_cap, candidates)
+
+        # 4. ASSIGN THE TASKS (in memory)
+        placed = []
+        for task, (member_index, lowest_cost) in zip(tasks, choices):
+            if member_index is None:
+                print(f"WARNING: No eligible member has room for task '{task.title}' under the hour cap. Task remains unassigned.")
+                continue
+            placed.append((task, eligible_members[member_index], lowest_cost))
+
+        # --- V2.0 DEADLINE CALCULATION (FEATURE 3) ---
+        # V5.0: Every deadline of the run in one vectorized call.
+        start_time = timezone.now()
+        due_dates = calculator.add_business_hours_batch(
+            [start_time] * len(placed),
+            [task.estimated_hours * DEADLINE_BUFFER_MULTIPLIER for task, _, _ in placed],
+        )
+        # --- END V2.0 ---
 
+        assigned_tasks = []
+        old_snapshots = [workload_snapshot(task) for task, _, _ in placed]
+        for (task, best_member, lowest_cost), due_date in zip(placed, due_dates):
+            task.due_date = due_date
+            task.assigned_to = best_member
+            task.status = 'IN_PROGRESS' # As per V2.0 logic
+            task.progress = 0 # A new task always starts at 0
+            task.updated_at = start_time # bulk_update skips auto_now; the deadline daemon reads this
+            assigned_tasks.append(task) # V5.0: Saved in bulk below, not one UPDATE per task
+
+            # --- V2.0: Updated log message ---
+            assignment_msg = (
+                f"Assigned '{task.title}' to '{best_member.username}' "
+                f"(Cost: {lowest_cost:.2f}) - Due: {due_date.strftime('%Y-%m-%d %H:%M')}"
+            )
+            assignments_made.append(assignment_msg)
+            print(assignment_msg)
+
+        # 5. PERSIST EVERYTHING AT ONCE (V5.0)
+        # One short transaction: one bulk UPDATE, guarded by 'assigned_to IS
+        # NULL', plus the ledger deltas and the version stamp. If another run
+        # got to any of these tasks since we loaded them, fewer rows match and
+        # the whole run is rolled back instead of leaving the project half-assigned.
+        start_phase('persist')
+        write_started = time_module.perf_counter()
+        with transaction.atomic():
+            sync_version = SyncCounter.next_version() # bulk_update skips save(); stamp it ourselves
+            for task in assigned_tasks:
+                task.sync_version = sync_version
+            rows_written = project.tasks.filter(assigned_to=None).bulk_update(
+                assigned_tasks, ASSIGNMENT_FIELDS, batch_size=BULK_UPDATE_BATCH_SIZE
+            )
+            if rows_written != len(assigned_tasks):
+                raise AssignmentConflict(
+                    f"Expected to write {len(assigned_tasks)} tasks but only {rows_written} were still unassigned."
+                )
+            # bulk_update sends no signals: push the workload deltas ourselves
+            record_bulk_task_changes(assigned_tasks, old_snapshots)
+            bump_etags([project.id], (task.assigned_to_id for task in assigned_tasks))
+        write_ms = (time_module.perf_counter() - write_started) * 1000
+        print(f"[V5.0] Wrote {rows_written} task(s) in one transaction ({write_ms:.1f} ms).")
+        end_phase() # After the COMMIT, which is part of persisting
+
+        print(f"[V5.0] Final in-memory workloads: {dict(zip(eligible_member_ids, workloads.tolist()))}")
         print(f"--- Assignment Complete. {len(assignments_made)} tasks assigned. ---")
-        return {"status": "success", "message": "\n".join(assignments_made)}
+        return {
+            "status": "success",
+            "message": "\n".join(assignments_made),
+            "rows_written": rows_written,
+            "write_ms": round(write_ms, 2),
+        }
 
     except Project.DoesNotExist:
         print(f"ERROR: Project with ID {project_id} not found.")
         return {"status": "error", "message": f"Project with ID {project_id} not found."}
+    except AssignmentConflict as e:
+        print(f"CONFLICT: {e} Nothing was saved.")
+        return {"status": "error", "message": f"Another assignment run changed this project's tasks. Nothing was saved. ({e})"}
     except Exception as e:
         print(f"CRITICAL ERROR in task assignment: {e}")
         import traceback
         traceback.print_exc() # Print full stack trace for debugging
         return {"status": "error", "message": f"An unexpected error occurred: {str(e)}"}
+
+
+# --- V5.0 CROSS-PROJECT BATCH ASSIGNMENT ---
+def run_batch_task_assignment(project_ids=None, solver='greedy', member_hour_cap=None):
+    """
+    V5.0 - Assigns the unassigned backlog of many (or all) projects in one pass.
+
+    Workload is global (it counts tasks from every project), so running
+    projects one by one reloads the same members and lets overlapping members
+    be judged on figures that are already stale. Here:
+      - tasks, memberships, profiles and skill holders are loaded ONCE for
+        the whole batch (four queries, whatever the number of projects),
+      - one shared {user_id: workload} view starts from the ledger and is
+        updated as each project's tasks are placed, so a member who just got
+        work in project A looks busier when project B is scored,
+      - everything is committed with ONE guarded bulk UPDATE at the end.
+    Projects are processed in id order; within a project the rules are exactly
+    those of run_weighted_task_assignment.
+
+    Returns {"status", "projects": [per-project report with 'ms'], "rows_written", ...}.
+    """
+    print(f"--- RUNNING V5.0 BATCH TASK ASSIGNMENT ({'all projects' if project_ids is None else f'{len(project_ids)} project(s)'}) ---")
+    batch_started = time_module.perf_counter()
+
+    try:
+        # 1. LOAD EVERYTHING ONCE
+        # Loading and scoring run OUTSIDE any transaction (as in
+        # run_weighted_task_assignment): an IMMEDIATE transaction would hold
+        # SQLite's write lock for the whole batch, and every other writer would
+        # time out behind it. Races are caught by the guarded write in step 4.
+        start_phase('load')
+        projects = Project.objects.order_by('id')
+        if project_ids is not None:
+            projects = projects.filter(id__in=project_ids)
+        projects = list(projects.only('id', 'name'))
+        ids = [project.id for project in projects]
+
+        tasks_by_project = {project_id: [] for project_id in ids}
+        for task in Task.objects.filter(project_id__in=ids, assigned_to=None).order_by('project_id', 'id'):
+            tasks_by_project[task.project_id].append(task)
+
+        members_by_project = {project_id: [] for project_id in ids}
+        memberships = Project.members.through.objects.filter(project_id__in=ids).order_by('project_id', 'user_id').values_list('project_id', 'user_id')
+        for project_id, user_id in memberships:
+            members_by_project[project_id].append(user_id)
+
+        all_member_ids = {user_id for member_ids in members_by_project.values() for user_id in member_ids}
+        profiles = {
+            profile.user_id: profile
+            for profile in EmployeeProfile.objects.filter(user_id__in=all_member_ids).select_related('user')
+        }
+        # The shared, running view of everyone's remaining workload
+        global_workloads = {user_id: profile.remaining_workload for user_id, profile in profiles.items()}
+        # Who holds which required skill, for every project at once (greedy pruning)
+        holders = None
+        if solver == 'greedy':
+            holders = skill_holders(
+                {name for project_tasks in tasks_by_project.values()
+                 for task in project_tasks for name in required_skill_names(task.task_data)},
+                all_member_ids,
+            )
+
+        # 2. SCORE PROJECT BY PROJECT AGAINST THE SHARED VIEW
+        start_phase('score')
+        reports = []
+        placed = []
+        for project in projects:
+            project_started = time_module.perf_counter()
+            tasks = tasks_by_project[project.id]
+            eligible_ids = [
+                user_id for user_id in members_by_project[project.id]
+                if user_id in profiles and profiles[user_id].strike_count < MAX_STRIKES_ALLOWED
+            ]
+            report = {"project_id": project.id, "name": project.name, "tasks": len(tasks), "assigned": 0}
+
+            if not tasks:
+                report["status"] = "no_op"
+            elif not eligible_ids:
+                report["status"] = "error"
+                report["message"] = "No eligible members found to assign tasks to."
+            else:
+                cost_matrix = CostMatrix(
+                    [task.task_data for task in tasks],
+                    [profiles[user_id].profile_data for user_id in eligible_ids],
+                )
+                workloads = np.array([global_workloads[user_id] for user_id in eligible_ids], dtype=np.float64)
+                hours = np.array([task.estimated_hours for task in tasks], dtype=np.float64)
+                candidates = None
+                if solver == 'greedy':
+                    candidates = qualified_candidates([task.task_data for task in tasks], eligible_ids, holders)
+                choices = choose_members(cost_matrix, hours, workloads, solver, member_hour_cap, candidates)
+
+                # Feed the new work back into the shared view for the next projects
+                for user_id, workload in zip(eligible_ids, workloads.tolist()):
+                    global_workloads[user_id] = workload
+                for task, (member_index, lowest_cost) in zip(tasks, choices):
+                    if member_index is not None:
+                        placed.append((task, profiles[eligible_ids[member_index]].user, lowest_cost))
+                        report["assigned"] += 1
+                report["status"] = "success"
+
+            report["ms"] = round((time_module.perf_counter() - project_started) * 1000, 2)
+            print(f"[V5.0] Project {project.id} '{project.name}': {report['assigned']}/{report['tasks']} assigned ({report['ms']} ms).")
+            reports.append(report)
+
+        # 3. DEADLINES FOR THE WHOLE BATCH IN ONE CALL
+        start_phase('persist')
+        start_time = timezone.now()
+        due_dates = DateCalculator().add_business_hours_batch(
+            [start_time] * len(placed),
+            [task.estimated_hours * DEADLINE_BUFFER_MULTIPLIER for task, _, _ in placed],
+        )
+        old_snapshots = [workload_snapshot(task) for task, _, _ in placed]
+        assigned_tasks = []
+        for (task, member, _), due_date in zip(placed, due_dates):
+            task.due_date = due_date
+            task.assigned_to = member
+            task.status = 'IN_PROGRESS'
+            task.progress = 0
+            task.updated_at = start_time
+            assigned_tasks.append(task)
+
+        # 4. ONE GUARDED BULK WRITE FOR EVERY PROJECT, in one short transaction
+        write_started = time_module.perf_counter()
+        with transaction.atomic():
+            sync_version = SyncCounter.next_version()
+            for task in assigned_tasks:
+                task.sync_version = sync_version
+            rows_written = Task.objects.filter(assigned_to=None).bulk_update(
+                assigned_tasks, ASSIGNMENT_FIELDS, batch_size=BULK_UPDATE_BATCH_SIZE
+            )
+            if rows_written != len(assigned_tasks):
+                raise AssignmentConflict(
+                    f"Expected to write {len(assigned_tasks)} tasks but only {rows_written} were still unassigned."
+                )
+            record_bulk_task_changes(assigned_tasks, old_snapshots)
+            bump_etags(
+                (task.project_id for task in assigned_tasks),
+                (task.assigned_to_id for task in assigned_tasks),
+            )
+        write_ms = (time_module.perf_counter() - write_started) * 1000
+        end_phase()
+
+        total_ms = (time_module.perf_counter() - batch_started) * 1000
+        print(f"--- Batch Complete. {rows_written} tasks assigned across {len(projects)} project(s) in {total_ms:.1f} ms. ---")
+        return {
+            "status": "success",
+            "projects": reports,
+            "rows_written": rows_written,
+            "write_ms": round(write_ms, 2),
+            "total_ms": round(total_ms, 2),
+        }
+
+    except AssignmentConflict as e:
+        print(f"CONFLICT: {e} Nothing was saved.")
+        return {"status": "error", "message": f"Another assignment run changed these tasks. Nothing was saved. ({e})"}
+    except Exception as e:
+        print(f"CRITICAL ERROR in batch task assignment: {e}")
+        import traceback
+        traceback.print_exc()
+        return {"status": "error", "message": f"An unexpected error occurred: {str(e)}"}
+
+# --- V5.0 INCREMENTAL (ON-CREATE) ASSIGNMENT ---
+def auto_assign_new_tasks(project, tasks):
+    """
+    V5.0 - SoSTA for tasks that are being created right now (Project.auto_assign).
+
+    Same cost model and greedy rule as run_weighted_task_assignment, applied
+    to just the new tasks, in order. On a project whose backlog is empty
+    (which auto-assign keeps it) this picks exactly what a full run would.
+
+    Per call it costs O(members x new tasks) and a constant number of queries:
+      - skills / preferences come from the cached member feature table
+        (cache.get_member_features), and
+      - strikes and remaining workloads from ONE live read of the profiles
+        (workloads are the maintained ledger, see workload.py).
+
+    'tasks' are unsaved Task instances; they are filled in (assigned_to,
+    status, progress, due_date) but NOT saved - the caller saves them.
+    Returns [(task, username, cost)] for the tasks that were placed.
+    """
+    if not tasks:
+        return []
+
+    start_phase('load')
+    features = get_member_features(project.id)
+    live = {
+        user_id: (strike_count, remaining_workload)
+        for user_id, strike_count, remaining_workload in EmployeeProfile.objects.filter(
+            user__projects=project
+        ).values_list('user_id', 'strike_count', 'remaining_workload')
+    }
+
+    # --- V2.0 STRIKE SYSTEM: skip "fired" members ---
+    eligible = [
+        (user_id, username, profile_data) for user_id, username, profile_data in features
+        if user_id in live and live[user_id][0] < MAX_STRIKES_ALLOWED
+    ]
+    if not eligible:
+        print(f"[V5.0] Auto-assign: no eligible members in project {project.id}; tasks stay unassigned.")
+        return []
+
+    start_phase('score')
+    cost_matrix = CostMatrix([task.task_data for task in tasks], [profile_data for _, _, profile_data in eligible])
+    workloads = np.array([live[user_id][1] for user_id, _, _ in eligible], dtype=np.float64)
+    hours = np.array([task.estimated_hours for task in tasks], dtype=np.float64)
+    candidates = qualified_candidates([task.task_data for task in tasks], [user_id for user_id, _, _ in eligible])
+    choices = greedy_assign(cost_matrix, hours, workloads, candidates)
+    end_phase() # The caller saves the tasks
+
+    # --- V2.0 DEADLINE CALCULATION (FEATURE 3) ---
+    start_time = timezone.now()
+    due_dates = DateCalculator().add_business_hours_batch(
+        [start_time] * len(tasks),
+        [task.estimated_hours * DEADLINE_BUFFER_MULTIPLIER for task in tasks],
+    )
+
+    placed = []
+    for task, (member_index, lowest_cost), due_date in zip(tasks, choices, due_dates):
+        user_id, username, _ = eligible[member_index]
+        task.assigned_to_id = user_id
+        task.status = 'IN_PROGRESS'
+        task.progress = 0
+        task.due_date = due_date
+        placed.append((task, username, lowest_cost))
+        print(
+            f"[V5.0] Auto-assigned '{task.title}' to '{username}' "
+            f"(Cost: {lowest_cost:.2f}) - Due: {due_date.strftime('%Y-%m-%d %H:%M')}"
+        )
+    return placed
+
+
 # --- MEETING SCHEDULER (GENETIC ALGORITHM) ---
-# --- NO CHANGES BELOW THIS LINE ---
 
 # We'll define the search space: Weekdays (Mon-Fri), 9am to 5pm (in minutes from midnight)
 # --- SCHEDULER CONSTANTS ---
@@ -263,6 +477,13 @@ MEETING_INCREMENT_MINUTES = 15
 POPULATION_SIZE = 50
 GENERATIONS = 40
 CXPB, MUTPB = 0.5, 0.2 
+# --- V5.0 EXACT SCHEDULER ---
+WEEK_INCREMENTS = 5 * 24 * 60 // MEETING_INCREMENT_MINUTES  # 480 start indices, Mon-Fri
+DEFAULT_TOP_K = 5
+MAX_HORIZON_WEEKS = 12
+SCHEDULER_SOLVERS = ('exact', 'genetic')
+# A meeting has to fit in one 9-5 window; anything longer (or nan / inf) is rejected up front
+MAX_MEETING_HOURS = (SEARCH_SPACE_END_MINUTE - SEARCH_SPACE_START_MINUTE) / 60
 # This holds all the data the GA needs
 
 def get_ist_timezone():
@@ -271,27 +492,74 @@ def get_ist_timezone():
     except:
         return timezone.timezone(timedelta(hours=5, minutes=30))
 
+def get_ist_week_start():
+    """Monday 00:00 IST of the current IST calendar week."""
+    IST = get_ist_timezone()
+    today_ist = timezone.now().astimezone(IST).date()
+    start_of_week_ist = today_ist - timedelta(days=today_ist.weekday())
+    return datetime.combine(start_of_week_ist, time(0, 0)).replace(tzinfo=IST)
+
+
+class MemberIntervals:
+    """
+    V5.0 - In-memory interval index over one member's availability slots.
+    Starts are sorted, and a running max of the end times lets us answer
+    "does any single slot cover [start, end]?" with one binary search.
+    """
+
+    def __init__(self, slots):
+        slots = sorted(slots)  # (start, end) pairs
+        self.starts = [start for start, _ in slots]
+        self.max_end_so_far = []
+        latest = None
+        for _, end in slots:
+            latest = end if latest is None or end > latest else latest
+            self.max_end_so_far.append(latest)
+
+    def covers(self, start, end):
+        # Every slot in starts[:i] opens at or before 'start'; is one still open at 'end'?
+        i = bisect_right(self.starts, start)
+        return i > 0 and self.max_end_so_far[i - 1] >= end
+
+
 class SchedulerContext:
-    def __init__(self, project_id, duration_minutes):
+    def __init__(self, project_id, duration_minutes, window_start=None, window_end=None):
         self.project = Project.objects.get(id=project_id)
-        self.members = self.project.members.all()
+        self.members = list(self.project.members.all())
         self.member_count = len(self.members)
         self.duration_minutes = duration_minutes
-        
+
+        # --- V5.0: ONE windowed query for the whole team ---
+        # Only slots overlapping the search window matter (by default the
+        # current IST work week, Mon 00:00 to Sat 00:00), so years of old
+        # availability never leave the database.
+        self.window_start = window_start or get_ist_week_start()
+        self.window_end = window_end or self.window_start + timedelta(days=5)
+        slots = AvailabilitySlot.objects.filter(
+            employee__projects=self.project,
+            end_time__gt=self.window_start,
+            start_time__lt=self.window_end,
+        ).values_list('employee_id', 'start_time', 'end_time')
+
         self.availability_slots = []
-        for member in self.members:
-            slots = AvailabilitySlot.objects.filter(employee=member)
-            for slot in slots:
-                self.availability_slots.append({
-                    "member_id": member.id,
-                    "start": slot.start_time, 
-                    "end": slot.end_time
-                })
+        slots_by_member = {member.id: [] for member in self.members}
+        for member_id, start, end in slots:
+            self.availability_slots.append({
+                "member_id": member_id,
+                "start": start, 
+                "end": end
+            })
+            slots_by_member[member_id].append((start, end))
+        self.intervals = {member_id: MemberIntervals(member_slots) for member_id, member_slots in slots_by_member.items()}
         
         print(f"[GA] Context initialized. Members: {self.member_count}, Slots Loaded: {len(self.availability_slots)}")
         if len(self.availability_slots) > 0:
             print(f"[GA] Sample Slot 0: {self.availability_slots[0]['start']} to {self.availability_slots[0]['end']}")
 
+    def attendees(self, start, end):
+        """IDs of members with a single slot covering [start, end]. O(members * log slots)."""
+        return [member_id for member_id, index in self.intervals.items() if index.covers(start, end)]
+
 def evaluate_meeting_time(context, individual):
     start_time_index = individual[0]
     start_minutes_from_week_start = start_time_index * MEETING_INCREMENT_MINUTES
@@ -318,11 +586,8 @@ def evaluate_meeting_time(context, individual):
     potential_start_ist = potential_start_ist.replace(tzinfo=IST)
     potential_end_ist = potential_start_ist + timedelta(minutes=context.duration_minutes)
 
-    attendees = set()
-    for slot in context.availability_slots:
-        # Check intersection
-        if slot["start"] <= potential_start_ist and slot["end"] >= potential_end_ist:
-            attendees.add(slot["member_id"])
+    # V5.0: Binary search per member instead of scanning every slot
+    attendees = context.attendees(potential_start_ist, potential_end_ist)
     
     # --- DEBUGGING (Prints only for 10 AM to prevent spamming console) ---
     # if minutes_in_day == 10 * 60: 
@@ -334,57 +599,114 @@ def evaluate_meeting_time(context, individual):
     fitness_score = len(attendees) / context.member_count
     return (fitness_score,)
 
+# --- V5.0 REENTRANT GA ENGINE ---
+# The DEAP types are created ONCE, at import time. Runs used to delete and
+# re-create them on the shared 'creator' module, which corrupted concurrent
+# runs under a threaded server.
+if not hasattr(creator, "FitnessMax"):
+    creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+if not hasattr(creator, "Individual"):
+    creator.create("Individual", list, fitness=creator.FitnessMax)
+
+
+class GeneticScheduler:
+    """
+    One GA run over a SchedulerContext. Everything a run touches (its RNG,
+    toolbox, fitness memo) lives on the instance, so any number of runs can
+    execute in parallel threads. Seeded per project, so a given project
+    always gets the same result.
+    """
+
+    def __init__(self, context, seed):
+        self.context = context
+        self.rng = random.Random(seed)  # Private stream: no global random.seed()
+        self.fitness_cache = {}         # start index -> fitness (only 480 possible)
+        self.total_increments = WEEK_INCREMENTS
+
+        self.toolbox = base.Toolbox()
+        self.toolbox.register("attr_int", self.rng.randint, 0, self.total_increments - 1)
+        self.toolbox.register("individual", tools.initRepeat, creator.Individual, self.toolbox.attr_int, n=1)
+        self.toolbox.register("population", tools.initRepeat, list, self.toolbox.individual)
+        self.toolbox.register("evaluate", self.evaluate)
+        self.toolbox.register("mate", self.cx_uniform, indpb=0.5)
+        self.toolbox.register("mutate", self.mut_uniform_int, low=0, up=self.total_increments - 1, indpb=0.1)
+        self.toolbox.register("select", self.sel_tournament, tournsize=3)
+
+    # The DEAP operators we used, drawing from self.rng instead of the global 'random'
+
+    def evaluate(self, individual):
+        index = individual[0]
+        if index not in self.fitness_cache:
+            self.fitness_cache[index] = evaluate_meeting_time(self.context, individual)
+        return self.fitness_cache[index]
+
+    def cx_uniform(self, ind1, ind2, indpb):
+        for i in range(min(len(ind1), len(ind2))):
+            if self.rng.random() < indpb:
+                ind1[i], ind2[i] = ind2[i], ind1[i]
+        return ind1, ind2
+
+    def mut_uniform_int(self, individual, low, up, indpb):
+        for i in range(len(individual)):
+            if self.rng.random() < indpb:
+                individual[i] = self.rng.randint(low, up)
+        return individual,
+
+    def sel_tournament(self, individuals, k, tournsize):
+        return [
+            max((self.rng.choice(individuals) for _ in range(tournsize)), key=lambda ind: ind.fitness)
+            for _ in range(k)
+        ]
+
+    def var_and(self, population):
+        """Same as deap.algorithms.varAnd."""
+        offspring = [self.toolbox.clone(ind) for ind in population]
+        for i in range(1, len(offspring), 2):
+            if self.rng.random() < CXPB:
+                offspring[i - 1], offspring[i] = self.toolbox.mate(offspring[i - 1], offspring[i])
+                del offspring[i - 1].fitness.values, offspring[i].fitness.values
+        for i in range(len(offspring)):
+            if self.rng.random() < MUTPB:
+                offspring[i], = self.toolbox.mutate(offspring[i])
+                del offspring[i].fitness.values
+        return offspring
+
+    def run(self):
+        """Same loop as deap.algorithms.eaSimple. Returns (best_index, best_fitness)."""
+        population = self.toolbox.population(n=POPULATION_SIZE)
+        hof = tools.HallOfFame(1)
+
+        def evaluate_invalid(individuals):
+            for ind in individuals:
+                if not ind.fitness.valid:
+                    ind.fitness.values = self.toolbox.evaluate(ind)
+
+        evaluate_invalid(population)
+        hof.update(population)
+        for _ in range(GENERATIONS):
+            offspring = self.var_and(self.toolbox.select(population, len(population)))
+            evaluate_invalid(offspring)
+            hof.update(offspring)
+            population[:] = offspring
+
+        return hof[0][0], hof[0].fitness.values[0]
+
+
 def run_genetic_scheduler(project_id, duration_hours):
     duration_minutes = int(duration_hours * 60)
+    start_phase('load')
     context = SchedulerContext(project_id, duration_minutes)
+    end_phase()
     
     if context.member_count == 0:
         return {"status": "error", "message": "No members in project."}
 
-    random.seed(project_id) 
-
-    if "FitnessMax" in creator.__dict__:
-        del creator.FitnessMax
-    if "Individual" in creator.__dict__:
-        del creator.Individual
-        
-    creator.create("FitnessMax", base.Fitness, weights=(1.0,))
-    creator.create("Individual", list, fitness=creator.FitnessMax)
-
-    toolbox = base.Toolbox()
-    total_minutes_in_week = 5 * 24 * 60
-    total_increments = total_minutes_in_week // MEETING_INCREMENT_MINUTES
-    
-    toolbox.register("attr_int", random.randint, 0, total_increments - 1)
-    toolbox.register("individual", tools.initRepeat, creator.Individual, toolbox.attr_int, n=1)
-    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
-    toolbox.register("evaluate", evaluate_meeting_time, context)
-    toolbox.register("mate", tools.cxUniform, indpb=0.5)
-    toolbox.register("mutate", tools.mutUniformInt, low=0, up=total_increments - 1, indpb=0.1)
-    toolbox.register("select", tools.selTournament, tournsize=3)
-
-    pop = toolbox.population(n=POPULATION_SIZE)
-    hof = tools.HallOfFame(1)
-    
-    algorithms.eaSimple(pop, toolbox, cxpb=CXPB, mutpb=MUTPB, ngen=GENERATIONS, halloffame=hof, verbose=False)
-    
-    best_individual = hof[0]
-    best_fitness = best_individual.fitness.values[0]
+    start_phase('score')
+    start_time_index, best_fitness = GeneticScheduler(context, seed=project_id).run()
+    end_phase()
     
     # Reconstruct Best Time
-    IST = get_ist_timezone()
-    start_time_index = best_individual[0]
-    start_minutes_from_week_start = start_time_index * MEETING_INCREMENT_MINUTES
-    day_of_week = start_minutes_from_week_start // (24 * 60)
-    minutes_in_day = start_minutes_from_week_start % (24 * 60)
-    
-    now_utc = timezone.now()
-    now_ist = now_utc.astimezone(IST)
-    today_ist = now_ist.date()
-    start_of_week_ist = today_ist - timedelta(days=today_ist.weekday())
-    
-    best_start_ist = datetime.combine(start_of_week_ist, time(0, 0)) + timedelta(days=day_of_week, minutes=minutes_in_day)
-    best_start_ist = best_start_ist.replace(tzinfo=IST)
+    best_start_ist = context.window_start + timedelta(minutes=start_time_index * MEETING_INCREMENT_MINUTES)
     best_end_ist = best_start_ist + timedelta(minutes=duration_minutes)
 
     print(f"[GA] Best Candidate Found: {best_start_ist} (Score: {best_fitness})")
@@ -404,4 +726,147 @@ def run_genetic_scheduler(project_id, duration_hours):
         "fitness_score": best_fitness
     }
 
-    return {"status": "success", "best_slot": best_slot_found}
\ No newline at end of file
+    return {"status": "success", "best_slot": best_slot_found}
+
+
+# --- V5.0 EXACT SCHEDULER (BITMAP SWEEP) ---
+# The GA searches only 5 days x 96 quarter-hours = 480 start indices, so we
+# can simply score all of them. Each member's availability is rasterised ONCE
+# into a bitmap over those indices ("can attend a meeting starting here"),
+# and summing the bitmaps gives every candidate's attendance at once.
+
+def build_attendance_bitmaps(context, week_start, increments):
+    """
+    (members x increments) boolean bitmap: True where a member has a single
+    availability slot covering a whole meeting that starts at that index.
+    Same rule as evaluate_meeting_time: slot.start <= start and slot.end >= end.
+    """
+    member_rows = {member.id: row for row, member in enumerate(context.members)}
+    bitmaps = np.zeros((context.member_count, increments + 1), dtype=np.int32)
+    if context.availability_slots:
+        step = timedelta(minutes=MEETING_INCREMENT_MINUTES)
+        duration = timedelta(minutes=context.duration_minutes)
+        rows, first, last = [], [], []
+        for slot in context.availability_slots:
+            # First index starting at/after the slot opens, last one ending before it closes
+            rows.append(member_rows[slot["member_id"]])
+            first.append(-((week_start - slot["start"]) // step))  # ceil division
+            last.append((slot["end"] - duration - week_start) // step)
+        rows = np.array(rows, dtype=np.intp)
+        first = np.clip(np.array(first, dtype=np.int64), 0, increments)
+        last = np.clip(np.array(last, dtype=np.int64) + 1, 0, increments)
+        usable = first < last
+        # Difference-array rasterisation: +1 where a run starts, -1 after it ends
+        np.add.at(bitmaps, (rows[usable], first[usable]), 1)
+        np.add.at(bitmaps, (rows[usable], last[usable]), -1)
+    return np.cumsum(bitmaps[:, :increments], axis=1) > 0
+
+
+def working_hours_mask(duration_minutes, increments):
+    """Weekday start indices inside the strict 9-5 IST window (same rule as the GA)."""
+    minutes_from_start = np.arange(increments) * MEETING_INCREMENT_MINUTES
+    minutes_in_day = minutes_from_start % (24 * 60)
+    day_of_week = (minutes_from_start // (24 * 60)) % 7  # Grids always start on a Monday
+    return (day_of_week < 5) & \
+        (minutes_in_day >= SEARCH_SPACE_START_MINUTE) & \
+        (minutes_in_day <= SEARCH_SPACE_END_MINUTE - duration_minutes)
+
+
+def pick_non_overlapping(attendance, duration_minutes, top_k):
+    """
+    Up to top_k start indices, best first (most attendees, then earliest),
+    where no two picked meetings overlap in time.
+    """
+    span = -(-duration_minutes // MEETING_INCREMENT_MINUTES)  # Indices one meeting occupies
+    candidates = np.flatnonzero(attendance > 0)
+    ranked = candidates[np.lexsort((candidates, -attendance[candidates]))]
+    blocked = np.zeros(len(attendance) + span, dtype=bool)
+    picked = []
+    for index in ranked:
+        if blocked[index]:
+            continue
+        picked.append(int(index))
+        if len(picked) == top_k:
+            break
+        blocked[max(index - span + 1, 0):index + span] = True
+    return picked
+
+
+def format_meeting_slot(start_ist, duration_minutes, attendees_count, member_count, attendees=None):
+    slot = {
+        "start_time": start_ist.isoformat(),
+        "end_time": (start_ist + timedelta(minutes=duration_minutes)).isoformat(),
+        "attendees_count": int(attendees_count),
+        "total_members": member_count,
+        "fitness_score": attendees_count / member_count,
+    }
+    if attendees is not None:
+        slot["attendees"] = attendees
+    return slot
+
+
+def run_exact_scheduler(project_id, duration_hours, top_k=DEFAULT_TOP_K, horizon_weeks=None):
+    """
+    V5.0 - Exact meeting scheduler.
+    Scores every start index and returns the true optimum (earliest one on
+    ties) plus up to top_k - 1 non-overlapping alternatives, each with its
+    attendee list. Deterministic: the same data always gives the same answer.
+
+    - horizon_weeks=None: the current IST calendar week (like the GA).
+    - horizon_weeks=N: from now until N weeks from now; past times are skipped.
+      Availability is loaded and rasterised once for the whole horizon, so
+      the cost grows linearly with N.
+    """
+    duration_minutes = int(duration_hours * 60)
+    week_start = get_ist_week_start()
+    step = timedelta(minutes=MEETING_INCREMENT_MINUTES)
+
+    if horizon_weeks is None:
+        earliest = week_start
+        increments = WEEK_INCREMENTS
+    else:
+        earliest = timezone.now()
+        latest_start = earliest + timedelta(weeks=horizon_weeks)
+        increments = -((week_start - latest_start) // step)  # ceil division
+
+    start_phase('load')
+    context = SchedulerContext(
+        project_id, duration_minutes,
+        window_start=week_start,
+        window_end=week_start + increments * step + timedelta(minutes=duration_minutes),
+    )
+    end_phase()
+
+    if context.member_count == 0:
+        return {"status": "error", "message": "No members in project."}
+
+    start_phase('score')
+    bitmaps = build_attendance_bitmaps(context, week_start, increments)
+    attendance = bitmaps.sum(axis=0)
+    attendance[~working_hours_mask(duration_minutes, increments)] = 0
+    first_future_index = -((week_start - earliest) // step)  # ceil division
+    attendance[:first_future_index] = 0  # Starts already in the past
+
+    picked = pick_non_overlapping(attendance, duration_minutes, max(int(top_k), 1))
+    end_phase()
+
+    if not picked:
+        return {
+            "status": "error", 
+            "message": "No overlapping availability found in IST working hours (9am-5pm)."
+        }
+
+    slots = [
+        format_meeting_slot(
+            week_start + index * step,
+            duration_minutes, attendance[index], context.member_count,
+            attendees=[
+                {"id": member.id, "username": member.username}
+                for member, present in zip(context.members, bitmaps[:, index]) if present
+            ],
+        )
+        for index in picked
+    ]
+    print(f"[EXACT] Best slot: {slots[0]['start_time']} (Score: {slots[0]['fitness_score']})")
+
+    return {"status": "success", "best_slot": slots[0], "alternatives": slots[1:]}
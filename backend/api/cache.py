@@ -0,0 +1,174 @@
+# api/cache.py
+
+# --- V5.0 SCHEDULER RESULT CACHE (+ auto-assign member features) ---
+# "Find meeting time" is expensive (the GA especially) and gets clicked a lot.
+# Results are cached under
+#     (project, solver params, membership version, availability version, week)
+# so identical requests are answered from Django's cache, and concurrent
+# identical requests are coalesced: one computes, the rest wait for it.
+#
+# Invalidation is by VERSION, not by deleting keys: signals.py bumps
+#   - the project's membership version when Project.members changes, and
+#   - the availability version of every project a user belongs to when one
+#     of their AvailabilitySlots is created, changed or deleted, and
+#   - the profiles version of those projects when a member's profile is saved
+#     (this one only keys the auto-assign member feature table).
+# Old entries then simply become unreachable and expire on their own.
+#
+# The versions are database rows (versions.py), not cache entries: the
+# scheduler also runs in job-worker processes, and with the default
+# local-memory cache a bump made by the web server (or any other process)
+# would never reach their copy, so they'd keep serving old results. The
+# results, features and locks may stay per process - an entry under an old
+# version is simply never looked up again.
+
+import threading
+import time
+
+from django.core.cache import cache
+
+from .models import Project
+from .versions import bump_versions, get_versions
+
+SCHEDULER_RESULT_TIMEOUT = 5 * 60 # Results also depend on 'now' (past slots drop out), so keep them short-lived
+SCHEDULER_LOCK_TIMEOUT = 2 * 60   # Longest a computation may hold the cross-process lock
+COALESCE_POLL_SECONDS = 0.05
+KEY_PREFIX = 'teamsync:scheduler'
+
+
+# --- Versions ---
+
+def _version_kind(kind):
+    return f'project-{kind}'
+
+
+def _get_versions(project_id, *kinds):
+    """The project's current version for each of 'kinds' (one query)."""
+    return get_versions(project_id, *(_version_kind(kind) for kind in kinds))
+
+
+def bump_membership_version(project_ids):
+    bump_versions((_version_kind('members'), project_id) for project_id in project_ids)
+
+
+def _bump_for_users_projects(user_ids, kind):
+    project_ids = Project.objects.filter(members__id__in=list(user_ids)).values_list('id', flat=True).distinct()
+    bump_versions((_version_kind(kind), project_id) for project_id in project_ids)
+
+
+def bump_availability_version(user_ids):
+    """Invalidates scheduler results for every project these users are on."""
+    _bump_for_users_projects(user_ids, 'availability')
+
+
+def bump_profiles_version(user_ids):
+    """Invalidates the member feature table of every project these users are on."""
+    _bump_for_users_projects(user_ids, 'profiles')
+
+
+# --- Member features (for Project.auto_assign) ---
+
+MEMBER_FEATURES_TIMEOUT = 60 * 60
+
+
+def get_member_features(project_id):
+    """
+    [(user_id, username, profile_data), ...] for the project's members with a
+    profile, in the same order as 'project.members.all()' (the order the full
+    assignment run uses, so ties break the same way).
+    Cached until membership or a member's profile changes. Anything that
+    changes often (strikes, workload) is deliberately NOT in here.
+    """
+    members_v, profiles_v = _get_versions(project_id, 'members', 'profiles')
+    key = f'{KEY_PREFIX}:features:{project_id}:{members_v}:{profiles_v}'
+    features = cache.get(key)
+    if features is None:
+        members = Project.objects.get(id=project_id).members.all().select_related('profile')
+        features = [
+            (member.id, member.username, member.profile.profile_data)
+            for member in members if hasattr(member, 'profile')
+        ]
+        cache.set(key, features, timeout=MEMBER_FEATURES_TIMEOUT)
+    return features
+
+
+# --- Results ---
+
+def scheduler_result_key(project_id, params, week_start):
+    members_v, availability_v = _get_versions(project_id, 'members', 'availability')
+    param_part = ':'.join(f'{name}={params.get(name)}' for name in sorted(params))
+    return (
+        f'{KEY_PREFIX}:result:{project_id}:{members_v}:{availability_v}:'
+        f'{week_start.isoformat()}:{param_part}'
+    )
+
+
+class _Flight:
+    """One in-progress computation that other threads can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def cached_scheduler_run(project_id, params, week_start, compute):
+    """
+    Returns (result, outcome) where outcome is 'hit', 'miss' or 'coalesced'.
+    'compute()' runs at most once per key at a time:
+      - within this process, other threads wait on the first one's _Flight;
+      - across processes (with a shared cache backend), cache.add() acts as
+        a lock and the others poll for the result.
+    Error results are returned but never cached.
+    """
+    key = scheduler_result_key(project_id, params, week_start)
+    result = cache.get(key)
+    if result is not None:
+        return result, 'hit'
+
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result, 'coalesced'
+
+    try:
+        flight.result, outcome = _compute_once_across_processes(key, compute)
+        return flight.result, outcome
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        flight.done.set()
+        with _flights_lock:
+            _flights.pop(key, None)
+
+
+def _compute_once_across_processes(key, compute):
+    lock_key = f'{key}:lock'
+    deadline = time.monotonic() + SCHEDULER_LOCK_TIMEOUT
+    while not cache.add(lock_key, 1, timeout=SCHEDULER_LOCK_TIMEOUT):
+        # Another process is computing this exact result - wait for it
+        time.sleep(COALESCE_POLL_SECONDS)
+        result = cache.get(key)
+        if result is not None:
+            return result, 'coalesced'
+        if time.monotonic() > deadline:
+            break # Its holder died; compute it ourselves
+    try:
+        result = compute()
+        if result.get('status') != 'error':
+            cache.set(key, result, timeout=SCHEDULER_RESULT_TIMEOUT)
+        return result, 'miss'
+    finally:
+        cache.delete(lock_key)
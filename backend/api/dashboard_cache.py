@@ -0,0 +1,106 @@
+# api/dashboard_cache.py
+
+# --- V5.0 DASHBOARD RESPONSE CACHE ---
+# GET /api/projects/<id>/ (every task plus every member's dashboard) is the
+# most expensive response we serve, and it's re-read far more often than the
+# project changes. Its serialized body is cached per project AND viewer,
+# under the project's ETag token (etags.py):
+#
+#     teamsync:dashboard:<project>:<viewer>:<token>
+#
+# so it's invalidated exactly when the ETag is: signals.py bumps the token on
+# Task saves / deletes, Project.members changes and changes to a member's
+# strike count or workload (the bulk writes, the workload ledger and the
+# deadline checks bump it themselves). A bumped token makes the old entries
+# unreachable; they expire after TIMEOUT. The token is read before the rows,
+# and committed together with the write, so an entry never holds rows older
+# than its token.
+#
+# The token is a database row (versions.py), not a cache entry: a write made
+# by another process (check_deadlines, the deadline daemon, a job worker,
+# run_batch_assignment) must reach the web server's keys even when each
+# process has a local-memory cache of its own. The entries themselves may
+# stay per process - a stale one is simply never looked up again.
+#
+# Entries go to the cache alias DASHBOARD_CACHE['ALIAS'] (settings.py: local
+# memory, or files with DASHBOARD_CACHE_DIR). Hits and misses are counted per
+# process and shown at /api/instrumentation/summary/. DASHBOARD_CACHE=0 in the
+# environment turns the cache off (e.g. to debug the serializers).
+
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .etags import resource_token
+
+KEY_PREFIX = 'teamsync:dashboard'
+
+DEFAULTS = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'TIMEOUT': 10 * 60,
+}
+
+
+def dashboard_cache_settings():
+    return {**DEFAULTS, **getattr(settings, 'DASHBOARD_CACHE', {})}
+
+
+class CacheCounters:
+    """Hit / miss counts of this process. Thread-safe."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, outcome):
+        with self.lock:
+            if outcome == 'hit':
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def clear(self):
+        with self.lock:
+            self.hits = self.misses = 0
+
+    def summary(self):
+        with self.lock:
+            hits, misses = self.hits, self.misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+
+
+counters = CacheCounters()
+
+
+def dashboard_key(project_id, viewer_id):
+    return f'{KEY_PREFIX}:{project_id}:{viewer_id}:{resource_token("project", project_id)}'
+
+
+def cached_project_data(project_id, viewer_id, serialize):
+    """
+    Returns (data, outcome): 'hit', 'miss', or None with the cache off.
+    'serialize()' builds the response data on a miss (and may raise, e.g.
+    Http404 for a non-member; nothing is cached then).
+    """
+    config = dashboard_cache_settings()
+    if not config['ENABLED']:
+        return serialize(), None
+
+    store = caches[config['ALIAS']]
+    key = dashboard_key(project_id, viewer_id)
+    data = store.get(key)
+    if data is not None:
+        counters.record('hit')
+        return data, 'hit'
+
+    data = dict(serialize())
+    store.set(key, data, timeout=config['TIMEOUT'])
+    counters.record('miss')
+    return data, 'miss'
@@ -0,0 +1,51 @@
+# api/db_router.py
+
+# --- V5.0 READ REPLICA ROUTING ---
+# With SQLITE_READ_REPLICA set (see ctcr_backend/database.py), the reads of
+# read-only requests go to a separate read-only connection, so a long
+# dashboard query never holds up a writer's connection. Only reads inside a
+# read_replica() block are routed (ReadReplicaMiddleware opens one for
+# GET/HEAD/OPTIONS); everything else - and every write - uses 'default'.
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from ctcr_backend.database import READ_REPLICA_ALIAS
+
+_reading_from_replica = ContextVar('reading_from_replica', default=False)
+
+
+def replica_configured():
+    return READ_REPLICA_ALIAS in connections.databases
+
+
+@contextmanager
+def read_replica():
+    """Route the reads made inside this block to the replica (if there is one)."""
+    token = _reading_from_replica.set(True)
+    try:
+        yield
+    finally:
+        _reading_from_replica.reset(token)
+
+
+class ReadReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        # Inside a transaction on 'default', keep reading our own writes
+        if (_reading_from_replica.get() and replica_configured()
+                and not connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return READ_REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases are the same data
+        return {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, READ_REPLICA_ALIAS}
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != READ_REPLICA_ALIAS
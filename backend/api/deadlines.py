@@ -0,0 +1,231 @@
+# api/deadlines.py
+
+# --- V5.0 SET-BASED DEADLINE STRIKES ---
+# The "Strike System" (Feature #4) as a handful of set-based queries instead
+# of two save()s per overdue task:
+#   1. one grouped SELECT: how many overdue tasks each user has,
+#   2. one UPDATE flipping all of them to 'OVERDUE',
+#   3. one UPDATE per distinct strike increment (strike_count + k via F()),
+# all inside a single transaction. Used by 'manage.py check_deadlines' and,
+# per expiring batch, by 'manage.py run_deadline_daemon' (DeadlineQueue below).
+
+import heapq
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .etags import bump_etags
+from .models import EmployeeProfile, SyncCounter, Task, OPEN_STATUSES, OPEN_TASKS
+
+# Tasks in OPEN_STATUSES can still become overdue. 'DONE' ones never do, and
+# 'OVERDUE' ones already got their strike (one strike per task, ever).
+# Filter with the OPEN_TASKS Q so the partial index on due_date is used.
+
+REPORT_CHUNK_SIZE = 2000 # Rows per round-trip when streaming the report
+MAX_CONFLICT_RETRIES = 3
+
+
+class DeadlineConflict(Exception):
+    """The overdue set changed between counting it and flipping it."""
+
+
+def overdue_tasks(now, task_ids=None):
+    """
+    Tasks that are past due and haven't been struck yet.
+    As before, only tasks assigned to a user WITH a profile get a strike;
+    unassigned tasks are left alone.
+    """
+    tasks = Task.objects.filter(
+        OPEN_TASKS,
+        due_date__lt=now,
+        assigned_to__isnull=False,
+        assigned_to__profile__isnull=False,
+    )
+    if task_ids is not None:
+        tasks = tasks.filter(id__in=task_ids)
+    return tasks
+
+
+def strike_overdue_tasks(now, task_ids=None, dry_run=False, report=None):
+    """
+    Marks every overdue task 'OVERDUE' and gives its assignee one strike per
+    task, atomically. 'task_ids' optionally narrows the candidates.
+
+    'report(task, strike_count)' is called for each struck task (streamed
+    with a chunked iterator), with the user's strike count after that task.
+    With dry_run=True nothing is written and the transaction is rolled back.
+
+    Returns {'tasks': n, 'users': n, 'strikes': n}.
+    """
+    for attempt in range(1, MAX_CONFLICT_RETRIES + 1):
+        try:
+            return _strike_once(now, task_ids, dry_run, report)
+        except DeadlineConflict:
+            if attempt == MAX_CONFLICT_RETRIES:
+                raise
+
+
+def _strike_once(now, task_ids, dry_run, report):
+    with transaction.atomic():
+        candidates = overdue_tasks(now, task_ids)
+
+        # 1. How many strikes each user is about to get (one grouped query)
+        strikes_per_user = dict(
+            candidates.order_by().values('assigned_to').annotate(n=Count('id')).values_list('assigned_to', 'n')
+        )
+        total = sum(strikes_per_user.values())
+        summary = {'tasks': total, 'users': len(strikes_per_user), 'strikes': total}
+        if not total:
+            return summary
+
+        # 2. Stream the report before the rows stop matching 'candidates'
+        if report is not None:
+            running = {}
+            reported = candidates.select_related('assigned_to__profile').only(
+                'id', 'title', 'assigned_to__username', 'assigned_to__profile__strike_count'
+            ).order_by('assigned_to_id', 'due_date', 'id')
+            for task in reported.iterator(chunk_size=REPORT_CHUNK_SIZE):
+                user_id = task.assigned_to_id
+                running[user_id] = running.get(user_id, task.assigned_to.profile.strike_count) + 1
+                report(task, running[user_id])
+
+        if dry_run:
+            transaction.set_rollback(True)
+            return summary
+
+        # 3. Flip them all in ONE UPDATE. If the count moved under us
+        #    (a task was finished or re-assigned meanwhile) roll back and retry.
+        version = SyncCounter.next_version() # V5.0: for the delta-sync endpoint
+        bump_etags( # Their tasks and strikes, everywhere they show
+            candidates.order_by().values_list('project_id', flat=True).distinct(),
+            strikes_per_user, with_projects=True,
+        )
+        flipped = candidates.update(status='OVERDUE', updated_at=timezone.now(), sync_version=version)
+        if flipped != total:
+            raise DeadlineConflict(f"Counted {total} overdue tasks but flipped {flipped}.")
+
+        # 4. Strikes, grouped by increment: every user owed k strikes in ONE UPDATE
+        users_by_increment = defaultdict(list)
+        for user_id, n in strikes_per_user.items():
+            users_by_increment[n].append(user_id)
+        for increment, user_ids in users_by_increment.items():
+            EmployeeProfile.objects.filter(user_id__in=user_ids).update(
+                strike_count=F('strike_count') + increment, sync_version=version
+            )
+
+    return summary
+
+
+# --- V5.0 DEADLINE QUEUE (for 'manage.py run_deadline_daemon') ---
+# Instead of re-scanning the task table on a cron schedule, the daemon keeps
+# the upcoming due dates in a min-heap and sleeps until the earliest one.
+#
+# - rebuild(): ONE query, bounded to tasks due before now + lookahead.
+#   Run at start-up (so a restart loses nothing) and whenever the lookahead
+#   window runs out.
+# - refresh(): fetches only tasks whose 'updated_at' moved since the last
+#   look, and upserts / drops them. Stale heap entries are skipped lazily.
+# - pop_due(): the ids whose deadline has passed, for strike_overdue_tasks(),
+#   which re-checks every condition in SQL - so a stale entry is harmless.
+
+# Re-read this much history on every refresh, so a task written by a
+# transaction that committed a little after its 'updated_at' isn't missed.
+REFRESH_OVERLAP = timedelta(seconds=60)
+DEFAULT_LOOKAHEAD = timedelta(hours=24)
+STRIKE_BATCH_SIZE = 500 # Task ids per strike_overdue_tasks() call
+
+
+def pending_deadlines():
+    """Tasks that will need a strike once their due date passes."""
+    return Task.objects.filter(
+        OPEN_TASKS,
+        due_date__isnull=False,
+        assigned_to__isnull=False,
+    )
+
+
+class DeadlineQueue:
+    """
+    Min-heap of (due_date, task_id) for open, assigned tasks due before
+    'horizon'. 'due_by_task' holds each task's current due date; heap
+    entries that disagree with it are outdated and skipped when popped.
+    """
+
+    def __init__(self, lookahead=DEFAULT_LOOKAHEAD):
+        self.lookahead = lookahead
+        self.heap = []
+        self.due_by_task = {}
+        self.horizon = None
+        self.since = None
+
+    def __len__(self):
+        return len(self.due_by_task)
+
+    def rebuild(self, now):
+        """Reload everything due before now + lookahead in ONE query."""
+        self.since = now - REFRESH_OVERLAP
+        self.horizon = now + self.lookahead
+        rows = pending_deadlines().filter(due_date__lt=self.horizon).values_list('id', 'due_date')
+        self.due_by_task = dict(rows)
+        self.heap = [(due_date, task_id) for task_id, due_date in self.due_by_task.items()]
+        heapq.heapify(self.heap)
+        return len(self.due_by_task)
+
+    def refresh(self, now):
+        """Apply the tasks changed since the last rebuild/refresh. Returns how many were read."""
+        since, self.since = self.since, now - REFRESH_OVERLAP
+        changed = Task.objects.filter(updated_at__gte=since).values_list(
+            'id', 'due_date', 'status', 'assigned_to_id'
+        )
+        count = 0
+        for task_id, due_date, status, assigned_to_id in changed.iterator(chunk_size=REPORT_CHUNK_SIZE):
+            count += 1
+            if (due_date is not None and due_date < self.horizon
+                    and status in OPEN_STATUSES and assigned_to_id is not None):
+                if self.due_by_task.get(task_id) != due_date:
+                    self.due_by_task[task_id] = due_date
+                    heapq.heappush(self.heap, (due_date, task_id))
+            else:
+                self.due_by_task.pop(task_id, None)
+        return count
+
+    def next_due(self):
+        """The earliest live due date, or None."""
+        while self.heap:
+            due_date, task_id = self.heap[0]
+            if self.due_by_task.get(task_id) == due_date:
+                return due_date
+            heapq.heappop(self.heap) # Outdated entry
+        return None
+
+    def pop_due(self, now):
+        """Remove and return the ids of every task due strictly before 'now'."""
+        due = []
+        while True:
+            due_date = self.next_due()
+            if due_date is None or due_date >= now:
+                return due
+            _, task_id = heapq.heappop(self.heap)
+            del self.due_by_task[task_id]
+            due.append(task_id)
+
+
+def strike_due_tasks(queue, now, report=None):
+    """
+    One daemon tick: pick up changes, then strike whatever the queue says has
+    expired (in batches). Returns the number of strikes assigned.
+    """
+    if queue.horizon is None or now >= queue.horizon:
+        queue.rebuild(now)
+    else:
+        queue.refresh(now)
+
+    due_ids = queue.pop_due(now)
+    strikes = 0
+    for start in range(0, len(due_ids), STRIKE_BATCH_SIZE):
+        summary = strike_overdue_tasks(now, task_ids=due_ids[start:start + STRIKE_BATCH_SIZE], report=report)
+        strikes += summary['strikes']
+    return strikes
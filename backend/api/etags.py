@@ -0,0 +1,117 @@
+# api/etags.py
+
+# --- V5.0 CONDITIONAL GET (ETags) ---
+# Clients poll GET /api/projects/<id>/, /api/auth/user/, /api/tasks/my_tasks/
+# and /api/availability/. Each of those responses is summarised by a version
+# token:
+#   - project:<id>  the project, its tasks, its members and their
+#                   dashboard figures (workload, strikes),
+#   - user:<id>     the user, their profile, the tasks assigned to them and
+#                   their availability slots.
+# The views are wrapped in django.views.decorators.http.condition(), so a
+# request whose If-None-Match still matches is answered 304 straight from the
+# token: no serializer, no prefetch, no workload read.
+#
+# Tokens are models.ResourceVersion rows (see versions.py), bumped by
+# signals.py and by every bulk write (the same places that stamp sync
+# versions) INSIDE the write's transaction, so every process - the web
+# server, the deadline cron and daemon, the job workers, run_batch_assignment
+# - sees the new token exactly when it sees the new rows. (They used to sit
+# in Django's local-memory cache, where a write made by any other process
+# never invalidated the web server's copy and it kept answering 304.)
+# Reading a token is one indexed query.
+
+import hashlib
+
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Project, ResourceVersion
+from .versions import bump_versions, get_version
+
+
+def resource_token(kind, object_id):
+    return get_version(kind, object_id)
+
+
+def bump_etags(project_ids=(), user_ids=(), with_projects=False):
+    """
+    One bump for both kinds. with_projects: the change to these users also
+    shows on the dashboards of every project they are on (their workload,
+    strikes or username).
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    project_ids = set(project_ids)
+    if with_projects and user_ids:
+        project_ids.update(Project.objects.filter(members__id__in=user_ids).values_list('id', flat=True))
+    bump_versions(
+        [('project', project_id) for project_id in project_ids]
+        + [('user', user_id) for user_id in user_ids]
+    )
+
+
+def bump_project_etags(project_ids):
+    bump_etags(project_ids=project_ids)
+
+
+def bump_user_etags(user_ids, with_projects=False):
+    bump_etags(user_ids=user_ids, with_projects=with_projects)
+
+
+# --- For condition(etag_func=...) ---
+# Weak ETags: the body also carries the global 'sync_version', which moves
+# with writes elsewhere, but everything the token covers is unchanged.
+#
+# condition() runs before the view's own checks, so the ETag functions do
+# them: a project's token is only read together with the caller's
+# membership (a non-member gets no ETag, so no 304, and the view answers
+# 404). The query parameters that change the body (?fields=, ?expand=, the
+# cursor page) are part of the ETag, so one shape or page never revalidates
+# another.
+
+VARIANT_LIST_PARAMS = ('fields', 'expand')     # Order doesn't matter
+VARIANT_VALUE_PARAMS = ('cursor', 'page_size')
+
+
+def request_variant(request):
+    """'' for the plain resource, else '-' + a short hash of the normalised parameters."""
+    parts = []
+    for name in VARIANT_LIST_PARAMS:
+        raw = request.GET.get(name)
+        if raw is not None:
+            parts.append(f"{name}={','.join(sorted({item.strip() for item in raw.split(',') if item.strip()}))}")
+    for name in VARIANT_VALUE_PARAMS:
+        raw = request.GET.get(name)
+        if raw is not None:
+            parts.append(f'{name}={raw}')
+    if not parts:
+        return ''
+    return '-' + hashlib.sha256('&'.join(parts).encode()).hexdigest()[:16]
+
+
+def member_project_token(user_id, project_id):
+    """The project's token, or None unless the user is one of its members (one query)."""
+    version = ResourceVersion.objects.filter(kind='project', object_id=OuterRef('pk')).values('version')[:1]
+    return (
+        Project.objects.filter(pk=project_id, members__id=user_id)
+        .annotate(token=Coalesce(Subquery(version), 0))
+        .values_list('token', flat=True)
+        .first()
+    )
+
+
+def project_etag(request, pk=None, **kwargs):
+    user_id = request.user.id
+    if user_id is None or pk is None or not str(pk).isdigit():
+        return None
+    token = member_project_token(user_id, int(pk))
+    if token is None:
+        return None
+    return f'W/"project-{pk}-{token}{request_variant(request)}"'
+
+
+def user_etag(request, *args, **kwargs):
+    user_id = request.user.id
+    if user_id is None:
+        return None
+    return f'W/"user-{user_id}-{resource_token("user", user_id)}{request_variant(request)}"'
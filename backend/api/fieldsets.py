@@ -0,0 +1,106 @@
+# api/fieldsets.py
+
+# --- V5.0 SPARSE FIELDSETS ---
+# GET requests can say which fields they want:
+#
+#     ?fields=id,name          only these fields
+#     ?expand=members,tasks    heavy fields that list responses leave out
+#
+# A serializer opts in with SparseFieldsMixin and declares
+#   - expandable_fields: left out of LIST responses unless ?expand= names
+#     them (a detail response still has everything),
+#   - field_columns: the model columns each field reads, for only(). A field
+#     that isn't listed reads the column of the same name; () means it
+#     reads no column of this model (computed, annotated or prefetched).
+#
+# The viewset uses SparseFieldsetViewMixin: it validates the parameters,
+# hands the chosen field names to the serializer and trims the queryset
+# with only(), so the unused columns are neither selected nor held in memory.
+# Joins and prefetches are the viewset's business (see wants_field()).
+
+from rest_framework.exceptions import ValidationError
+
+
+def query_list(request, name):
+    """'?name=a,b' -> ['a', 'b']; None if the parameter isn't there."""
+    raw = request.query_params.get(name)
+    if raw is None:
+        return None
+    return [item.strip() for item in raw.split(',') if item.strip()]
+
+
+class SparseFieldsMixin:
+    """Serializer side: accepts field_names=[...] and drops every other field."""
+    expandable_fields = ()
+    field_columns = {}
+
+    def __init__(self, *args, **kwargs):
+        field_names = kwargs.pop('field_names', None)
+        super().__init__(*args, **kwargs)
+        if field_names is not None:
+            for name in set(self.fields) - set(field_names):
+                self.fields.pop(name)
+
+    @classmethod
+    def columns_for(cls, field_names):
+        """The model columns the given fields read (for queryset.only())."""
+        columns = [cls.Meta.model._meta.pk.name]
+        for name in field_names:
+            for column in cls.field_columns.get(name, (name,)):
+                if column not in columns:
+                    columns.append(column)
+        return columns
+
+
+class SparseFieldsetViewMixin:
+    """View side: ?fields= / ?expand= for GET requests (list, retrieve and GET actions)."""
+
+    def sparse_field_names(self):
+        """
+        The fields this request renders, or None for "all of them" (writes,
+        whose responses stay complete). Unknown names are a 400.
+        """
+        if self.request.method != 'GET':
+            return None
+        if hasattr(self, '_sparse_field_names'):
+            return self._sparse_field_names
+
+        serializer_class = self.get_serializer_class()
+        declared = list(serializer_class.Meta.fields)
+        expandable = serializer_class.expandable_fields
+        fields = query_list(self.request, 'fields')
+        expand = query_list(self.request, 'expand') or []
+
+        unknown = [name for name in fields or () if name not in declared]
+        unknown += [name for name in expand if name not in expandable]
+        if unknown:
+            raise ValidationError({
+                "error": f"Unknown field(s): {', '.join(unknown)}. "
+                         f"?fields= takes {', '.join(declared)}; ?expand= takes {', '.join(expandable) or 'nothing'}."
+            })
+
+        if fields is not None:
+            names = [name for name in declared if name in fields or name in expand]
+        elif self.detail:
+            names = declared
+        else:
+            names = [name for name in declared if name not in expandable or name in expand]
+        self._sparse_field_names = names
+        return names
+
+    def wants_field(self, name):
+        names = self.sparse_field_names()
+        return names is None or name in names
+
+    def trim_queryset(self, queryset):
+        """only() the columns the requested fields read."""
+        names = self.sparse_field_names()
+        if names is None:
+            return queryset
+        return queryset.only(*self.get_serializer_class().columns_for(names))
+
+    def get_serializer(self, *args, **kwargs):
+        names = self.sparse_field_names()
+        if names is not None:
+            kwargs.setdefault('field_names', names)
+        return super().get_serializer(*args, **kwargs)
@@ -0,0 +1,206 @@
+# api/instrumentation.py
+
+# --- V5.0 REQUEST INSTRUMENTATION ---
+# Per-request numbers for "why is this endpoint slow?":
+#   - SQL query count and total DB time (a connection execute_wrapper),
+#   - time spent in named phases of the algorithms (load / score / persist),
+#   - total time and response size.
+# RequestInstrumentationMiddleware (middleware.py) collects them and reports
+# them as a Server-Timing header, a structured log line on the
+# 'api.instrumentation' logger, and an in-process rolling summary that admins
+# can read at /api/instrumentation/summary/.
+#
+# Hooks for code that wants its phases timed:
+#
+#     with phase('score'):
+#         ...
+#
+# or, in long functions, without re-indenting them:
+#
+#     start_phase('load')   # ...closes whatever phase was open
+#     ...
+#     start_phase('persist')
+#     ...
+#     end_phase()
+#
+# Outside an instrumented request (instrumentation off, background workers,
+# management commands) every hook is a single ContextVar lookup.
+
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+
+DEFAULTS = {
+    'ENABLED': False,
+    'SERVER_TIMING': True,
+    'LOG': True,
+    'SUMMARY_WINDOW': 1000,  # Requests kept per endpoint for the percentiles (0 = no summary)
+}
+
+_current = ContextVar('request_metrics', default=None)
+
+
+def instrumentation_settings():
+    return {**DEFAULTS, **getattr(settings, 'API_INSTRUMENTATION', {})}
+
+
+class RequestMetrics:
+    """What one request did. Created and finished by the middleware."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.phases = defaultdict(float) # name -> seconds
+        self.open_phase = None           # (name, started) of a start_phase() phase
+        self.total_seconds = None
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+
+    def close_open_phase(self):
+        if self.open_phase is not None:
+            name, started = self.open_phase
+            self.phases[name] += time.perf_counter() - started
+            self.open_phase = None
+
+    def finish(self):
+        self.close_open_phase()
+        self.total_seconds = time.perf_counter() - self.started
+
+
+def current_metrics():
+    """The RequestMetrics of the request being handled, or None."""
+    return _current.get()
+
+
+@contextmanager
+def collecting(metrics):
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+# --- Phase hooks ---
+
+@contextmanager
+def _timed_phase(metrics, name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.phases[name] += time.perf_counter() - started
+
+
+def phase(name):
+    """Context manager timing a block as phase 'name' of the current request."""
+    metrics = _current.get()
+    if metrics is None:
+        return nullcontext()
+    return _timed_phase(metrics, name)
+
+
+def start_phase(name):
+    """Starts phase 'name', ending the previously started one."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.close_open_phase()
+        metrics.open_phase = (name, time.perf_counter())
+
+
+def end_phase():
+    """Ends the phase opened by start_phase() (the middleware also does this at the end)."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.close_open_phase()
+
+
+# --- Reporting ---
+
+def server_timing(metrics):
+    """The Server-Timing header value: total, db, then each phase (durations in ms)."""
+    entries = [
+        f'total;dur={metrics.total_seconds * 1000:.1f}',
+        f'db;dur={metrics.db_seconds * 1000:.1f};desc="{metrics.queries} queries"',
+    ]
+    entries += [f'{name};dur={seconds * 1000:.1f}' for name, seconds in metrics.phases.items()]
+    return ', '.join(entries)
+
+
+def log_record(request, response, metrics, response_bytes):
+    match = getattr(request, 'resolver_match', None)
+    return {
+        'method': request.method,
+        'path': request.path,
+        'endpoint': endpoint_name(request),
+        'view': match.view_name if match else None,
+        'status': response.status_code,
+        'user_id': getattr(getattr(request, 'user', None), 'id', None),
+        'total_ms': round(metrics.total_seconds * 1000, 2),
+        'queries': metrics.queries,
+        'db_ms': round(metrics.db_seconds * 1000, 2),
+        'phases_ms': {name: round(seconds * 1000, 2) for name, seconds in metrics.phases.items()},
+        'response_bytes': response_bytes,
+    }
+
+
+def endpoint_name(request):
+    """'GET project-detail' - grouped by route, not by URL (ids would explode the summary)."""
+    match = getattr(request, 'resolver_match', None)
+    return f'{request.method} {match.view_name if match else "<unresolved>"}'
+
+
+class RollingSummary:
+    """The last N requests per endpoint, for percentile summaries. Thread-safe."""
+
+    FIELDS = ('total_ms', 'db_ms', 'queries', 'response_bytes')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+
+    def add(self, record, window):
+        sample = tuple(record[field] for field in self.FIELDS)
+        with self.lock:
+            samples = self.samples.get(record['endpoint'])
+            if samples is None or samples.maxlen != window:
+                samples = self.samples[record['endpoint']] = deque(samples or (), maxlen=window)
+            samples.append(sample)
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+
+    def summary(self):
+        with self.lock:
+            snapshot = {endpoint: list(samples) for endpoint, samples in self.samples.items()}
+        result = {}
+        for endpoint, samples in sorted(snapshot.items()):
+            entry = {'count': len(samples)}
+            for i, field in enumerate(self.FIELDS):
+                values = sorted(sample[i] for sample in samples if sample[i] is not None)
+                if values:
+                    entry[field] = {f'p{p}': percentile(values, p) for p in (50, 95, 99)}
+                    entry[field]['max'] = values[-1]
+            result[endpoint] = entry
+        return result
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+rolling_summary = RollingSummary()
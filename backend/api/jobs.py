@@ -0,0 +1,150 @@
+# api/jobs.py
+
+# --- V5.0 BACKGROUND JOBS ---
+# A broker-less job queue on top of the Job table:
+#   - submit_job()    : the HTTP request inserts a QUEUED row and returns 202.
+#   - claim_next_job(): a worker flips the oldest QUEUED row to RUNNING with a
+#                       conditional UPDATE, so two workers can never claim the
+#                       same job (no SELECT ... FOR UPDATE SKIP LOCKED needed,
+#                       which SQLite doesn't have).
+#   - run_job()       : runs the algorithm (in a worker process) and stores
+#                       the result or the error on the row.
+# 'manage.py run_job_worker' drives claim/run with a process pool.
+
+import os
+import socket
+import traceback
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import algorithms
+from .cache import cached_scheduler_run
+from .models import Job
+
+
+class JobAlreadyActive(Exception):
+    """An assignment job for this project is already queued or running."""
+
+    def __init__(self, job):
+        super().__init__(f"Assignment job #{job.id} is already {job.status.lower()} for this project.")
+        self.job = job
+
+
+def execute(kind, project_id, params):
+    """
+    Runs one algorithm with already-validated parameters and returns its
+    result dict. Shared by the synchronous endpoints and the worker.
+    """
+    if kind == Job.KIND_ASSIGNMENT:
+        return algorithms.run_weighted_task_assignment(
+            project_id,
+            solver=params.get('solver', 'greedy'),
+            member_hour_cap=params.get('member_hour_cap'),
+        )
+    if kind == Job.KIND_SCHEDULER:
+        # Identical requests are served from (or wait for) one computation
+        result, outcome = cached_scheduler_run(
+            project_id, params, algorithms.get_ist_week_start(),
+            lambda: _run_scheduler(project_id, params),
+        )
+        print(f"[CACHE] Scheduler result for project {project_id}: {outcome}")
+        return result
+    raise ValueError(f"Unknown job kind: {kind}")
+
+
+def _run_scheduler(project_id, params):
+    if params.get('solver') == 'genetic':
+        return algorithms.run_genetic_scheduler(project_id, params['duration_hours'])
+    return algorithms.run_exact_scheduler(
+        project_id,
+        params['duration_hours'],
+        top_k=params.get('top_k', algorithms.DEFAULT_TOP_K),
+        horizon_weeks=params.get('horizon_weeks'),
+    )
+
+
+def submit_job(kind, project, user, params):
+    """Queues a job. Raises JobAlreadyActive for a second active assignment job."""
+    try:
+        with transaction.atomic():
+            return Job.objects.create(kind=kind, project=project, submitted_by=user, params=params)
+    except IntegrityError:
+        active = Job.objects.filter(
+            project=project, kind=Job.KIND_ASSIGNMENT, status__in=Job.ACTIVE_STATUSES
+        ).first()
+        if active is None: # It finished in the meantime - just try again
+            return submit_job(kind, project, user, params)
+        raise JobAlreadyActive(active)
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_next_job(worker=None):
+    """
+    Claims the oldest QUEUED job, or returns None if there isn't one.
+    The UPDATE only succeeds while the row is still QUEUED, so if another
+    worker wins the race we simply move on to the next candidate.
+    """
+    worker = worker or worker_name()
+    while True:
+        candidate = Job.objects.filter(status='QUEUED').order_by('created_at', 'id').values_list('id', flat=True).first()
+        if candidate is None:
+            return None
+        claimed = Job.objects.filter(id=candidate, status='QUEUED').update(
+            status='RUNNING', started_at=timezone.now(), worker=worker
+        )
+        if claimed:
+            return candidate
+
+
+def run_job(job_id):
+    """
+    Runs a claimed (RUNNING) job to completion and records the outcome.
+    An algorithm that reports {"status": "error"} marks the job FAILED
+    but still keeps its result, so the message reaches the user.
+    Returns the final status.
+    """
+    job = Job.objects.get(id=job_id)
+    try:
+        result = execute(job.kind, job.project_id, job.params)
+    except Exception as e:
+        traceback.print_exc()
+        job.status = 'FAILED'
+        job.error = f"{type(e).__name__}: {e}"
+    else:
+        job.result = result
+        if result.get('status') == 'error':
+            job.status = 'FAILED'
+            job.error = result.get('message', '')
+        else:
+            job.status = 'SUCCEEDED'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+    return job.status
+
+
+def fail_job(job_id, error):
+    """Marks a job FAILED from outside run_job() (e.g. its process crashed)."""
+    return Job.objects.filter(id=job_id, status='RUNNING').update(
+        status='FAILED', error=error, finished_at=timezone.now()
+    )
+
+
+def requeue_job(job_id):
+    """Puts a claimed job that never started running back in the queue."""
+    return Job.objects.filter(id=job_id, status='RUNNING').update(
+        status='QUEUED', started_at=None, worker=''
+    )
+
+
+def requeue_abandoned_jobs(started_before):
+    """
+    Puts RUNNING jobs that were started before 'started_before' back in the
+    queue (their worker died). Returns how many were requeued.
+    """
+    return Job.objects.filter(status='RUNNING', started_at__lt=started_before).update(
+        status='QUEUED', started_at=None, worker=''
+    )
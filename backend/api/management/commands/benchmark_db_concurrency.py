@@ -0,0 +1,174 @@
+# In api/management/commands/benchmark_db_concurrency.py
+
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from ctcr_backend.database import PROFILES, sqlite_config, sqlite_pragmas
+
+# The settings before V5.0: Python's default 5s timeout, deferred
+# transactions, rollback journal, a new connection for every request.
+BARE = {
+    'profile': 'bare', 'journal_mode': None, 'synchronous': None, 'busy_timeout': 5,
+    'cache_size_mb': None, 'mmap_size_mb': None, 'conn_max_age': 0, 'transaction_mode': None,
+}
+
+SCHEMA = """
+CREATE TABLE auth_user (id INTEGER PRIMARY KEY, username TEXT NOT NULL);
+CREATE TABLE profile (user_id INTEGER PRIMARY KEY, remaining_workload REAL NOT NULL DEFAULT 0);
+CREATE TABLE task (
+    id INTEGER PRIMARY KEY, project_id INTEGER NOT NULL, title TEXT NOT NULL,
+    assigned_to_id INTEGER, estimated_hours INTEGER NOT NULL, progress INTEGER NOT NULL,
+    status TEXT NOT NULL, updated_at REAL NOT NULL
+);
+CREATE INDEX task_project_assignee ON task (project_id, assigned_to_id);
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares SQLite connection profiles (the old bare settings, 'development' "
+        "and 'production', with any SQLITE_* / DB_CONN_MAX_AGE overrides from the "
+        "environment) under concurrent writers (progress updates + workload ledger) "
+        "and readers (project dashboards). Runs on a scratch database file; the "
+        "real database isn't touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4, help="Writer threads (default: 4).")
+        parser.add_argument('--readers', type=int, default=8, help="Reader threads (default: 8).")
+        parser.add_argument('--seconds', type=float, default=5.0, help="Duration per profile (default: 5).")
+        parser.add_argument('--tasks', type=int, default=50_000, help="Tasks in the scratch database (default: 50,000).")
+        parser.add_argument('--profiles', nargs='+', default=['bare', *PROFILES],
+                            help="Profiles to compare (default: bare development production).")
+
+    def handle(self, *args, **options):
+        configs = []
+        for name in options['profiles']:
+            if name == 'bare':
+                configs.append(BARE)
+            elif name in PROFILES:
+                configs.append(dict(sqlite_config({**os.environ, 'DB_PROFILE': name}), transaction_mode='IMMEDIATE'))
+            else:
+                raise CommandError(f"Unknown profile '{name}'.")
+
+        self.stdout.write(
+            f"--- {options['writers']} writer(s) + {options['readers']} reader(s), "
+            f"{options['seconds']:.0f}s per profile, {options['tasks']:,} tasks ---"
+        )
+        self.stdout.write(f"{'profile':<13}{'writes/s':>10}{'reads/s':>10}{'locked':>8}{'write p95':>11}{'read p95':>10}")
+        with tempfile.TemporaryDirectory() as scratch:
+            for config in configs:
+                # A fresh copy of the same data for every profile
+                path = Path(scratch) / f"{config['profile']}.sqlite3"
+                self.seed(path, options['tasks'])
+                stats = self.run(path, config, options)
+                self.stdout.write(
+                    f"{config['profile']:<13}{stats['writes'] / options['seconds']:>10.0f}"
+                    f"{stats['reads'] / options['seconds']:>10.0f}{stats['locked']:>8}"
+                    f"{stats['write_p95']:>9.1f}ms{stats['read_p95']:>8.1f}ms"
+                )
+
+    def seed(self, path, task_count):
+        rng = random.Random(19)
+        conn = sqlite3.connect(path)
+        conn.executescript(SCHEMA)
+        conn.executemany("INSERT INTO auth_user VALUES (?, ?)", [(i, f'user{i}') for i in range(1, 501)])
+        conn.executemany("INSERT INTO profile (user_id) VALUES (?)", [(i,) for i in range(1, 501)])
+        conn.executemany(
+            "INSERT INTO task VALUES (?, ?, ?, ?, ?, ?, 'TODO', 0)",
+            [(i, rng.randint(1, 200), f'task {i}', rng.randint(1, 500), rng.randint(1, 8), 0)
+             for i in range(1, task_count + 1)],
+        )
+        conn.commit()
+        conn.close()
+
+    def connect(self, path, config):
+        """Like Django does it: open, then run the profile's PRAGMAs."""
+        conn = sqlite3.connect(path, timeout=config['busy_timeout'], isolation_level=None, check_same_thread=False)
+        for pragma in sqlite_pragmas(config):
+            conn.execute(pragma)
+        return conn
+
+    def run(self, path, config, options):
+        # Switch the file's journal mode once up front, as the first production connection would
+        self.connect(path, config).close()
+
+        task_count = options['tasks']
+        deadline = time.monotonic() + options['seconds']
+        lock = threading.Lock()
+        stats = {'writes': 0, 'reads': 0, 'locked': 0, 'write_ms': [], 'read_ms': []}
+        begin = f"BEGIN {config['transaction_mode']}" if config['transaction_mode'] else "BEGIN"
+
+        def set_progress(conn, rng):
+            task_id = rng.randint(1, task_count)
+            conn.execute(begin)
+            try:
+                assigned_to, hours, progress = conn.execute(
+                    "SELECT assigned_to_id, estimated_hours, progress FROM task WHERE id = ?", (task_id,)
+                ).fetchone()
+                new_progress = (progress + 25) % 125
+                conn.execute("UPDATE task SET progress = ?, updated_at = ? WHERE id = ?", (new_progress, time.time(), task_id))
+                conn.execute(
+                    "UPDATE profile SET remaining_workload = remaining_workload + ? WHERE user_id = ?",
+                    (hours * (progress - new_progress) / 100.0, assigned_to),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        def dashboard(conn, rng):
+            project_id = rng.randint(1, 200)
+            conn.execute(
+                "SELECT t.id, t.title, t.progress, u.username FROM task t "
+                "LEFT JOIN auth_user u ON u.id = t.assigned_to_id WHERE t.project_id = ?", (project_id,)
+            ).fetchall()
+            conn.execute(
+                "SELECT assigned_to_id, SUM(estimated_hours * (1 - progress / 100.0)) FROM task "
+                "WHERE project_id = ? GROUP BY assigned_to_id", (project_id,)
+            ).fetchall()
+
+        def worker(operation, kind, seed):
+            rng = random.Random(seed)
+            persistent = self.connect(path, config) if config['conn_max_age'] else None
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                conn = persistent or self.connect(path, config)
+                try:
+                    operation(conn, rng)
+                except sqlite3.OperationalError as e:
+                    if 'locked' not in str(e) and 'busy' not in str(e):
+                        raise
+                    with lock:
+                        stats['locked'] += 1
+                    continue
+                finally:
+                    if persistent is None:
+                        conn.close()
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    stats[f'{kind}s'] += 1
+                    stats[f'{kind}_ms'].append(elapsed)
+            if persistent is not None:
+                persistent.close()
+
+        threads = [threading.Thread(target=worker, args=(set_progress, 'write', i)) for i in range(options['writers'])]
+        threads += [threading.Thread(target=worker, args=(dashboard, 'read', 1000 + i)) for i in range(options['readers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        def p95(samples):
+            return statistics.quantiles(samples, n=20)[-1] if len(samples) >= 2 else (samples[0] if samples else 0.0)
+
+        stats['write_p95'] = p95(stats['write_ms'])
+        stats['read_p95'] = p95(stats['read_ms'])
+        return stats
@@ -0,0 +1,98 @@
+# In api/management/commands/benchmark_indexes.py
+
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from api.deadlines import overdue_tasks, pending_deadlines
+from api.models import AvailabilitySlot, Project, Task
+from api.perfdata import seed_perf_data
+from api.workload import aggregate_remaining_workloads
+
+# The V5.0 hot-query indexes (see the Meta of Task and AvailabilitySlot)
+HOT_INDEXES = [
+    'task_assignee_progress_idx',
+    'task_project_assignee_idx',
+    'task_open_due_date_idx',
+    'slot_employee_start_idx',
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the hot queries (workload, backlog, dashboard, deadlines, scheduler "
+        "window) with and without the V5.0 composite/partial indexes. Seeds a "
+        "synthetic dataset first (api/perfdata.py); EVERYTHING (seed data, dropped indexes) is "
+        "rolled back at the end, so the database is left as it was."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1_000_000, help="Synthetic tasks to seed (default: 1,000,000). 0 uses the existing data.")
+        parser.add_argument('--users', type=int, default=2000, help="Synthetic users to seed (default: 2000).")
+        parser.add_argument('--projects', type=int, default=200, help="Synthetic projects to seed (default: 200).")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per query; the best time is reported (default: 5).")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed (default: 42).")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback()
+        except Rollback:
+            self.stdout.write("--- Rolled back: seed data removed, indexes restored ---")
+
+    def run(self, options):
+        now = timezone.now()
+        if options['tasks']:
+            started = time.perf_counter()
+            seed_perf_data(
+                options['users'], options['projects'], options['tasks'], slots=options['users'] * 20,
+                seed=options['seed'], now=now, prefix=f"bench{options['seed']}",
+            )
+            self.stdout.write(f"Seeded {options['tasks']:,} tasks in {time.perf_counter() - started:.1f}s.")
+
+        project = Project.objects.filter(tasks__isnull=False).order_by('id').first()
+        if project is None:
+            self.stdout.write(self.style.WARNING("No tasks to benchmark. Use --tasks N."))
+            return
+        member = project.members.order_by('id').first()
+        sample_users = list(User.objects.filter(tasks__isnull=False).values_list('id', flat=True).distinct()[:50])
+
+        queries = [
+            ("workload (50 users)", lambda: aggregate_remaining_workloads(sample_users)),
+            ("unassigned backlog", lambda: list(project.tasks.filter(assigned_to=None).values_list('id', flat=True))),
+            ("member's project tasks", lambda: list(Task.objects.filter(assigned_to=member, project=project).values_list('id', flat=True))),
+            ("overdue tasks", lambda: overdue_tasks(now).count()),
+            ("deadlines due in 24h", lambda: pending_deadlines().filter(due_date__lt=now + timedelta(hours=24)).count()),
+            ("scheduler week window", lambda: list(AvailabilitySlot.objects.filter(
+                employee__projects=project, end_time__gt=now, start_time__lt=now + timedelta(days=5),
+            ).values_list('employee_id', 'start_time', 'end_time'))),
+        ]
+
+        with_indexes = self.time_all(queries, options['repeat'])
+        with connection.cursor() as cursor:
+            for name in HOT_INDEXES:
+                cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+        without_indexes = self.time_all(queries, options['repeat'])
+
+        self.stdout.write(f"\n{'query':<26}{'with (ms)':>12}{'without (ms)':>15}{'speed-up':>11}")
+        for (label, _), fast, slow in zip(queries, with_indexes, without_indexes):
+            self.stdout.write(f"{label:<26}{fast:>12.2f}{slow:>15.2f}{slow / max(fast, 1e-6):>10.1f}x")
+
+    def time_all(self, queries, repeat):
+        timings = []
+        for _, run in queries:
+            best = float('inf')
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run()
+                best = min(best, time.perf_counter() - started)
+            timings.append(best * 1000)
+        return timings
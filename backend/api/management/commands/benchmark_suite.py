@@ -0,0 +1,240 @@
+# In api/management/commands/benchmark_suite.py
+
+import contextlib
+import io
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import django
+import numpy as np
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from api import algorithms
+from api.etags import project_etag, user_etag
+from api.models import Project, Task
+from api.perfdata import busiest_project, seed_perf_data
+from api.views import ProjectViewSet, TaskViewSet
+
+SCALES = {
+    'small':  {'users': 50,   'projects': 5,   'tasks': 1_000,   'slots': 500},
+    'medium': {'users': 500,  'projects': 50,  'tasks': 20_000,  'slots': 5_000},
+    'large':  {'users': 2000, 'projects': 200, 'tasks': 200_000, 'slots': 20_000},
+}
+REPORT_VERSION = 1
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextlib.contextmanager
+def rolled_back():
+    """Everything inside is undone afterwards (a savepoint, or the outer transaction)."""
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback()
+    except Rollback:
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "End-to-end performance suite: seeds a deterministic dataset at each scale "
+        "(api/perfdata.py) and measures wall time, SQL query count and peak Python "
+        "memory of task assignment, the genetic scheduler, check_deadlines, the "
+        "project detail endpoint and my_tasks. Prints a JSON report (or writes it "
+        "to --output) that can be diffed between commits with --compare. "
+        "Nothing is left in the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', nargs='+', default=['small', 'medium'], choices=list(SCALES),
+                            help="Dataset sizes to run (default: small medium).")
+        parser.add_argument('--repeat', type=int, default=3, help="Timed runs per benchmark (default: 3).")
+        parser.add_argument('--seed', type=int, default=0, help="Dataset and algorithm seed (default: 0).")
+        parser.add_argument('--output', help="Write the JSON report here instead of stdout.")
+        parser.add_argument('--compare', metavar='BASELINE', help="A previous report to compare against.")
+        parser.add_argument('--tolerance', type=float, default=1.25,
+                            help="With --compare: flag a benchmark whose median wall time grew by more than this factor (default: 1.25).")
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help="With --compare: exit with an error if anything regressed.")
+
+    def handle(self, *args, **options):
+        report = {
+            'version': REPORT_VERSION,
+            'commit': self.git_commit(),
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'seed': options['seed'],
+            'repeat': options['repeat'],
+            'scales': {},
+        }
+        for scale in options['scales']:
+            self.stderr.write(f"--- Scale '{scale}': {SCALES[scale]} ---")
+            report['scales'][scale] = self.run_scale(scale, options)
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(f"Report written to {options['output']}.")
+        else:
+            self.stdout.write(output)
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                regressions = self.compare(json.load(f), report, options['tolerance'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f"{regressions} benchmark(s) regressed.")
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    # --- One scale ---
+
+    def run_scale(self, scale, options):
+        result = {}
+        with rolled_back():
+            started = time.perf_counter()
+            dataset = seed_perf_data(**SCALES[scale], seed=options['seed'], prefix=f"suite{options['seed']}")
+            result['dataset'] = dataset.summary()
+            result['seed_seconds'] = round(time.perf_counter() - started, 3)
+
+            project_id = busiest_project(dataset)
+            project = Project.objects.select_related('leader').get(id=project_id)
+            busiest_member = (
+                Task.objects.filter(assigned_to__in=dataset.user_ids, status__in=['TODO', 'IN_PROGRESS'])
+                .values('assigned_to').annotate(n=Count('id')).order_by('-n', 'assigned_to').first()
+            )
+            member = project.leader if busiest_member is None else type(project.leader).objects.get(id=busiest_member['assigned_to'])
+            result['targets'] = {
+                'project_id': project_id, 'project_tasks': project.tasks.count(),
+                'project_backlog': project.tasks.filter(assigned_to=None).count(),
+                'project_members': project.members.count(), 'my_tasks_user_open_tasks': busiest_member and busiest_member['n'],
+            }
+
+            factory = APIRequestFactory()
+            project_detail = ProjectViewSet.as_view({'get': 'retrieve'})
+            my_tasks = TaskViewSet.as_view({'get': 'my_tasks'})
+
+            def get(view, path, user, etag=None, **kwargs):
+                # etag: a client polling with If-None-Match while nothing changed (expects a 304)
+                request = factory.get(path, **({'HTTP_IF_NONE_MATCH': etag(user, **kwargs)} if etag else {}))
+                force_authenticate(request, user=user)
+                response = view(request, **kwargs)
+                if hasattr(response, 'render'):
+                    response.render()
+                expected = 304 if etag else 200
+                if response.status_code != expected:
+                    raise CommandError(f"GET {path} returned {response.status_code}, expected {expected}.")
+                return len(response.content)
+
+            def current_etag(etag_func):
+                # The ETag an up-to-date client holds (of the plain resource: no query parameters)
+                return lambda user, **kwargs: etag_func(SimpleNamespace(user=user, GET={}), **kwargs)
+
+            benchmarks = [
+                ('project_detail', lambda: get(project_detail, f'/api/projects/{project_id}/', project.leader, pk=project_id)),
+                ('my_tasks', lambda: get(my_tasks, '/api/tasks/my_tasks/', member)),
+                ('project_detail_not_modified', lambda: get(
+                    project_detail, f'/api/projects/{project_id}/', project.leader, etag=current_etag(project_etag), pk=project_id)),
+                ('my_tasks_not_modified', lambda: get(
+                    my_tasks, '/api/tasks/my_tasks/', member, etag=current_etag(user_etag))),
+                ('check_deadlines', lambda: call_command('check_deadlines', quiet=True, stdout=io.StringIO())),
+                ('run_weighted_task_assignment', lambda: algorithms.run_weighted_task_assignment(project_id)),
+                ('run_genetic_scheduler', lambda: algorithms.run_genetic_scheduler(project_id, 1)),
+            ]
+            result['benchmarks'] = {
+                name: self.measure(run, options['repeat'], options['seed']) for name, run in benchmarks
+            }
+            for name, measured in result['benchmarks'].items():
+                self.stderr.write(
+                    f"  {name:<30}{measured['wall_ms']['median']:>10.1f} ms{measured['queries']:>7} queries"
+                    f"{measured['peak_memory_kb']:>10.0f} KiB"
+                )
+        return result
+
+    def measure(self, run, repeat, seed):
+        """
+        Every run starts from the same state (each is rolled back) and the
+        same random seed. Timed runs count queries; one extra run under
+        tracemalloc (which slows things down) gives the peak memory.
+        """
+        def one_run():
+            cache.clear()
+            random.seed(seed)
+            np.random.seed(seed)
+            with rolled_back(), contextlib.redirect_stdout(io.StringIO()): # The algorithms print() a lot
+                return run()
+
+        wall_ms, queries = [], []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                outcome = one_run()
+                wall_ms.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+
+        tracemalloc.start()
+        try:
+            one_run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        measured = {
+            'wall_ms': {
+                'best': round(min(wall_ms), 3),
+                'median': round(statistics.median(wall_ms), 3),
+                'runs': [round(ms, 3) for ms in wall_ms],
+            },
+            'queries': max(queries),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+        if isinstance(outcome, int):
+            measured['response_bytes'] = outcome
+        return measured
+
+    # --- Diffing two reports ---
+
+    def compare(self, baseline, current, tolerance):
+        self.stderr.write(f"\n--- Compared with {baseline.get('commit') or 'baseline'} ---")
+        regressions = 0
+        for scale, result in current['scales'].items():
+            old_scale = baseline.get('scales', {}).get(scale)
+            if old_scale is None:
+                continue
+            for name, measured in result['benchmarks'].items():
+                old = old_scale['benchmarks'].get(name)
+                if old is None:
+                    continue
+                ratio = measured['wall_ms']['median'] / max(old['wall_ms']['median'], 1e-6)
+                query_delta = measured['queries'] - old['queries']
+                regressed = ratio > tolerance or query_delta > 0
+                regressions += regressed
+                flag = self.style.ERROR('REGRESSION') if regressed else ''
+                self.stderr.write(
+                    f"  {scale:<7}{name:<30}{ratio:>7.2f}x time{query_delta:>+6} queries  {flag}"
+                )
+        return regressions
@@ -0,0 +1,34 @@
+# In api/management/commands/prune_sync_events.py
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from api.models import SyncCounter, SyncEvent
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes delta-sync tombstones (SyncEvent rows) older than --days. "
+        "Clients that last synced before the newest pruned event are told to "
+        "re-fetch the whole project instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help="Keep this many days of events (default: 30).")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        with transaction.atomic():
+            old = SyncEvent.objects.filter(created_at__lt=cutoff)
+            newest = old.aggregate(newest=Max('version'))['newest']
+            if newest is None:
+                self.stdout.write("Nothing to prune.")
+                return
+            deleted, _ = old.delete()
+            # Make sure the counter row exists, then move the horizon forward
+            SyncCounter.objects.get_or_create(pk=SyncCounter.ROW_ID)
+            SyncCounter.objects.filter(pk=SyncCounter.ROW_ID, pruned_through__lt=newest).update(pruned_through=newest)
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} event(s) up to version {newest}."))
@@ -0,0 +1,20 @@
+# In api/management/commands/rebuild_skill_index.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from api.models import EmployeeProfile
+from api.skills import rebuild_skill_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-syncs the Skill / MemberSkill index from every EmployeeProfile's "
+        "profile_data (e.g. after profiles were edited with queryset.update())."
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write("--- Rebuilding Skill Index ---")
+        with transaction.atomic():
+            profiles = EmployeeProfile.objects.only('user_id', 'profile_data')
+            changed = rebuild_skill_index(profiles.iterator(chunk_size=500))
+        self.stdout.write(self.style.SUCCESS(f"Re-indexed {changed} profile(s); the rest were already in sync."))
@@ -0,0 +1,55 @@
+# In api/management/commands/rebuild_workload_ledger.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from api.etags import bump_user_etags
+from api.models import EmployeeProfile, SyncCounter
+from api.workload import aggregate_remaining_workloads, LEDGER_TOLERANCE
+
+
+class Command(BaseCommand):
+    help = (
+        "Verifies EmployeeProfile.remaining_workload against a from-scratch SUM "
+        "over the task table, and rewrites any profile that has drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only report drift (exit with an error if any is found); don't write anything.",
+        )
+
+    def handle(self, *args, **options):
+        check_only = options['check']
+        self.stdout.write("--- Verifying Workload Ledger ---")
+
+        with transaction.atomic():
+            # Lock the profiles first, so task saves that land while we're
+            # summing wait for us instead of being overwritten by the rebuild.
+            profiles = list(EmployeeProfile.objects.select_for_update().select_related('user'))
+            expected = aggregate_remaining_workloads()
+
+            drifted = []
+            for profile in profiles:
+                correct = expected.get(profile.user_id, 0.0)
+                if abs(profile.remaining_workload - correct) > LEDGER_TOLERANCE:
+                    self.stdout.write(self.style.WARNING(
+                        f"  > DRIFT: {profile.user.username} has {profile.remaining_workload:.4f}h "
+                        f"on the ledger, tasks add up to {correct:.4f}h."
+                    ))
+                    profile.remaining_workload = correct
+                    drifted.append(profile)
+
+            if not drifted:
+                self.stdout.write(self.style.SUCCESS(f"All {len(profiles)} profile(s) match. Ledger is consistent."))
+                return
+
+            if check_only:
+                raise CommandError(f"{len(drifted)} of {len(profiles)} profile(s) have drifted. Run without --check to rebuild.")
+
+            sync_version = SyncCounter.next_version() # Dashboards show the workload
+            for profile in drifted:
+                profile.sync_version = sync_version
+            EmployeeProfile.objects.bulk_update(drifted, ['remaining_workload', 'sync_version'], batch_size=500)
+            bump_user_etags((profile.user_id for profile in drifted), with_projects=True)
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(drifted)} of {len(profiles)} profile(s)."))
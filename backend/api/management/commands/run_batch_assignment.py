@@ -0,0 +1,48 @@
+# In api/management/commands/run_batch_assignment.py
+
+import math
+
+from django.core.management.base import BaseCommand, CommandError
+from api import algorithms
+
+
+class Command(BaseCommand):
+    help = (
+        "Assigns the unassigned tasks of many (or all) projects in one pass, "
+        "with one shared view of every member's workload."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--project', type=int, action='append', dest='project_ids',
+            help="Project id to include (repeatable). Default: every project.",
+        )
+        parser.add_argument(
+            '--solver', choices=algorithms.ASSIGNMENT_SOLVERS, default='greedy',
+            help="'greedy' (default) or 'optimal' (whole-batch LP-rounding heuristic).",
+        )
+        parser.add_argument(
+            '--member-hour-cap', type=float, default=None,
+            help="Hour cap per member for the 'optimal' solver.",
+        )
+
+    def handle(self, *args, **options):
+        cap = options['member_hour_cap']
+        if cap is not None and (not math.isfinite(cap) or cap < 0):
+            raise CommandError("--member-hour-cap must be a non-negative number of hours.")
+        result = algorithms.run_batch_task_assignment(
+            options['project_ids'], solver=options['solver'], member_hour_cap=options['member_hour_cap']
+        )
+        if result['status'] == 'error':
+            raise CommandError(result['message'])
+
+        self.stdout.write(f"{'Project':<30} {'Assigned':>10} {'Time (ms)':>10}  Status")
+        for report in result['projects']:
+            name = f"#{report['project_id']} {report['name']}"[:30]
+            line = f"{name:<30} {report['assigned']:>4}/{report['tasks']:<5} {report['ms']:>10.2f}  {report['status']}"
+            style = self.style.ERROR if report['status'] == 'error' else self.style.SUCCESS
+            self.stdout.write(style(line))
+        self.stdout.write(
+            f"--- {result['rows_written']} task(s) assigned across {len(result['projects'])} project(s) "
+            f"in {result['total_ms']:.1f} ms (write: {result['write_ms']:.1f} ms). ---"
+        )
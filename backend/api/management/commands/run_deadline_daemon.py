@@ -0,0 +1,68 @@
+# In api/management/commands/run_deadline_daemon.py
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+from api.deadlines import DeadlineQueue, strike_due_tasks
+
+# Wake up slightly after a deadline, so 'due_date < now' is already true
+WAKE_MARGIN_SECONDS = 0.05
+
+
+class Command(BaseCommand):
+    help = (
+        "Long-running alternative to the 'check_deadlines' cron job: keeps "
+        "upcoming deadlines in a priority queue and strikes each task as it expires."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll-seconds', type=float, default=30.0,
+            help="Longest sleep between checks for newly changed tasks (default: 30).",
+        )
+        parser.add_argument(
+            '--lookahead-hours', type=float, default=24.0,
+            help="How far ahead the in-memory queue reaches before it's rebuilt (default: 24).",
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Run a single tick and exit (useful for testing).",
+        )
+
+    def handle(self, *args, **options):
+        poll_seconds = options['poll_seconds']
+        queue = DeadlineQueue(lookahead=timedelta(hours=options['lookahead_hours']))
+
+        now = timezone.now()
+        loaded = queue.rebuild(now) # Restart-safe: everything comes back from the DB
+        self.stdout.write(f"[{now.isoformat()}] --- Deadline daemon started, {loaded} deadline(s) queued ---")
+
+        def report(task, strike_count):
+            self.stdout.write(self.style.WARNING(
+                f"  > STRIKE: '{task.title}' (Assigned to: {task.assigned_to.username}) "
+                f"is overdue. User now has {strike_count} strike(s)."
+            ))
+
+        try:
+            while True:
+                close_old_connections() # Long-lived process: don't hold a dead connection
+                now = timezone.now()
+                strikes = strike_due_tasks(queue, now, report=report)
+                if strikes:
+                    self.stdout.write(f"[{now.isoformat()}] {strikes} strike(s) assigned.")
+
+                if options['once']:
+                    return
+
+                # Sleep until the next deadline, but wake up in time to pick
+                # up new tasks (poll) and to rebuild at the end of the window.
+                wake_at = min(queue.horizon, now + timedelta(seconds=poll_seconds))
+                next_due = queue.next_due()
+                if next_due is not None:
+                    wake_at = min(wake_at, next_due)
+                time.sleep(max((wake_at - timezone.now()).total_seconds(), 0) + WAKE_MARGIN_SECONDS)
+        except KeyboardInterrupt:
+            self.stdout.write("--- Deadline daemon stopped ---")
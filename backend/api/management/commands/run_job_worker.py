@@ -0,0 +1,136 @@
+# In api/management/commands/run_job_worker.py
+
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.utils import timezone
+from api.jobs import claim_next_job, run_job, fail_job, requeue_abandoned_jobs, requeue_job, worker_name
+
+
+def _init_worker_process():
+    """
+    Runs once in every pool process. Under 'spawn' Django isn't set up yet;
+    under 'fork' the child inherited the parent's DB connections, which must
+    not be shared, so drop them and let the child open its own.
+    """
+    django.setup()
+    connections.close_all()
+
+
+def _run_job_in_process(job_id):
+    try:
+        return run_job(job_id)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs queued background jobs (task assignment, meeting scheduling) "
+        "in a local process pool. No external broker needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=2,
+            help="Jobs run in parallel (default: 2). 0 runs them one by one in this process.",
+        )
+        parser.add_argument(
+            '--poll-seconds', type=float, default=1.0,
+            help="How often to look for new jobs when idle (default: 1).",
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help="Exit once the queue is empty and nothing is running.",
+        )
+        parser.add_argument(
+            '--requeue-after-minutes', type=float, default=None,
+            help="On start-up, requeue RUNNING jobs older than this (their worker died).",
+        )
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        poll_seconds = options['poll_seconds']
+        me = worker_name()
+
+        if options['requeue_after_minutes'] is not None:
+            cutoff = timezone.now() - timedelta(minutes=options['requeue_after_minutes'])
+            requeued = requeue_abandoned_jobs(cutoff)
+            if requeued:
+                self.stdout.write(self.style.WARNING(f"Requeued {requeued} abandoned job(s)."))
+
+        self.stdout.write(f"--- Job worker {me} started ({processes or 'inline'} process(es)) ---")
+        try:
+            if processes == 0:
+                self.run_inline(me, poll_seconds, options['burst'])
+            else:
+                self.run_pool(me, processes, poll_seconds, options['burst'])
+        except KeyboardInterrupt:
+            self.stdout.write("--- Job worker stopped ---")
+
+    def report(self, job_id, final_status):
+        style = self.style.SUCCESS if final_status == 'SUCCEEDED' else self.style.ERROR
+        self.stdout.write(style(f"  > Job #{job_id}: {final_status}"))
+
+    def run_inline(self, me, poll_seconds, burst):
+        while True:
+            close_old_connections()
+            job_id = claim_next_job(me)
+            if job_id is None:
+                if burst:
+                    return
+                time.sleep(poll_seconds)
+                continue
+            self.report(job_id, run_job(job_id))
+
+    def new_pool(self, processes):
+        # Don't hand the parent's connection to forked children
+        connections.close_all()
+        return ProcessPoolExecutor(max_workers=processes, initializer=_init_worker_process)
+
+    def run_pool(self, me, processes, poll_seconds, burst):
+        running = {}
+        pool = self.new_pool(processes)
+        try:
+            while True:
+                close_old_connections()
+                # Fill every free slot; jobs for different projects run side by side
+                while len(running) < processes:
+                    job_id = claim_next_job(me)
+                    if job_id is None:
+                        break
+                    try:
+                        future = pool.submit(_run_job_in_process, job_id)
+                    except BrokenProcessPool:
+                        # A pool process died since the last look, and a broken pool
+                        # takes no more work: put the job back and start a fresh pool
+                        requeue_job(job_id)
+                        self.stdout.write(self.style.WARNING(f"  > Job #{job_id}: requeued (a worker process died)"))
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        pool = self.new_pool(processes)
+                        continue
+                    self.stdout.write(f"  > Job #{job_id}: started")
+                    running[future] = job_id
+
+                if not running:
+                    if burst:
+                        return
+                    time.sleep(poll_seconds)
+                    continue
+
+                done, _ = wait(running, timeout=poll_seconds, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = running.pop(future)
+                    try:
+                        self.report(job_id, future.result())
+                    except Exception as e:
+                        # The process itself died, so the job row is still RUNNING
+                        fail_job(job_id, f"Worker process failed: {e}")
+                        self.report(job_id, 'FAILED')
+        finally:
+            pool.shutdown(wait=True)
@@ -0,0 +1,42 @@
+# In api/management/commands/seed_perf_data.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from api.perfdata import dataset_prefix, delete_dataset, existing_dataset, seed_perf_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a deterministic synthetic dataset for performance work: users with "
+        "realistic skills/preferences, projects, tasks and availability slots. "
+        "The same --seed always produces the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help="Users (with profiles) to create (default: 200).")
+        parser.add_argument('--projects', type=int, default=20, help="Projects to create (default: 20).")
+        parser.add_argument('--tasks', type=int, default=10_000, help="Tasks to create (default: 10,000).")
+        parser.add_argument('--slots', type=int, default=4000, help="Availability slots to create (default: 4000).")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed; also names the dataset (default: 0).")
+        parser.add_argument('--clear', action='store_true', help="Delete this seed's dataset first (or only, with --users 0).")
+
+    def handle(self, *args, **options):
+        seed = options['seed']
+        prefix = dataset_prefix(seed)
+        with transaction.atomic():
+            if options['clear']:
+                deleted = delete_dataset(seed)
+                self.stdout.write(f"Deleted the '{prefix}' dataset ({deleted} rows).")
+            elif existing_dataset(seed):
+                raise CommandError(f"The '{prefix}' dataset already exists. Use --clear to regenerate it, or another --seed.")
+            if not options['users']:
+                return
+
+            started = time.perf_counter()
+            dataset = seed_perf_data(options['users'], options['projects'], options['tasks'], options['slots'], seed=seed)
+            summary = ', '.join(f"{count:,} {name}" for name, count in dataset.summary().items())
+            self.stdout.write(self.style.SUCCESS(
+                f"Seeded '{prefix}': {summary} in {time.perf_counter() - started:.1f}s."
+            ))
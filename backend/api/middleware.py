@@ -0,0 +1,75 @@
+# api/middleware.py
+
+import json
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from ctcr_backend.database import READ_REPLICA_ALIAS
+from .db_router import read_replica
+from .instrumentation import (
+    RequestMetrics, collecting, instrumentation_settings, log_record, rolling_summary, server_timing,
+)
+
+READ_ONLY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+logger = logging.getLogger('api.instrumentation')
+
+
+class RequestInstrumentationMiddleware:
+    """
+    V5.0: Counts each request's SQL queries and DB time, times the algorithm
+    phases it runs (see instrumentation.py) and reports them as a
+    Server-Timing header, a JSON log line and the rolling admin summary.
+    Removes itself from the stack unless API_INSTRUMENTATION['ENABLED'].
+    """
+
+    def __init__(self, get_response):
+        config = instrumentation_settings()
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.server_timing = config['SERVER_TIMING']
+        self.log = config['LOG']
+        self.window = config['SUMMARY_WINDOW']
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        with collecting(metrics), ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics.record_query))
+            response = self.get_response(request)
+        metrics.finish()
+
+        response_bytes = None if response.streaming else len(response.content)
+        if self.server_timing:
+            response['Server-Timing'] = server_timing(metrics)
+        if self.log or self.window:
+            record = log_record(request, response, metrics, response_bytes)
+            if self.log:
+                logger.info(json.dumps(record, sort_keys=True), extra={'instrumentation': record})
+            if self.window:
+                rolling_summary.add(record, self.window)
+        return response
+
+
+class ReadReplicaMiddleware:
+    """
+    V5.0: Serves the reads of GET/HEAD/OPTIONS requests from the read-only
+    replica connection (see db_router.py). Removes itself from the stack
+    when no replica is configured.
+    """
+
+    def __init__(self, get_response):
+        if READ_REPLICA_ALIAS not in settings.DATABASES:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in READ_ONLY_METHODS:
+            return self.get_response(request)
+        with read_replica():
+            return self.get_response(request)
@@ -0,0 +1,39 @@
+from django.db import migrations, models
+from django.db.models import F, FloatField, Sum
+from django.db.models.functions import Coalesce
+
+
+def populate_remaining_workload(apps, schema_editor):
+    """Seed the new ledger from the tasks, with the same formula as the old SUM."""
+    EmployeeProfile = apps.get_model('api', 'EmployeeProfile')
+    Task = apps.get_model('api', 'Task')
+
+    totals = dict(
+        Task.objects.filter(assigned_to__isnull=False, progress__lt=100)
+        .values('assigned_to')
+        .annotate(total=Coalesce(
+            Sum(F('estimated_hours') * (1.0 - F('progress') / 100.0), output_field=FloatField()),
+            0.0,
+        ))
+        .values_list('assigned_to', 'total')
+    )
+    profiles = list(EmployeeProfile.objects.filter(user_id__in=totals))
+    for profile in profiles:
+        profile.remaining_workload = totals[profile.user_id]
+    EmployeeProfile.objects.bulk_update(profiles, ['remaining_workload'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_remove_employeeprofile_current_workload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employeeprofile',
+            name='remaining_workload',
+            field=models.FloatField(default=0.0, help_text='Hours of unfinished assigned work (maintained ledger).'),
+        ),
+        migrations.RunPython(populate_remaining_workload, migrations.RunPython.noop),
+    ]
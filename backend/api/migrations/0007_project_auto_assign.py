@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 05:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='auto_assign',
+            field=models.BooleanField(default=False, help_text='Assign each new task as soon as it is created.'),
+        ),
+    ]
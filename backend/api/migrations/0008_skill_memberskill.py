@@ -0,0 +1,66 @@
+# Generated by Django 5.2.7 on 2026-10-17 05:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_skill_index(apps, schema_editor):
+    """Index every existing profile's skills (same canonical form as scoring.canonical_skill_name)."""
+    EmployeeProfile = apps.get_model('api', 'EmployeeProfile')
+    Skill = apps.get_model('api', 'Skill')
+    MemberSkill = apps.get_model('api', 'MemberSkill')
+
+    displays = {}
+    levels = {}
+    for user_id, profile_data in EmployeeProfile.objects.values_list('user_id', 'profile_data'):
+        skills = (profile_data or {}).get('skills', {})
+        if not isinstance(skills, dict):
+            continue
+        for name, level in skills.items():
+            display = ' '.join(str(name).split())
+            canonical = display.casefold()
+            if not canonical or isinstance(level, bool) or not isinstance(level, (int, float)):
+                continue
+            displays.setdefault(canonical, display)
+            levels[user_id, canonical] = max(level, levels.get((user_id, canonical), level))
+
+    Skill.objects.bulk_create([Skill(name=name, display_name=display) for name, display in displays.items()], batch_size=500)
+    skill_ids = dict(Skill.objects.values_list('name', 'id'))
+    MemberSkill.objects.bulk_create(
+        [MemberSkill(user_id=user_id, skill_id=skill_ids[name], level=level) for (user_id, name), level in levels.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_project_auto_assign'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('display_name', models.CharField(max_length=100)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MemberSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.FloatField(help_text='Skill level (0-5) as given in the profile.')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='member_skills', to=settings.AUTH_USER_MODEL)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='api.skill')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['skill', 'level'], name='memberskill_skill_level_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'skill'), name='unique_member_skill')],
+            },
+        ),
+        migrations.RunPython(populate_skill_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 05:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_skill_memberskill'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='availabilityslot',
+            index=models.Index(fields=['employee', 'start_time'], name='slot_employee_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'progress', 'estimated_hours'], name='task_assignee_progress_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'assigned_to'], name='task_project_assignee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 'TODO'), ('status', 'IN_PROGRESS'), _connector='OR'), fields=['due_date', 'status'], name='task_open_due_date_idx'),
+        ),
+    ]
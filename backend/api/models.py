@@ -1,8 +1,9 @@
 # We'll use the built-in User model for logins
 from django.contrib.auth.models import User 
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone # We'll need this for deadlines
 
+
 # --- Model 1: EmployeeProfile ---
 # Extends the built-in User to store AI-specific data
 class EmployeeProfile(models.Model):
@@ -20,10 +21,41 @@ class EmployeeProfile(models.Model):
     # This will now be calculated dynamically in the algorithm and serializers
     # based on the 'progress' and 'estimated_hours' of a user's assigned tasks.
 
+    # --- V5.0 FIELD ---
+    # A denormalised ledger of the same figure: the sum of
+    # estimated_hours * (1 - progress / 100) over the user's unfinished tasks.
+    # It is never written directly; Task signals (see signals.py) and the
+    # bulk paths push deltas to it with F() updates (see workload.py), and
+    # 'manage.py rebuild_workload_ledger' verifies / rebuilds it.
+    remaining_workload = models.FloatField(default=0.0, help_text="Hours of unfinished assigned work (maintained ledger).")
+
     # --- V2.0 FIELD ---
     # Field for the "Strike System" (Feature #4)
     strike_count = models.IntegerField(default=0, help_text="Number of missed deadlines.")
 
+    # --- V5.0 FIELD ---
+    # SyncCounter version of the last change (including ledger deltas)
+    sync_version = models.BigIntegerField(default=0)
+
+    def save(self, *args, **kwargs):
+        """
+        [V5.0] A plain save() of an existing profile writes every field
+        EXCEPT the workload ledger, so a profile loaded before a task changed
+        can't overwrite the deltas applied since.
+        [V5.0] Every save takes a new sync version, in the same transaction.
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'remaining_workload'
+            ]
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'sync_version' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'sync_version']
+        with transaction.atomic(savepoint=False):
+            self.sync_version = SyncCounter.next_version()
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.user.username}'s Profile"
 
@@ -48,9 +80,22 @@ class Project(models.Model):
         help_text="The user who created and manages the project."
     )
 
+    # --- V5.0 FIELD ---
+    # Opt-in: new tasks are assigned the moment they're created
+    # (see algorithms.auto_assign_new_tasks) instead of waiting for run_assignment.
+    auto_assign = models.BooleanField(default=False, help_text="Assign each new task as soon as it is created.")
+
     def __str__(self):
         return self.name
 
+# --- V5.0: "Open" tasks (can still become overdue) ---
+# Written as (status = 'TODO' OR status = 'IN_PROGRESS') rather than
+# status IN (...): SQLite only matches a query against a partial index's
+# condition term by term, and it can't see that a parameterised IN list
+# implies a literal one, but it can for each equality.
+OPEN_STATUSES = ['TODO', 'IN_PROGRESS']
+OPEN_TASKS = models.Q(status=OPEN_STATUSES[0]) | models.Q(status=OPEN_STATUSES[1])
+
 # --- Model 3: Task ---
 # The core item our SoSTA algorithm will assign
 class Task(models.Model):
@@ -99,6 +144,58 @@ class Task(models.Model):
     ]
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='TODO')
 
+    # --- V5.0 FIELD ---
+    # Lets the deadline daemon fetch only the tasks that changed since its
+    # last look. auto_now covers save(); bulk_update()/update() callers must
+    # set it themselves (see algorithms.py and deadlines.py).
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    # --- V5.0 FIELD ---
+    # SyncCounter version of the last change. Set by save(); bulk_update() /
+    # update() callers must set it themselves, like 'updated_at'.
+    sync_version = models.BigIntegerField(default=0)
+
+    class Meta:
+        # --- V5.0 INDEXES for the hot query patterns ---
+        # (EXPLAIN QUERY PLAN checks in tests.py; 'manage.py benchmark_indexes' times them)
+        indexes = [
+            # Workload: SUM(hours * (1 - progress/100)) per assignee over unfinished
+            # tasks (workload.aggregate_remaining_workloads, the ledger check).
+            # estimated_hours is included so the SUM is answered from the index alone.
+            models.Index(fields=['assigned_to', 'progress', 'estimated_hours'], name='task_assignee_progress_idx'),
+            # The unassigned backlog of a project (assignment runs) and a
+            # member's tasks within a project (the dashboard)
+            models.Index(fields=['project', 'assigned_to'], name='task_project_assignee_idx'),
+            # Deadlines: only open tasks can become overdue, so only they are
+            # indexed (check_deadlines, the deadline daemon). Queries must use
+            # the same OPEN_TASKS condition for SQLite to pick this index.
+            models.Index(fields=['due_date', 'status'], condition=OPEN_TASKS, name='task_open_due_date_idx'),
+            # "What changed in this project since version v" (sync.project_changes)
+            models.Index(fields=['project', 'sync_version'], name='task_project_sync_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # [V5.0] auto_now only takes effect if the column is actually written
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = [
+                *update_fields, *(name for name in ('updated_at', 'sync_version') if name not in update_fields)
+            ]
+        # [V5.0] The row, its sync version and the ledger deltas (post_save) commit together
+        with transaction.atomic(savepoint=False):
+            self.sync_version = SyncCounter.next_version()
+            moved_from = getattr(self, '_loaded_project_id', None)
+            writes_project = update_fields is None or 'project' in update_fields or 'project_id' in update_fields
+            if not self._state.adding and writes_project and moved_from not in (None, self.project_id):
+                # Gone from the old project's point of view
+                SyncEvent.objects.create(
+                    version=self.sync_version, project_id=moved_from,
+                    kind=SyncEvent.KIND_TASK, object_id=self.pk, deleted=True,
+                )
+            super().save(*args, **kwargs)
+            self._loaded_project_id = self.project_id
+            self._loaded_assignee_id = self.assigned_to_id
+
     def __str__(self):
         return self.title
 
@@ -111,5 +208,182 @@ class AvailabilitySlot(models.Model):
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
 
+    class Meta:
+        indexes = [
+            # V5.0: The scheduler's "this team's slots in this week" window query
+            models.Index(fields=['employee', 'start_time'], name='slot_employee_start_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee.username} | {self.start_time.strftime('%Y-%m-%d %H:%M')}"
+
+# --- Model 5: Job (V5.0) ---
+# A queued run of one of our algorithms. The HTTP request only inserts a row
+# (and returns 202); 'manage.py run_job_worker' picks it up, runs it in a
+# process pool and stores the result here for the frontend to poll.
+class Job(models.Model):
+    KIND_ASSIGNMENT = 'assignment'
+    KIND_SCHEDULER = 'scheduler'
+    KIND_CHOICES = [
+        (KIND_ASSIGNMENT, 'Task Assignment'),
+        (KIND_SCHEDULER, 'Meeting Scheduler'),
+    ]
+
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('SUCCEEDED', 'Succeeded'),
+        ('FAILED', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ['QUEUED', 'RUNNING']
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    project = models.ForeignKey(Project, related_name="jobs", on_delete=models.CASCADE)
+    submitted_by = models.ForeignKey(User, related_name="jobs", null=True, blank=True, on_delete=models.SET_NULL)
+
+    # The validated request parameters, e.g. {"solver": "optimal", "member_hour_cap": 40}
+    params = models.JSONField(default=dict)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    result = models.JSONField(null=True, blank=True, help_text="What the algorithm returned.")
+    error = models.TextField(blank=True, default='')
+    worker = models.CharField(max_length=100, blank=True, default='', help_text="host:pid of the worker that claimed it.")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # Two assignment runs on one project would race for the same tasks,
+            # so the database itself refuses a second active one.
+            models.UniqueConstraint(
+                fields=['project'],
+                condition=models.Q(kind='assignment', status__in=['QUEUED', 'RUNNING']),
+                name='one_active_assignment_job_per_project',
+            ),
+        ]
+        indexes = [
+            # The worker's "oldest queued job" lookup
+            models.Index(fields=['status', 'created_at'], name='job_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.id} ({self.status}) | {self.project.name}"
+
+# --- Model 6: Skill / MemberSkill (V5.0) ---
+# A normalised index of the "skills" in EmployeeProfile.profile_data, so
+# "who knows X?" is an indexed lookup instead of a scan over every profile's
+# JSON. profile_data stays the source of truth; skills.sync_member_skills()
+# rewrites a user's rows whenever their profile_data is saved (signals.py).
+class Skill(models.Model):
+    # Canonical form (see scoring.canonical_skill_name): "python", not "Python "
+    name = models.CharField(max_length=100, unique=True)
+    # How it was first spelled, for display
+    display_name = models.CharField(max_length=100)
+
+    def __str__(self):
+        return self.display_name
+
+
+class MemberSkill(models.Model):
+    user = models.ForeignKey(User, related_name="member_skills", on_delete=models.CASCADE)
+    skill = models.ForeignKey(Skill, related_name="members", on_delete=models.CASCADE)
+    level = models.FloatField(help_text="Skill level (0-5) as given in the profile.")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'skill'], name='unique_member_skill'),
+        ]
+        indexes = [
+            # "Everyone with skill X at level >= n"
+            models.Index(fields=['skill', 'level'], name='memberskill_skill_level_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} | {self.skill.display_name}: {self.level}"
+
+
+# --- Model 7: SyncCounter (V5.0) ---
+# One database-wide, ever-increasing change version. Every write that
+# changes what a project page shows (a task, a profile, a membership) takes
+# the next version IN THE SAME TRANSACTION and stamps it on the row, so
+# "everything with a version > v" is exactly what a client that has seen v
+# is missing (see sync.py and /api/projects/<id>/changes/).
+class SyncCounter(models.Model):
+    ROW_ID = 1
+
+    value = models.BigIntegerField(default=0)
+    # Tombstones (SyncEvent) up to this version have been pruned: clients
+    # that are further behind must re-fetch the whole project.
+    pruned_through = models.BigIntegerField(default=0)
+
+    @classmethod
+    def next_version(cls):
+        """Takes the next version. Joins the caller's transaction (or opens one)."""
+        with transaction.atomic(savepoint=False):
+            if not cls.objects.filter(pk=cls.ROW_ID).update(value=models.F('value') + 1):
+                cls.objects.create(pk=cls.ROW_ID, value=1)
+                return 1
+            return cls.objects.values_list('value', flat=True).get(pk=cls.ROW_ID)
+
+    @classmethod
+    def current(cls):
+        """(value, pruned_through); (0, 0) before the first write."""
+        return cls.objects.filter(pk=cls.ROW_ID).values_list('value', 'pruned_through').first() or (0, 0)
+
+
+# --- Model 8: SyncEvent (V5.0) ---
+# The changes that can't be stamped on a row: deleted tasks (tombstones) and
+# membership changes (Project.members has no through row of its own to carry
+# a version). Read by sync.project_changes; 'manage.py prune_sync_events'
+# drops old ones.
+class SyncEvent(models.Model):
+    KIND_TASK = 'task'
+    KIND_MEMBER = 'member'
+    KIND_CHOICES = [
+        (KIND_TASK, 'Task'),
+        (KIND_MEMBER, 'Member'),
+    ]
+
+    version = models.BigIntegerField()
+    # No FK constraint: events are written while a project's tasks are being
+    # cascade-deleted, and a deleted project's events are simply never read.
+    project = models.ForeignKey(
+        Project, related_name="sync_events", on_delete=models.DO_NOTHING, db_constraint=False
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField(help_text="The task id, or the user id for a membership.")
+    # Task: always True (it was deleted or moved away). Member: True = removed, False = added.
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'version'], name='syncevent_project_version_idx'),
+        ]
+
+    def __str__(self):
+        return f"v{self.version} | project {self.project_id} | {self.kind} {self.object_id}{' (deleted)' if self.deleted else ''}"
+
+
+# --- Model 9: ResourceVersion (V5.0) ---
+# Version stamps that every process must agree on: the ETag tokens
+# (etags.py, also the dashboard cache keys) and the scheduler cache versions
+# (cache.py). They used to live in Django's cache, which is per process with
+# the default local-memory backend, so a write made by a management command
+# or a job worker never reached the web server's copy. A bump takes the next
+# SyncCounter version in the writer's own transaction, so it becomes visible
+# exactly when the write does (and is undone with it). No row = version 0.
+class ResourceVersion(models.Model):
+    kind = models.CharField(max_length=30)    # e.g. 'project', 'user', 'project-members'
+    object_id = models.BigIntegerField()
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='resourceversion_kind_object_uniq'),
+        ]
+
     def __str__(self):
-        return f"{self.employee.username} | {self.start_time.strftime('%Y-%m-%d %H:%M')}"
\ No newline at end of file
+        return f"{self.kind} {self.object_id}: v{self.version}"
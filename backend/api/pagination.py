@@ -0,0 +1,26 @@
+# api/pagination.py
+
+# --- V5.0 CURSOR PAGINATION ---
+# Every list endpoint returns {"next": <url>, "previous": <url>, "results": [...]}.
+# Cursors rather than ?page=N: a deep page costs the same as the first one
+# (WHERE id > x instead of OFFSET), and pages don't shift when rows are
+# added or deleted while a client is walking through them.
+#
+# ?page_size= asks for up to MAX_PAGE_SIZE rows. A view picks its order with
+# 'cursor_ordering' (default 'id'); it should be unique and never change.
+
+from rest_framework.pagination import CursorPagination
+
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class ApiCursorPagination(CursorPagination):
+    page_size = PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+    ordering = 'id'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', self.ordering)
+        return (ordering,) if isinstance(ordering, str) else tuple(ordering)
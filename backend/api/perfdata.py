@@ -0,0 +1,191 @@
+# api/perfdata.py
+
+# --- V5.0 SYNTHETIC PERFORMANCE DATA ---
+# A deterministic generator for realistic-looking teams, used by
+# 'manage.py seed_perf_data', 'manage.py benchmark_suite' and
+# 'manage.py benchmark_indexes'. The same seed always produces the same
+# users, profiles, projects, tasks and availability.
+#
+# Everything is written with bulk inserts (no per-row signals), so the
+# derived data the signals would normally maintain - the workload ledger
+# and the skill index - is filled in explicitly at the end.
+
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db.models import Count
+from django.utils import timezone
+
+from .algorithms import get_ist_week_start
+from .models import AvailabilitySlot, EmployeeProfile, MemberSkill, Project, Task
+from .scoring import canonical_skills
+from .skills import intern_skills
+from .workload import aggregate_remaining_workloads
+
+BATCH_SIZE = 5000
+
+SKILL_VOCABULARY = [
+    'Python', 'Django', 'JavaScript', 'TypeScript', 'React', 'CSS', 'SQL', 'PostgreSQL',
+    'Docker', 'Kubernetes', 'AWS', 'Testing', 'CI/CD', 'Go', 'Java', 'Kotlin', 'Swift',
+    'Figma', 'UX Research', 'Technical Writing', 'Public Speaking', 'Data Analysis',
+    'Machine Learning', 'Security', 'Networking', 'Linux', 'GraphQL', 'REST APIs',
+]
+CATEGORIES = ['frontend', 'backend', 'documentation', 'testing', 'devops', 'design']
+TASK_VERBS = ['Build', 'Fix', 'Refactor', 'Document', 'Review', 'Test', 'Design', 'Deploy']
+TASK_OBJECTS = ['login page', 'API endpoint', 'dashboard', 'schema', 'pipeline', 'report', 'onboarding flow', 'cache']
+
+
+@dataclass
+class PerfDataset:
+    prefix: str
+    user_ids: list
+    project_ids: list
+    tasks: int
+    slots: int
+
+    def summary(self):
+        return {'users': len(self.user_ids), 'projects': len(self.project_ids), 'tasks': self.tasks, 'slots': self.slots}
+
+
+def dataset_prefix(seed):
+    return f'perf{seed}'
+
+
+def existing_dataset(seed):
+    """True if seed_perf_data(seed=...) rows are already in the database."""
+    return User.objects.filter(username__startswith=f'{dataset_prefix(seed)}_').exists()
+
+
+def delete_dataset(seed):
+    """Deletes a seeded dataset (projects cascade to their tasks; users to profiles and slots)."""
+    prefix = dataset_prefix(seed)
+    Project.objects.filter(name__startswith=f'{prefix}_').delete()
+    return User.objects.filter(username__startswith=f'{prefix}_').delete()[0]
+
+
+def random_profile_data(rng):
+    return {
+        'skills': {name: rng.randint(1, 5) for name in rng.sample(SKILL_VOCABULARY, rng.randint(2, 8))},
+        'preferences': {category: rng.randint(0, 5) for category in rng.sample(CATEGORIES, rng.randint(1, 4))},
+    }
+
+
+def random_task_data(rng):
+    return {
+        'required_skills': rng.sample(SKILL_VOCABULARY, rng.choice([0, 1, 1, 2, 2, 3])),
+        'category': rng.choice(CATEGORIES + ['']),
+    }
+
+
+def seed_perf_data(users, projects, tasks, slots, seed=0, now=None, prefix=None):
+    """
+    Creates 'users' users (with profiles), 'projects' projects, 'tasks' tasks
+    and 'slots' availability slots. Returns a PerfDataset.
+    Usernames / project names start with 'prefix' (default: dataset_prefix(seed)).
+
+    - Each user joins 1-3 projects; every project gets at least one member,
+      and its first member leads it.
+    - Tasks: ~10% unassigned backlog, ~60% done, ~30% open with due dates
+      spread from two days ago to a month ahead. As in production, most open
+      tasks already past their due date have been struck (OVERDUE).
+    - Slots: working-hours blocks over the current IST week and the 3 before it.
+    """
+    rng = random.Random(seed)
+    now = now or timezone.now()
+    prefix = prefix or dataset_prefix(seed)
+
+    # 1. Users + profiles
+    User.objects.bulk_create([User(username=f'{prefix}_u{i}') for i in range(users)], batch_size=BATCH_SIZE)
+    user_ids = list(User.objects.filter(username__startswith=f'{prefix}_u').order_by('id').values_list('id', flat=True))
+    profile_data = {user_id: random_profile_data(rng) for user_id in user_ids}
+    EmployeeProfile.objects.bulk_create(
+        [EmployeeProfile(user_id=user_id, profile_data=data) for user_id, data in profile_data.items()],
+        batch_size=BATCH_SIZE,
+    )
+
+    # 2. Projects + memberships
+    members = {i: [] for i in range(projects)}
+    if projects:
+        for user_id in user_ids:
+            for index in rng.sample(range(projects), min(projects, rng.randint(1, 3))):
+                members[index].append(user_id)
+        for index, member_ids in members.items():
+            if not member_ids and user_ids:
+                member_ids.append(rng.choice(user_ids))
+    Project.objects.bulk_create([
+        Project(name=f'{prefix}_p{i}', leader_id=members[i][0] if members[i] else None) for i in range(projects)
+    ], batch_size=BATCH_SIZE)
+    project_ids = list(Project.objects.filter(name__startswith=f'{prefix}_p').order_by('id').values_list('id', flat=True))
+    members = {project_ids[i]: member_ids for i, member_ids in members.items()}
+    Project.members.through.objects.bulk_create(
+        [Project.members.through(project_id=p, user_id=u) for p, member_ids in members.items() for u in member_ids],
+        batch_size=BATCH_SIZE, ignore_conflicts=True,
+    )
+
+    # 3. Tasks
+    created = 0
+    batch = []
+    for i in range(tasks if project_ids else 0):
+        project_id = rng.choice(project_ids)
+        task = Task(
+            project_id=project_id, estimated_hours=rng.randint(1, 16), task_data=random_task_data(rng),
+            title=f'{rng.choice(TASK_VERBS)} {rng.choice(TASK_OBJECTS)} #{i}',
+        )
+        roll = rng.random()
+        if roll >= 0.1 and members[project_id]:
+            task.assigned_to_id = rng.choice(members[project_id])
+            if roll < 0.7:
+                task.progress, task.status = 100, 'DONE'
+                task.due_date = now - timedelta(hours=rng.uniform(0, 24 * 60))
+            else:
+                task.progress = rng.choice([0, 25, 50, 75])
+                task.due_date = now + timedelta(hours=rng.uniform(-24 * 2, 24 * 30))
+                struck = task.due_date < now and rng.random() < 0.9
+                task.status = 'OVERDUE' if struck else ('TODO' if task.progress == 0 else 'IN_PROGRESS')
+        batch.append(task)
+        if len(batch) == BATCH_SIZE:
+            Task.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    Task.objects.bulk_create(batch)
+    created += len(batch)
+
+    # 4. Availability
+    week_start = get_ist_week_start()
+    slot_rows = []
+    for _ in range(slots if user_ids else 0):
+        day = week_start - timedelta(weeks=rng.randint(0, 3)) + timedelta(days=rng.randint(0, 4))
+        start = day + timedelta(hours=rng.randint(8, 16)) # Working hours, IST
+        slot_rows.append(AvailabilitySlot(
+            employee_id=rng.choice(user_ids), start_time=start, end_time=start + timedelta(hours=rng.randint(1, 4)),
+        ))
+    AvailabilitySlot.objects.bulk_create(slot_rows, batch_size=BATCH_SIZE)
+
+    # 5. What the signals would have maintained
+    seeded_profiles = EmployeeProfile.objects.filter(user__username__startswith=f'{prefix}_u')
+    ledger = aggregate_remaining_workloads() # Grouped over everyone; no giant IN (...) list
+    profiles = [profile for profile in seeded_profiles.only('id', 'user_id') if ledger.get(profile.user_id)]
+    for profile in profiles:
+        profile.remaining_workload = ledger[profile.user_id]
+    EmployeeProfile.objects.bulk_update(profiles, ['remaining_workload'], batch_size=BATCH_SIZE)
+
+    levels = {user_id: canonical_skills(data['skills']) for user_id, data in profile_data.items()}
+    skill_ids = intern_skills(SKILL_VOCABULARY)
+    MemberSkill.objects.bulk_create(
+        [MemberSkill(user_id=user_id, skill_id=skill_ids[name], level=level)
+         for user_id, user_levels in levels.items() for name, level in user_levels.items()],
+        batch_size=BATCH_SIZE,
+    )
+
+    return PerfDataset(prefix, user_ids, project_ids, created, len(slot_rows))
+
+
+def busiest_project(dataset):
+    """The seeded project with the most unassigned tasks (the assignment benchmark's target)."""
+    row = (
+        Task.objects.filter(project_id__in=dataset.project_ids, assigned_to=None)
+        .values('project').annotate(backlog=Count('id')).order_by('-backlog', 'project').first()
+    )
+    return row['project'] if row else (dataset.project_ids[0] if dataset.project_ids else None)
@@ -0,0 +1,553 @@
+# api/scoring.py
+
+# --- V5.0 VECTORIZED COST ENGINE ---
+# The SoSTA cost model used by run_weighted_task_assignment, expressed as
+# NumPy array operations. Skills, preferences and workloads are encoded ONCE
+# into dense arrays, so scoring a whole batch of tasks against every member
+# is a handful of matrix operations instead of a nested Python loop.
+
+import numpy as np
+
+# NEW ALGORITHM WEIGHTS (from our discussion, tuned for balance)
+WEIGHT_WORKLOAD = 2        # Lower weight for workload cost, to avoid always picking the freest.
+WEIGHT_SKILL = 5           # High weight for skill mismatch cost, making skills very important.
+WEIGHT_PREFERENCE = 3      # Medium weight for preference mismatch cost.
+MAX_SKILL_LEVEL = 5        # Assuming skill levels are 0-5
+MAX_PREFERENCE_LEVEL = 5   # Assuming preference levels are 0-5
+
+
+# --- V5.0 CANONICAL SKILL NAMES ---
+# Skills are matched on a canonical form (whitespace-collapsed, casefolded),
+# the same way categories were always lower-cased. "Python", " python " and
+# "PYTHON" are one skill; if a profile lists several spellings, the highest
+# level wins. The skill index (skills.py) stores exactly these names.
+
+def canonical_skill_name(name):
+    return ' '.join(str(name).split()).casefold()
+
+
+def canonical_skills(skills):
+    """{canonical_name: level} from a profile's 'skills' dict. Non-numeric levels are ignored."""
+    levels = {}
+    for name, level in (skills or {}).items():
+        canonical = canonical_skill_name(name)
+        if not canonical or isinstance(level, bool) or not isinstance(level, (int, float)):
+            continue
+        levels[canonical] = max(level, levels.get(canonical, level))
+    return levels
+
+
+class CostMatrix:
+    """
+    The static (workload-independent) part of the cost model for a batch of
+    tasks against a list of members.
+
+    - skill_cost[t, m]: Skill mismatch cost (Range 0 - WEIGHT_SKILL)
+    - pref_cost[t, m]:  Preference mismatch cost (Range 0 - WEIGHT_PREFERENCE)
+
+    The workload cost changes as tasks get assigned, so it is computed
+    per task from the live workload vector (see workload_costs).
+    """
+
+    def __init__(self, tasks_data, profiles_data):
+        """
+        'tasks_data' is a list of Task.task_data dicts (in assignment order).
+        'profiles_data' is a list of EmployeeProfile.profile_data dicts
+        (one per member, in member order).
+        """
+        self.task_count = len(tasks_data)
+        self.member_count = len(profiles_data)
+
+        # 1. Build the vocabularies from the tasks in this batch.
+        #    Only skills/categories that some task asks for matter.
+        skill_index = {}
+        category_index = {}
+        required = []    # (task_row, skill_col) pairs, repeats allowed
+        categories = np.full(self.task_count, -1, dtype=np.intp)
+        required_counts = np.zeros(self.task_count, dtype=np.float64)
+
+        for row, task_data in enumerate(tasks_data):
+            required_skills = task_data.get('required_skills', []) or []
+            required_counts[row] = len(required_skills)
+            for skill_name in required_skills:
+                col = skill_index.setdefault(canonical_skill_name(skill_name), len(skill_index))
+                required.append((row, col))
+
+            task_category = (task_data.get('category', '') or '').lower()
+            if task_category:
+                categories[row] = category_index.setdefault(task_category, len(category_index))
+
+        # 2. Encode what each task needs: a (tasks x skills) count matrix.
+        task_skills = np.zeros((self.task_count, len(skill_index)), dtype=np.float64)
+        if required:
+            rows, cols = np.array(required, dtype=np.intp).T
+            np.add.at(task_skills, (rows, cols), 1.0)
+
+        # 3. Encode what each member offers: (members x skills) levels and
+        #    (members x categories) preference levels. 0 if not present.
+        member_skills = np.zeros((self.member_count, len(skill_index)), dtype=np.float64)
+        member_prefs = np.zeros((self.member_count, len(category_index)), dtype=np.float64)
+        for m, profile_data in enumerate(profiles_data):
+            skills = canonical_skills(profile_data.get('skills', {}))
+            for skill_name, col in skill_index.items():
+                member_skills[m, col] = skills.get(skill_name, 0)
+            prefs = profile_data.get('preferences', {}) or {}
+            for category, col in category_index.items():
+                member_prefs[m, col] = prefs.get(category, 0)
+
+        # 4. Skill mismatch cost for every (task, member) pair at once.
+        raw_skill_score = task_skills @ member_skills.T
+        max_possible = required_counts * MAX_SKILL_LEVEL
+        has_skills = required_counts > 0
+        normalized_skill = np.ones((self.task_count, self.member_count), dtype=np.float64)
+        normalized_skill[has_skills] = raw_skill_score[has_skills] / max_possible[has_skills, None]
+        # If no skills required for the task, it's a perfect skill match (row stays 1.0)
+        self.skill_cost = (1.0 - normalized_skill) * WEIGHT_SKILL
+
+        # 5. Preference mismatch cost for every (task, member) pair at once.
+        normalized_preference = np.ones((self.task_count, self.member_count), dtype=np.float64)
+        has_category = categories >= 0
+        normalized_preference[has_category] = member_prefs[:, categories[has_category]].T / MAX_PREFERENCE_LEVEL
+        # If no task category, treat as neutral (row stays 1.0, no cost)
+        self.pref_cost = (1.0 - normalized_preference) * WEIGHT_PREFERENCE
+
+        # 6. (V5.0) A lower bound on the cost of any member who has NONE of
+        #    a task's required skills: full skill cost, zero workload cost,
+        #    and the lowest preference cost in the row (negative only if
+        #    someone rates a category above MAX_PREFERENCE_LEVEL).
+        self.unqualified_floor = WEIGHT_SKILL + np.minimum(
+            self.pref_cost.min(axis=1) if self.member_count else np.zeros(self.task_count), 0.0
+        )
+
+    def row_costs(self, row, workload_cost):
+        """
+        Final cost of task 'row' for every member, given the current
+        workload cost vector. Summed in the same order as the original
+        scalar formula (workload + skill + preference) so ties break the same way.
+        """
+        return workload_cost + self.skill_cost[row] + self.pref_cost[row]
+
+
+def workload_costs(workloads, max_workload):
+    """
+    Normalized Workload Cost (Range 0 - WEIGHT_WORKLOAD) for a vector of
+    remaining workloads. If all workloads are zero, everyone costs 0.
+    """
+    if max_workload > 0:
+        return (workloads / max_workload) * WEIGHT_WORKLOAD
+    return np.zeros_like(workloads)
+
+
+def greedy_assign(cost_matrix, hours, workloads, candidates=None):
+    """
+    The greedy SoSTA pass over a CostMatrix.
+
+    Tasks are taken in row order. Each one goes to the cheapest member
+    (first one wins on ties), that member's workload grows by the task's
+    hours, and max_workload is re-normalized before the next task.
+
+    'workloads' is a float array (one entry per member) and is updated
+    in place. Returns a list of (member_index, cost) tuples, one per task.
+
+    V5.0: 'candidates' optionally gives, per row, a sorted index array of
+    the members holding at least one of the task's required skills (None =
+    no pruning for that row; see skills.qualified_candidates). Only those
+    are scored. The pick is exact: if the best candidate isn't strictly
+    cheaper than any unqualified member could possibly be
+    (cost_matrix.unqualified_floor), the row is re-scored in full.
+    That bound assumes workload costs are >= 0, so with any negative
+    workload or hours the pass simply runs unpruned.
+    """
+    results = []
+    max_workload = workloads.max() if len(workloads) else 0.0
+    if candidates is not None and len(workloads) and (workloads.min() < 0 or np.min(hours, initial=0) < 0):
+        candidates = None
+
+    for row in range(cost_matrix.task_count):
+        best = None
+        pruned = candidates[row] if candidates is not None else None
+        if pruned is not None and len(pruned):
+            pruned_costs = (
+                workload_costs(workloads[pruned], max_workload)
+                + cost_matrix.skill_cost[row, pruned]
+                + cost_matrix.pref_cost[row, pruned]
+            )
+            pick = int(np.argmin(pruned_costs))
+            if pruned_costs[pick] < cost_matrix.unqualified_floor[row]:
+                best, lowest_cost = int(pruned[pick]), float(pruned_costs[pick])
+
+        if best is None:
+            final_costs = cost_matrix.row_costs(row, workload_costs(workloads, max_workload))
+            best = int(np.argmin(final_costs))
+            lowest_cost = float(final_costs[best])
+        results.append((best, lowest_cost))
+
+        # A new task (0% progress) adds its full duration to the workload
+        workloads[best] += hours[row]
+        # CRITICAL: Update max_workload for the next task's normalization
+        max_workload = max(max_workload, workloads[best])
+
+    return results
+
+
+# --- V5.0 WHOLE-BATCH MODE (solver='optimal') ---
+# Instead of committing to one task at a time, solve the whole batch as a
+# min-cost flow: every task supplies 'estimated_hours' units of flow, every
+# member can absorb at most (hour cap - current workload) units, and routing
+# one hour of task t to member m costs cost[t, m] / hours[t]. The optimum of
+# this transportation problem (the LP relaxation) splits at most
+# (members - 1) tasks; those few are rounded back onto a single member.
+#
+# Rounding can strand a task that doesn't fit anywhere any more, so the
+# result is then repaired (move one placed task to make room for it) and
+# improved by local search (single moves and pairwise swaps that lower the
+# cost). Whole tasks under hour caps is the generalized assignment problem,
+# which is NP-hard: this is an LP-rounding HEURISTIC, usually at or very near
+# the optimum, not a guarantee of it.
+
+DEFAULT_MEMBER_HOUR_CAP = 40.0  # Max remaining workload (hours) a member may reach
+FLOW_EPSILON = 1e-9
+IMPROVEMENT_PASSES = 20  # Local search stops earlier once a pass finds nothing
+
+
+def assignment_costs(cost_matrix, workloads):
+    """
+    Full (tasks x members) cost matrix for a one-shot solve. The workload
+    term is fixed at the batch's starting workloads; balancing during the
+    run is the job of the per-member hour caps.
+    """
+    max_workload = workloads.max() if len(workloads) else 0.0
+    return workload_costs(workloads, max_workload)[None, :] + cost_matrix.skill_cost + cost_matrix.pref_cost
+
+
+class _TransportationSolver:
+    """
+    Successive shortest paths on the residual graph of the transportation
+    problem, collapsed onto member nodes.
+
+    Moving flow between two members a -> b means pushing back some task t
+    that currently sends flow to a and re-routing it to b, so the edge cost
+    is min_t(unit[t, b] - unit[t, a]) over tasks with flow at a. Those rows
+    are cached and only rebuilt for members whose flow changed.
+
+    Each shortest path is a dense Dijkstra with node potentials (so the
+    reduced edge costs stay non-negative) that stops at the first member
+    with spare capacity.
+    """
+
+    def __init__(self, unit_costs, supply, capacity):
+        self.unit = unit_costs                 # (tasks x members) cost per hour
+        self.supply = supply.copy()            # hours not yet routed, per task
+        self.residual = capacity.copy()        # hours a member can still absorb
+        self.task_count, self.member_count = unit_costs.shape
+        self.flows = [dict() for _ in range(self.member_count)]  # member -> {task: hours}
+        self.potential = np.zeros(self.member_count)
+
+        # Cheapest unrouted task per member, via per-column sorted orders.
+        # Supply only ever goes down, so the pointers only move forward.
+        self.order = np.argsort(unit_costs, axis=0, kind='stable')
+        self.pointer = np.zeros(self.member_count, dtype=np.intp)
+        self.source_task = self.order[0].copy()
+        self.source_cost = unit_costs[self.source_task, np.arange(self.member_count)]
+
+        self.edge_cost = np.full((self.member_count, self.member_count), np.inf)
+        self.edge_task = np.full((self.member_count, self.member_count), -1, dtype=np.intp)
+
+    def _advance_source(self, task):
+        """'task' has just run out of supply; move every pointer that was on it."""
+        for m in np.flatnonzero(self.source_task == task):
+            p = self.pointer[m]
+            while p < self.task_count and self.supply[self.order[p, m]] <= FLOW_EPSILON:
+                p += 1
+            self.pointer[m] = p
+            if p < self.task_count:
+                self.source_task[m] = self.order[p, m]
+                self.source_cost[m] = self.unit[self.source_task[m], m]
+            else:
+                self.source_task[m] = -1
+                self.source_cost[m] = np.inf
+
+    def _rebuild_edges(self, a):
+        held = np.fromiter(self.flows[a].keys(), dtype=np.intp, count=len(self.flows[a]))
+        if not len(held):
+            self.edge_cost[a] = np.inf
+            self.edge_task[a] = -1
+            return
+        deltas = self.unit[held] - self.unit[held, a][:, None]
+        best = np.argmin(deltas, axis=0)
+        self.edge_cost[a] = deltas[best, np.arange(self.member_count)]
+        self.edge_task[a] = held[best]
+        self.edge_cost[a, a] = np.inf
+
+    def _shortest_path(self):
+        """
+        Dijkstra from the source to the nearest member with spare capacity.
+        Returns (sink, pred), or (None, None) if no such member is reachable.
+        """
+        dist = np.maximum(self.source_cost - self.potential, 0.0)
+        frontier = dist.copy()  # Tentative distances of members not yet settled
+        pred = np.full(self.member_count, -1, dtype=np.intp)
+
+        while True:
+            u = int(np.argmin(frontier))
+            if not np.isfinite(frontier[u]):
+                return None, None
+            frontier[u] = np.inf
+            if self.residual[u] > FLOW_EPSILON:
+                sink = u
+                break
+            # Reduced costs are >= 0, so settled members can never improve here.
+            candidate = dist[u] + np.maximum(self.edge_cost[u] - self.potential + self.potential[u], 0.0)
+            improved = candidate < dist
+            dist[improved] = candidate[improved]
+            frontier[improved] = candidate[improved]
+            pred[improved] = u
+
+        # Johnson update: keeps every reduced cost non-negative for the next round.
+        self.potential += np.minimum(dist, dist[sink])
+        return sink, pred
+
+    def solve(self):
+        while True:
+            sink, pred = self._shortest_path()
+            if sink is None:
+                break  # Every task is routed, or every reachable member is full
+
+            # Walk the path back from the sink to where it left the source.
+            hops = []
+            m = sink
+            while pred[m] >= 0:
+                a = int(pred[m])
+                hops.append((a, m, int(self.edge_task[a, m])))
+                m = a
+            start, task = m, int(self.source_task[m])
+
+            delta = min(self.supply[task], self.residual[sink])
+            for a, _, t in hops:
+                delta = min(delta, self.flows[a][t])
+
+            # Push 'delta' hours along the path.
+            self.supply[task] -= delta
+            self.flows[start][task] = self.flows[start].get(task, 0.0) + delta
+            touched = {start}
+            for a, b, t in hops:
+                self.flows[a][t] -= delta
+                if self.flows[a][t] <= FLOW_EPSILON:
+                    del self.flows[a][t]
+                self.flows[b][t] = self.flows[b].get(t, 0.0) + delta
+                touched.update((a, b))
+            self.residual[sink] -= delta
+
+            if self.supply[task] <= FLOW_EPSILON:
+                self._advance_source(task)
+            for a in touched:
+                self._rebuild_edges(a)
+
+        return self.flows
+
+
+def _make_room(costs, hours, capacity, assign, load, member, need):
+    """
+    Plans moving some of 'member's tasks (largest first) to the cheapest
+    other members with room until it has 'need' more hours free.
+    Returns (extra cost, [(task, new member), ...]), or None if it can't.
+    """
+    room = capacity - load
+    freed, extra, moves = 0.0, 0.0, []
+    held = np.flatnonzero(assign == member)
+    for u in held[np.argsort(-hours[held], kind='stable')]:
+        if freed >= need - FLOW_EPSILON:
+            break
+        targets = np.flatnonzero(room >= hours[u] - FLOW_EPSILON)
+        targets = targets[targets != member]
+        if not len(targets):
+            continue
+        b = int(targets[np.argmin(costs[u, targets])])
+        room[b] -= hours[u]
+        freed += hours[u]
+        extra += costs[u, b] - costs[u, member]
+        moves.append((int(u), b))
+    return (extra, moves) if freed >= need - FLOW_EPSILON else None
+
+
+def _place_stranded(costs, hours, capacity, assign, load, stranded):
+    """
+    Places each stranded task (largest first) on the cheapest member with
+    room; failing that, on the member where moving some of its tasks to
+    others makes room most cheaply. 'assign' / 'load' change in place.
+    """
+    for row in sorted(stranded, key=lambda row: -hours[row]):
+        room = capacity - load
+        fits = np.flatnonzero(room >= hours[row] - FLOW_EPSILON)
+        if len(fits):
+            m = int(fits[np.argmin(costs[row, fits])])
+            assign[row] = m
+            load[m] += hours[row]
+            continue
+
+        # Cheap bounds first: moving tasks around can't create room
+        placed = hours[assign >= 0]
+        if room.sum() < hours[row] - FLOW_EPSILON or not len(placed) or room.max() < placed.min() - FLOW_EPSILON:
+            continue
+
+        best = None  # (extra cost, member, moves)
+        for a in np.flatnonzero(capacity >= hours[row] - FLOW_EPSILON):
+            plan = _make_room(costs, hours, capacity, assign, load, a, hours[row] - room[a])
+            if plan is not None and (best is None or costs[row, a] + plan[0] < best[0]):
+                best = (costs[row, a] + plan[0], int(a), plan[1])
+        if best is not None:
+            _, a, moves = best
+            for u, b in moves:
+                assign[u] = b
+                load[a] -= hours[u]
+                load[b] += hours[u]
+            assign[row] = a
+            load[a] += hours[row]
+
+
+def _improve(costs, hours, capacity, assign, load):
+    """
+    Local search: a placed task moves to a cheaper member with room or swaps
+    with a task held by someone else; an unplaced task takes any room left,
+    or replaces a placed task that costs more where it is. Each step keeps
+    every cap and never places fewer tasks. 'assign' / 'load' change in place.
+    """
+    for _ in range(IMPROVEMENT_PASSES):
+        improved = False
+        for t in range(len(assign)):
+            a = assign[t]
+            room = capacity - load
+            if a < 0:
+                fits = np.flatnonzero(room >= hours[t] - FLOW_EPSILON)
+                if len(fits):
+                    b = int(fits[np.argmin(costs[t, fits])])
+                    assign[t] = b
+                    load[b] += hours[t]
+                    improved = True
+                    continue
+
+            # Best single move (placed tasks only)
+            move_gain = np.full(len(room), -np.inf)
+            if a >= 0:
+                move_gain = costs[t, a] - costs[t]
+                move_gain[room < hours[t] - FLOW_EPSILON] = -np.inf
+                move_gain[a] = -np.inf
+            b = int(np.argmax(move_gain))
+
+            # Best swap with a task placed somewhere else (an unplaced 't' swaps in, it takes the place)
+            others = np.flatnonzero((assign >= 0) & (assign != a))
+            swap_gain = np.full(len(others), -np.inf)
+            if len(others):
+                held_by = assign[others]
+                feasible = load[held_by] - hours[others] + hours[t] <= capacity[held_by] + FLOW_EPSILON
+                gain = costs[others, held_by] - costs[t, held_by]
+                if a >= 0:
+                    feasible &= load[a] - hours[t] + hours[others] <= capacity[a] + FLOW_EPSILON
+                    gain += costs[t, a] - costs[others, a]
+                swap_gain[feasible] = gain[feasible]
+            best_swap = int(np.argmax(swap_gain)) if len(others) else None
+
+            if best_swap is not None and swap_gain[best_swap] > max(move_gain[b], FLOW_EPSILON):
+                u = others[best_swap]
+                c = assign[u]
+                assign[t], assign[u] = c, a
+                load[c] += hours[t] - hours[u]
+                if a >= 0:
+                    load[a] += hours[u] - hours[t]
+                improved = True
+            elif move_gain[b] > FLOW_EPSILON:
+                assign[t] = b
+                load[a] -= hours[t]
+                load[b] += hours[t]
+                improved = True
+        if not improved:
+            break
+
+
+def optimal_assign(cost_matrix, hours, workloads, member_hour_cap=DEFAULT_MEMBER_HOUR_CAP):
+    """
+    Whole-batch assignment of tasks under per-member hour caps: the LP
+    relaxation (min-cost flow), rounded to whole tasks, then repaired and
+    improved by local search. A heuristic - see the section comment above.
+
+    Aims at the most tasks placed, then the lowest total SoSTA cost (task
+    order does not matter to the LP), never letting a member's remaining
+    workload exceed 'member_hour_cap'. 'workloads' is updated in place.
+    Returns a list of (member_index, cost) tuples, one per task;
+    member_index is None when no member had room for the task.
+    """
+    costs = assignment_costs(cost_matrix, workloads)
+    capacity = np.maximum(member_hour_cap - workloads, 0.0)
+    results = [None] * cost_matrix.task_count
+
+    # Zero-hour tasks don't use capacity; they simply go to their cheapest member.
+    zero = hours <= 0
+    for row in np.flatnonzero(zero):
+        best = int(np.argmin(costs[row]))
+        results[row] = (best, float(costs[row, best]))
+
+    rows = np.flatnonzero(~zero)
+    if len(rows) and cost_matrix.member_count:
+        # Tasks with the same hours and the same cost row are interchangeable,
+        # so each such group becomes ONE supply node. This is an exact
+        # reduction of the LP, and real backlogs repeat these a lot.
+        keys = np.column_stack([hours[rows], costs[rows]])
+        unique_keys, group_of = np.unique(keys, axis=0, return_inverse=True)
+        group_of = group_of.reshape(-1)
+        group_hours = unique_keys[:, 0]
+        # Placing a task is worth more than any cost difference: each task
+        # earns 'reward', spread over its hours, so when the caps can't take
+        # everything the LP fills them with as many tasks as it can (small
+        # ones first) before looking at cost. Shifted to stay >= 0; with
+        # every hour routed, the shift and the reward change nothing.
+        reward = (np.ptp(costs[rows]) + 1.0) * len(rows)
+        bonus = reward * (1.0 / group_hours.min() - 1.0 / group_hours)
+        solver = _TransportationSolver(
+            unique_keys[:, 1:] / group_hours[:, None] + bonus[:, None],
+            np.bincount(group_of, weights=hours[rows], minlength=len(unique_keys)),
+            capacity,
+        )
+        group_flows = [dict() for _ in range(len(unique_keys))]  # group -> {member: hours}
+        for m, held in enumerate(solver.solve()):
+            for g, amount in held.items():
+                group_flows[g][m] = amount
+
+        # Hand each group's flow back out to its tasks, whole tasks only,
+        # cheapest member first.
+        load = np.zeros(cost_matrix.member_count)
+        fractional = []
+        for row, g in zip(rows, group_of):
+            flow = group_flows[g]
+            for m in sorted(flow, key=lambda m: costs[row, m]):
+                if flow[m] >= hours[row] - FLOW_EPSILON:
+                    flow[m] -= hours[row]
+                    results[row] = (m, float(costs[row, m]))
+                    load[m] += hours[row]
+                    break
+            else:
+                fractional.append((row, g))
+
+        # Round the split (or partly routed) tasks, in task order: prefer the
+        # member carrying most of what's left, then the cheapest member with room.
+        for row, g in fractional:
+            flow = group_flows[g]
+            preference = sorted((m for m in flow if flow[m] > FLOW_EPSILON), key=lambda m: -flow[m])
+            preference += [int(m) for m in np.argsort(costs[row], kind='stable') if m not in preference]
+            for m in preference:
+                if load[m] + hours[row] <= capacity[m] + FLOW_EPSILON:
+                    flow[m] = max(flow.get(m, 0.0) - hours[row], 0.0)
+                    results[row] = (m, float(costs[row, m]))
+                    load[m] += hours[row]
+                    break
+
+        # Repair what rounding stranded, then improve the whole-task result.
+        assign = np.array([results[row][0] if results[row] is not None else -1 for row in rows], dtype=np.intp)
+        _place_stranded(costs[rows], hours[rows], capacity, assign, load, np.flatnonzero(assign < 0))
+        _improve(costs[rows], hours[rows], capacity, assign, load)
+        for row, m in zip(rows, assign):
+            results[row] = (int(m), float(costs[row, m])) if m >= 0 else None
+
+    for row, result in enumerate(results):
+        if result is not None:
+            workloads[result[0]] += hours[row]
+    return [result if result is not None else (None, None) for result in results]
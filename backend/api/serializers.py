@@ -2,13 +2,12 @@
 
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import EmployeeProfile, Project, Task, AvailabilitySlot
+from .models import EmployeeProfile, Project, Task, AvailabilitySlot, Job
 
-# --- V4.0 IMPORTS ---
-# We need these for our dynamic workload calculation
-from django.db.models import Sum, F, FloatField 
-from django.db.models.functions import Coalesce
-# --- END V4.0 IMPORTS ---
+# --- V5.0 IMPORTS ---
+from collections import defaultdict
+from .fieldsets import SparseFieldsMixin
+# --- END V5.0 IMPORTS ---
 
 # --- User & Profile Serializers ---
 
@@ -17,11 +16,11 @@ class EmployeeProfileSerializer(serializers.ModelSerializer):
     Serializer for the EmployeeProfile model.
     Used for the main /api/auth/user endpoint.
     """
-    # --- V4.0 DYNAMIC WORKLOAD ---
-    # We are adding a new, calculated field to show the user's
-    # real-time remaining workload.
-    remaining_workload = serializers.SerializerMethodField()
-    # --- END V4.0 ---
+    # --- V5.0 WORKLOAD LEDGER ---
+    # 'remaining_workload' used to be a SerializerMethodField running a SUM
+    # per profile. It is now a plain model field, kept up to date by delta
+    # (see workload.py), so it's serialized like any other column.
+    # --- END V5.0 ---
 
     class Meta:
         model = EmployeeProfile
@@ -29,30 +28,7 @@ class EmployeeProfileSerializer(serializers.ModelSerializer):
         # 'current_workload' is REMOVED.
         # 'remaining_workload' is ADDED.
         fields = ['profile_data', 'strike_count', 'remaining_workload']
-
-    def get_remaining_workload(self, obj):
-        """
-        [V4.0] Calculates the total remaining work for a user
-        based on their assigned, incomplete tasks.
-        'obj' is the EmployeeProfile instance.
-        """
-        user = obj.user
-        
-        # This is the same logic from our algorithm.py
-        workload_aggregate = Task.objects.filter(
-            assigned_to=user,
-            progress__lt=100  # Only tasks that are not 100% done
-        ).aggregate(
-            total_remaining_work=Coalesce(
-                Sum(
-                    # Formula: hours * (1 - (progress / 100))
-                    F('estimated_hours') * (1.0 - F('progress') / 100.0),
-                    output_field=FloatField()
-                ),
-                0.0  # Default to 0.0 if user has no tasks
-            )
-        )
-        return workload_aggregate['total_remaining_work']
+        read_only_fields = ['remaining_workload']
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -97,13 +73,17 @@ class RegisterSerializer(serializers.ModelSerializer):
 
 # --- Project & Task Serializers ---
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the Task model.
     (No V4.0 changes needed, V2.0 was sufficient)
+    [V5.0] Supports ?fields= (see fieldsets.py).
     """
     assigned_to = serializers.StringRelatedField(read_only=True)
 
+    # V5.0: the assignee's username comes from a join (TaskViewSet select_related()s it)
+    field_columns = {'assigned_to': ('assigned_to', 'assigned_to__username')}
+
     class Meta:
         model = Task
         fields = [
@@ -149,31 +129,30 @@ class DashboardMemberSerializer(serializers.ModelSerializer):
     def get_remaining_workload(self, obj):
         """
         'obj' is the User instance.
-        We re-use the same workload calculation logic.
+        [V5.0] The ProjectSerializer passes every member's workload in
+        the context ('member_workloads'); otherwise it's read straight
+        off the profile's workload ledger.
         """
-        workload_aggregate = Task.objects.filter(
-            assigned_to=obj,
-            progress__lt=100
-        ).aggregate(
-            total_remaining_work=Coalesce(
-                Sum(
-                    F('estimated_hours') * (1.0 - F('progress') / 100.0),
-                    output_field=FloatField()
-                ),
-                0.0
-            )
-        )
-        return workload_aggregate['total_remaining_work']
+        workloads = self.context.get('member_workloads')
+        if workloads is not None and obj.id in workloads:
+            return workloads[obj.id]
+        profile = getattr(obj, 'profile', None)
+        return profile.remaining_workload if profile is not None else 0.0
 
     def get_tasks(self, obj):
         """
         'obj' is the User instance.
         We need to get the tasks assigned to this user, but *only*
         for the project we are currently serializing.
-        
-        We get the project from the 'context' which
-        we will pass in from the ProjectSerializer.
+
+        [V5.0] The ProjectSerializer groups the project's (prefetched)
+        tasks by assignee once and passes them in as 'member_tasks',
+        so this no longer runs a query per member.
         """
+        member_tasks = self.context.get('member_tasks')
+        if member_tasks is not None:
+            return DashboardTaskSerializer(member_tasks.get(obj.id, []), many=True).data
+
         project = self.context.get('project')
         if not project:
             return []
@@ -184,14 +163,27 @@ class DashboardMemberSerializer(serializers.ModelSerializer):
         # Serialize them using our new lightweight dashboard serializer
         return DashboardTaskSerializer(project_tasks, many=True).data
 
+
+class SyncMemberSerializer(DashboardMemberSerializer):
+    """
+    [V5.0] A dashboard member without their task list, for the delta-sync
+    endpoint: the client rebuilds each member's tasks from the task rows
+    it already holds.
+    """
+    class Meta(DashboardMemberSerializer.Meta):
+        fields = ['id', 'username', 'strike_count', 'remaining_workload']
+
 # --- END V4.0 NEW SERIALIZERS ---
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the Project model.
     [V4.0] This is now the main serializer for the ProjectPage,
     powering both the "Unassigned Tasks" list and the "Leader Dashboard".
+    [V5.0] The project LIST leaves out 'members' and 'tasks' (the whole
+    dashboard of every project) unless asked for with ?expand=members,tasks;
+    'member_count' is there instead. See fieldsets.py.
     """
     # This field shows ALL tasks for the project, which our frontend
     # will filter to show the "Unassigned Tasks" (assigned_to=null)
@@ -201,59 +193,106 @@ class ProjectSerializer(serializers.ModelSerializer):
     # 'members' is no longer a simple StringRelatedField.
     # It now uses our new DashboardMemberSerializer to provide
     # the rich data needed for the dashboard UI.
-    members = DashboardMemberSerializer(many=True, read_only=True)
+    # [V5.0] Built once in get_members() (see below) instead of being
+    # serialized, thrown away and re-serialized with the project context.
+    members = serializers.SerializerMethodField()
     # --- END V4.0 ---
 
     leader = serializers.PrimaryKeyRelatedField(read_only=True)
     leader_username = serializers.StringRelatedField(source='leader')
 
+    # --- V5.0: Pass this to /api/projects/<id>/changes/?since= to get only what changed ---
+    sync_version = serializers.SerializerMethodField()
+
+    # --- V5.0 SPARSE FIELDSETS ---
+    member_count = serializers.SerializerMethodField()
+    expandable_fields = ('members', 'tasks')
+    field_columns = {
+        'leader_username': ('leader', 'leader__username'),
+        'members': (), 'tasks': (), 'sync_version': (), 'member_count': (),
+    }
+
     class Meta:
         model = Project
         fields = [
             'id', 'name', 'description', 
             'leader', 'leader_username', 
             'members', # <-- UPGRADED FOR V4.0
-            'tasks'    # <-- Used for "Unassigned Tasks"
+            'tasks',   # <-- Used for "Unassigned Tasks"
+            'auto_assign', # <-- V5.0: assign new tasks on create
+            'sync_version', # <-- V5.0: delta sync
+            'member_count', # <-- V5.0: for the project list, which leaves out 'members'
         ]
 
-    def to_representation(self, instance):
+    def get_sync_version(self, instance):
+        # Read by the view BEFORE the rows were loaded (see sync.py); None on list/create
+        return self.context.get('sync_version')
+
+    def get_member_count(self, instance):
+        # Annotated by ProjectViewSet.get_queryset; counted here otherwise (e.g. on create)
+        count = getattr(instance, 'member_count', None)
+        if count is not None:
+            return count
+        if 'members' in getattr(instance, '_prefetched_objects_cache', {}):
+            return len(instance.members.all())
+        return instance.members.count()
+
+    def get_members(self, instance):
         """
-        [V4.0] We override this method to inject the 'project'
-        instance into the context of the DashboardMemberSerializer.
-        This is *required* so that 'get_tasks' method knows
-        which project to filter by.
+        [V5.0] Serializes the Leader Dashboard in a constant number of
+        queries, however many members and tasks the project has:
+          - members (+ profiles) and tasks come from the prefetch set up
+            in ProjectViewSet.get_queryset (or one query each if absent),
+          - tasks are grouped by assignee here, in Python,
+          - workloads are read off the profiles' workload ledger.
         """
-        # Get the standard data representation
-        data = super().to_representation(instance)
-        
-        # The 'members' field in 'data' was serialized *without*
-        # the project context. We must re-serialize it manually.
-        
-        # 1. Create a copy of the current context
+        prefetched = getattr(instance, '_prefetched_objects_cache', {})
+        if 'members' in prefetched:
+            members = list(instance.members.all())
+        else:
+            members = list(instance.members.select_related('profile'))
+
+        member_tasks = defaultdict(list)
+        for task in instance.tasks.all():
+            if task.assigned_to_id is not None:
+                member_tasks[task.assigned_to_id].append(task)
+
         context = self.context.copy()
-        # 2. Inject the project instance ('instance' is the project)
-        context['project'] = instance 
-        
-        # 3. Re-serialize the 'members' field using our new context
-        #    (We add .select_related('profile') for optimization
-        #    to prevent N+1 queries on profile.strike_count)
-        member_serializer = DashboardMemberSerializer(
-            instance.members.all().select_related('profile'), 
-            many=True, 
-            context=context
-        )
-        
-        # 4. Overwrite the 'members' key in the final data
-        data['members'] = member_serializer.data
-        return data
+        context['project'] = instance
+        context['member_tasks'] = member_tasks
+        # V5.0: the workload ledger rides along on the prefetched profiles
+        context['member_workloads'] = {
+            member.id: member.profile.remaining_workload if hasattr(member, 'profile') else 0.0
+            for member in members
+        }
+
+        return DashboardMemberSerializer(members, many=True, context=context).data
+
+
+# --- V5.0: Background Job Serializer ---
+
+class JobSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    [V5.0] Status (and, once finished, the result) of a background
+    assignment / scheduler run. Read-only: jobs are created by the
+    run_assignment / run_scheduler actions with 'background': true.
+    """
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'kind', 'project', 'status', 'params', 'result', 'error',
+            'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
 
 
 # --- Scheduling Serializer ---
 
-class AvailabilitySlotSerializer(serializers.ModelSerializer):
+class AvailabilitySlotSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the AvailabilitySlot model.
     (No V4.0 changes needed)
+    [V5.0] Supports ?fields= (see fieldsets.py).
     """
     employee = serializers.PrimaryKeyRelatedField(read_only=True)
 
@@ -0,0 +1,207 @@
+# api/signals.py
+
+# --- V5.0 WORKLOAD LEDGER SIGNALS ---
+# Keep EmployeeProfile.remaining_workload in step with every Task that goes
+# through save() / delete(). Each Task remembers what it contributed when it
+# was loaded (post_init); on save we push (new - old) to the affected users.
+# Bulk writes (bulk_update, queryset.update) send no signals and must call
+# workload.record_bulk_task_changes() / apply_workload_deltas() themselves.
+
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .cache import bump_availability_version, bump_membership_version, bump_profiles_version
+from .etags import bump_etags, bump_project_etags, bump_user_etags
+from .models import AvailabilitySlot, EmployeeProfile, Project, SyncCounter, SyncEvent, Task
+from .skills import sync_member_skills
+from .sync import record_membership_changes, record_user_deletion
+from .workload import task_workload, workload_snapshot, snapshot_task, apply_workload_deltas
+
+SNAPSHOT_FIELDS = ('assigned_to_id', 'estimated_hours', 'progress')
+
+
+@receiver(post_init, sender=Task)
+def remember_task_workload(sender, instance, **kwargs):
+    snapshot_task(instance)
+    # V5.0 sync: Task.save() writes a tombstone if the task moves to another project,
+    # and both the old and the new project / assignee get new ETags
+    instance._loaded_project_id = instance.__dict__.get('project_id')
+    instance._loaded_assignee_id = instance.__dict__.get('assigned_to_id')
+
+
+@receiver(pre_save, sender=Task)
+def load_missing_workload_snapshot(sender, instance, **kwargs):
+    # Loaded with .only()/.defer(): we don't know the old contribution yet,
+    # so read it now (one query, only on this uncommon path).
+    if instance._state.adding or getattr(instance, '_workload_snapshot', None) is not None:
+        return
+    instance._workload_snapshot = (
+        Task.objects.filter(pk=instance.pk).values_list(*SNAPSHOT_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=Task)
+def update_workload_on_save(sender, instance, created, update_fields=None, **kwargs):
+    old = None if created else getattr(instance, '_workload_snapshot', None)
+
+    # With save(update_fields=...), fields not in the list were NOT written,
+    # so their stored values are still the old ones.
+    current = dict(zip(SNAPSHOT_FIELDS, (
+        instance.assigned_to_id, instance.estimated_hours, instance.progress
+    )))
+    if update_fields is not None and old is not None:
+        for name, old_value in zip(SNAPSHOT_FIELDS, old):
+            if name not in update_fields and name.removesuffix('_id') not in update_fields:
+                current[name] = old_value
+    new = tuple(current[name] for name in SNAPSHOT_FIELDS)
+
+    deltas = defaultdict(float)
+    if old is not None:
+        deltas[old[0]] -= task_workload(*old)
+    deltas[new[0]] += task_workload(*new)
+    apply_workload_deltas(deltas)
+
+    instance._workload_snapshot = new
+
+
+@receiver(post_delete, sender=Task)
+def update_workload_on_delete(sender, instance, **kwargs):
+    old = getattr(instance, '_workload_snapshot', None) or workload_snapshot(instance)
+    if old is not None:
+        apply_workload_deltas({old[0]: -task_workload(*old)})
+
+
+# --- V5.0 SCHEDULER CACHE INVALIDATION ---
+# Any change to the inputs of the meeting scheduler bumps a version that's
+# part of the cached result's key (see cache.py).
+
+@receiver(post_save, sender=AvailabilitySlot)
+@receiver(post_delete, sender=AvailabilitySlot)
+def invalidate_schedules_on_availability_change(sender, instance, **kwargs):
+    bump_availability_version([instance.employee_id])
+
+
+@receiver(m2m_changed, sender=Project.members.through)
+def invalidate_schedules_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear', 'pre_clear'):
+        return
+    if not reverse:
+        # project.members.add/remove/clear(...): 'instance' is the Project
+        if action != 'pre_clear':
+            bump_membership_version([instance.pk])
+    elif action == 'pre_clear':
+        # user.projects.clear(): pk_set is None, so note the projects first
+        instance._cleared_project_ids = list(instance.projects.values_list('id', flat=True))
+    elif action == 'post_clear':
+        bump_membership_version(getattr(instance, '_cleared_project_ids', []))
+    else:
+        # user.projects.add/remove(...): 'pk_set' holds the Project ids
+        bump_membership_version(pk_set)
+
+
+@receiver(post_save, sender=EmployeeProfile)
+def invalidate_member_features_on_profile_change(sender, instance, update_fields=None, **kwargs):
+    # Skills / preferences feed the auto-assign feature table (cache.get_member_features)
+    if update_fields is None or 'profile_data' in update_fields:
+        bump_profiles_version([instance.user_id])
+
+
+# --- V5.0 SKILL INDEX ---
+# Skill / MemberSkill mirror profile_data["skills"] (see skills.py).
+
+@receiver(post_save, sender=EmployeeProfile)
+def sync_skill_index_on_profile_change(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'profile_data' in update_fields:
+        sync_member_skills(instance.user_id, instance.profile_data)
+
+
+# --- V5.0 DELTA SYNC ---
+# Rows that are gone can't carry a sync_version, so deletions and membership
+# changes are written down as SyncEvents (see sync.py). Each handler runs
+# inside the transaction of the change it records.
+
+@receiver(post_delete, sender=Task)
+def record_task_tombstone(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Project) or getattr(origin, 'model', None) is Project:
+        return # The whole project is going; nobody will ask for its changes
+    SyncEvent.objects.create(
+        version=SyncCounter.next_version(), project_id=instance.project_id,
+        kind=SyncEvent.KIND_TASK, object_id=instance.pk, deleted=True,
+    )
+
+
+@receiver(m2m_changed, sender=Project.members.through)
+def record_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # pk_set is None on clear(): note who is about to go
+        related = instance.projects if reverse else instance.members
+        instance._cleared_sync_ids = list(related.values_list('id', flat=True))
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_cleared_sync_ids', [])
+    elif action not in ('post_add', 'post_remove'):
+        return
+    # add() only reports the ids it actually inserted; remove() every id it was given
+    pairs = [(pk, instance.pk) if reverse else (instance.pk, pk) for pk in pk_set]
+    record_membership_changes(pairs, removed=action != 'post_add')
+    bump_project_etags(project_id for project_id, _ in pairs)
+
+
+@receiver(pre_delete, sender=User)
+def record_member_deletion(sender, instance, **kwargs):
+    bump_project_etags(record_user_deletion(instance))
+
+
+# --- V5.0 ETAG INVALIDATION ---
+# (see etags.py; ledger deltas and bulk writes bump their own)
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_etags_on_task_change(sender, instance, **kwargs):
+    bump_etags(
+        [instance.project_id, getattr(instance, '_loaded_project_id', None)],
+        [instance.assigned_to_id, getattr(instance, '_loaded_assignee_id', None)],
+    )
+
+
+@receiver(post_save, sender=Project)
+def invalidate_etags_on_project_change(sender, instance, **kwargs):
+    bump_project_etags([instance.pk])
+
+
+# Username, strikes and workload show on every dashboard the user is on, so
+# those also bump the user's projects (and so drop their cached dashboards,
+# see dashboard_cache.py). Skills, preferences, last_login... don't.
+DASHBOARD_PROFILE_FIELDS = ('strike_count', 'remaining_workload')
+
+
+def dashboard_figures(profile):
+    """The profile's dashboard columns as loaded (None where deferred)."""
+    return tuple(profile.__dict__.get(field) for field in DASHBOARD_PROFILE_FIELDS)
+
+
+@receiver(post_init, sender=EmployeeProfile)
+def remember_dashboard_figures(sender, instance, **kwargs):
+    instance._loaded_dashboard_figures = dashboard_figures(instance)
+
+
+@receiver(post_save, sender=EmployeeProfile)
+def invalidate_etags_on_profile_change(sender, instance, created=False, **kwargs):
+    figures = dashboard_figures(instance)
+    shown_on_dashboards = created or figures != getattr(instance, '_loaded_dashboard_figures', None)
+    instance._loaded_dashboard_figures = figures
+    bump_user_etags([instance.user_id], with_projects=shown_on_dashboards)
+
+
+@receiver(post_save, sender=User)
+def invalidate_etags_on_user_change(sender, instance, update_fields=None, **kwargs):
+    bump_user_etags([instance.pk], with_projects=update_fields is None or 'username' in update_fields)
+
+
+@receiver(post_save, sender=AvailabilitySlot)
+@receiver(post_delete, sender=AvailabilitySlot)
+def invalidate_etags_on_availability_change(sender, instance, **kwargs):
+    bump_user_etags([instance.employee_id])
@@ -0,0 +1,150 @@
+# api/skills.py
+
+# --- V5.0 NORMALISED SKILL INDEX ---
+# EmployeeProfile.profile_data["skills"] mirrored into Skill / MemberSkill
+# rows (canonical names, one row per user per skill), so that
+#   - the assignment runs can prune each task's candidates to the members
+#     who hold at least one of its required skills (qualified_candidates), and
+#   - "who knows Python and Django?" is answered from an index (search_members)
+# without parsing every profile's JSON.
+# profile_data remains the source of truth; signals.py calls
+# sync_member_skills() whenever it is saved, and 'manage.py
+# rebuild_skill_index' rebuilds everything from scratch.
+
+from collections import defaultdict
+
+import numpy as np
+from django.db.models import Count
+
+from .models import MemberSkill, Skill
+from .scoring import canonical_skill_name, canonical_skills
+
+
+def intern_skills(display_names):
+    """
+    {canonical_name: Skill id} for the given names, creating missing Skills.
+    The first spelling seen becomes the display name.
+    """
+    wanted = {}
+    for name in display_names:
+        canonical = canonical_skill_name(name)
+        if canonical:
+            wanted.setdefault(canonical, ' '.join(str(name).split()))
+    if not wanted:
+        return {}
+    Skill.objects.bulk_create(
+        [Skill(name=name, display_name=display) for name, display in wanted.items()],
+        ignore_conflicts=True,
+    )
+    return dict(Skill.objects.filter(name__in=wanted).values_list('name', 'id'))
+
+
+def sync_member_skills(user_id, profile_data):
+    """
+    Makes the user's MemberSkill rows match profile_data["skills"].
+    Returns True if anything was written.
+    """
+    raw = (profile_data or {}).get('skills', {})
+    levels = canonical_skills(raw if isinstance(raw, dict) else {})
+    current = dict(MemberSkill.objects.filter(user_id=user_id).values_list('skill__name', 'level'))
+    if current == {name: float(level) for name, level in levels.items()}:
+        return False
+
+    # Keep the spelling the profile uses for any skill we haven't seen before
+    spellings = {}
+    for name in (raw if isinstance(raw, dict) else {}):
+        spellings.setdefault(canonical_skill_name(name), name)
+    skill_ids = intern_skills(spellings.get(name, name) for name in levels)
+
+    MemberSkill.objects.filter(user_id=user_id).exclude(skill__name__in=list(levels)).delete()
+    MemberSkill.objects.bulk_create(
+        [MemberSkill(user_id=user_id, skill_id=skill_ids[name], level=level) for name, level in levels.items()],
+        update_conflicts=True,
+        unique_fields=['user', 'skill'],
+        update_fields=['level'],
+    )
+    return True
+
+
+def rebuild_skill_index(profiles):
+    """Re-syncs every given EmployeeProfile. Returns how many users changed."""
+    return sum(sync_member_skills(profile.user_id, profile.profile_data) for profile in profiles)
+
+
+def required_skill_names(task_data):
+    return {canonical_skill_name(name) for name in (task_data.get('required_skills', []) or [])} - {''}
+
+
+def skill_holders(skill_names, user_ids):
+    """
+    {canonical_skill_name: {user_id, ...}} for the users (among 'user_ids')
+    holding each skill at a level above 0. One query.
+    """
+    holders = defaultdict(set)
+    skill_names, user_ids = set(skill_names), list(user_ids)
+    if skill_names and user_ids:
+        rows = MemberSkill.objects.filter(
+            user_id__in=user_ids, skill__name__in=skill_names, level__gt=0
+        ).values_list('skill__name', 'user_id')
+        for skill_name, user_id in rows:
+            holders[skill_name].add(user_id)
+    return holders
+
+
+def qualified_candidates(tasks_data, member_ids, holders=None):
+    """
+    For scoring.greedy_assign(): per task, the sorted positions (in
+    'member_ids') of the members holding at least one required skill, or
+    None for a task that requires no skills (every member is equally
+    qualified, so nothing can be pruned).
+    'holders' (from skill_holders) can be shared between several batches;
+    without it, one query is made for this batch.
+    """
+    required = [required_skill_names(task_data) for task_data in tasks_data]
+    if holders is None:
+        holders = skill_holders(set().union(*required), member_ids)
+
+    position = {user_id: i for i, user_id in enumerate(member_ids)}
+    candidates = []
+    for names in required:
+        if not names:
+            candidates.append(None)
+            continue
+        users = set().union(*(holders.get(name, ()) for name in names))
+        candidates.append(np.array(sorted(position[u] for u in users if u in position), dtype=np.intp))
+    return candidates
+
+
+def search_members(skill_names, match='any', min_level=1, users=None):
+    """
+    Users holding the given skills at level >= min_level, best match first.
+    match='all' requires every skill; 'any' requires at least one.
+    Returns [{'user_id', 'username', 'matched', 'skills': {display_name: level}}].
+    'users' optionally restricts the search to a User queryset.
+    """
+    names = sorted({canonical_skill_name(name) for name in skill_names} - {''})
+    if not names:
+        return []
+
+    matches = MemberSkill.objects.filter(skill__name__in=names, level__gte=min_level)
+    if users is not None:
+        matches = matches.filter(user__in=users)
+
+    per_user = matches.values('user_id').annotate(matched=Count('skill_id', distinct=True))
+    if match == 'all':
+        per_user = per_user.filter(matched=len(names))
+    matched = dict(per_user.values_list('user_id', 'matched'))
+
+    results = {}
+    rows = matches.filter(user_id__in=list(matched)).values_list(
+        'user_id', 'user__username', 'skill__display_name', 'level'
+    )
+    for user_id, username, skill, level in rows:
+        entry = results.setdefault(user_id, {
+            'user_id': user_id, 'username': username, 'matched': matched[user_id], 'skills': {},
+        })
+        entry['skills'][skill] = level
+    return sorted(
+        results.values(),
+        key=lambda entry: (-entry['matched'], -sum(entry['skills'].values()), entry['username']),
+    )
@@ -0,0 +1,99 @@
+# api/sync.py
+
+# --- V5.0 DELTA SYNC ---
+# The project page used to re-fetch the whole project (every task, every
+# member's dashboard) after each change. Now:
+#   - tasks and profiles carry 'sync_version', stamped from SyncCounter in
+#     the same transaction as the change itself (models.py, workload.py,
+#     and every bulk write),
+#   - deleted tasks and membership changes are SyncEvent rows,
+#   - GET /api/projects/<id>/ returns the 'sync_version' it was read at, and
+#     GET /api/projects/<id>/changes/?since=<that> returns only what changed
+#     after it, in a constant number of queries.
+#
+# The current version is read BEFORE the rows. A change that commits in
+# between is sent now AND again next time, which is harmless (the client
+# just overwrites the row); a change can never be skipped.
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import SyncCounter, SyncEvent, Task
+
+
+def current_sync_version():
+    return SyncCounter.current()[0]
+
+
+def record_membership_changes(pairs, removed):
+    """One SyncEvent per (project_id, user_id) pair, all under one new version."""
+    pairs = list(pairs)
+    if not pairs:
+        return
+    with transaction.atomic(savepoint=False):
+        version = SyncCounter.next_version()
+        SyncEvent.objects.bulk_create([
+            SyncEvent(version=version, project_id=project_id, kind=SyncEvent.KIND_MEMBER,
+                      object_id=user_id, deleted=removed)
+            for project_id, user_id in pairs
+        ])
+
+
+def record_user_deletion(user):
+    """
+    A deleted user leaves their projects (the through rows cascade without
+    an m2m_changed signal) and their tasks become unassigned (SET_NULL, no
+    save()). Runs in the deletion's transaction, before those writes.
+    Returns the ids of the projects they were on.
+    """
+    project_ids = list(user.projects.values_list('id', flat=True))
+    with transaction.atomic(savepoint=False):
+        if project_ids:
+            record_membership_changes([(project_id, user.id) for project_id in project_ids], removed=True)
+        tasks = Task.objects.filter(assigned_to=user)
+        if tasks.exists():
+            tasks.update(sync_version=SyncCounter.next_version())
+    return project_ids
+
+
+def project_changes(project, since, task_serializer, member_serializer):
+    """
+    Everything about 'project' that changed after version 'since':
+        {"version", "full": false, "tasks": [...], "deleted_tasks": [ids],
+         "members": [...], "removed_members": [ids]}
+    or {"version", "full": true} when 'since' is older than the pruned
+    tombstones (or from another database): the client must re-fetch.
+    Four queries, whatever the size of the project.
+    """
+    version, pruned_through = SyncCounter.current()
+    if since > version or since < pruned_through:
+        return {"version": version, "full": True}
+
+    # Later events win: a member removed and added again is just "added"
+    deleted_tasks = set()
+    members_added_or_removed = {}
+    events = project.sync_events.filter(version__gt=since).order_by('version', 'id')
+    for kind, object_id, deleted in events.values_list('kind', 'object_id', 'deleted'):
+        if kind == SyncEvent.KIND_TASK:
+            deleted_tasks.add(object_id)
+        else:
+            members_added_or_removed[object_id] = deleted
+
+    tasks = list(project.tasks.filter(sync_version__gt=since).select_related('assigned_to').order_by('id'))
+    deleted_tasks.difference_update(task.id for task in tasks) # Moved away and back again
+
+    added = [user_id for user_id, removed in members_added_or_removed.items() if not removed]
+    members = list(
+        project.members.filter(Q(profile__sync_version__gt=since) | Q(id__in=added))
+        .select_related('profile').order_by('id')
+    )
+    removed = sorted(user_id for user_id, removed in members_added_or_removed.items() if removed)
+
+    return {
+        "version": version,
+        "full": False,
+        "tasks": task_serializer(tasks, many=True).data,
+        "deleted_tasks": sorted(deleted_tasks),
+        "members": member_serializer(members, many=True).data,
+        "removed_members": removed,
+    }
@@ -1,3 +1,2055 @@
-from django.test import TestCase
+import itertools
+import json
+import random
+import time as time_module
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from io import StringIO
 
-# Create your tests here.
+from unittest import mock, skipUnless
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.db.models import F, QuerySet, Sum
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone as django_timezone
+from rest_framework.test import APITestCase
+
+from ctcr_backend.database import READ_REPLICA_ALIAS, sqlite_databases
+
+from . import algorithms, dashboard_cache, db_router, instrumentation, jobs
+from .algorithms import run_batch_task_assignment, run_weighted_task_assignment
+from .cache import cached_scheduler_run
+from .deadlines import DeadlineQueue, overdue_tasks, pending_deadlines, strike_due_tasks, strike_overdue_tasks
+from .jobs import claim_next_job, run_job
+from .management.commands import run_job_worker
+from .middleware import ReadReplicaMiddleware, RequestInstrumentationMiddleware
+from .models import AvailabilitySlot, EmployeeProfile, Job, MemberSkill, Project, Skill, SyncEvent, Task
+from .perfdata import seed_perf_data
+from .skills import qualified_candidates
+from .utils import BusinessCalendar, DateCalculator
+from .workload import aggregate_remaining_workloads, apply_workload_deltas, get_remaining_workloads
+from .scoring import (
+    WEIGHT_WORKLOAD, WEIGHT_SKILL, WEIGHT_PREFERENCE,
+    MAX_SKILL_LEVEL, MAX_PREFERENCE_LEVEL,
+    CostMatrix, greedy_assign, optimal_assign, assignment_costs, canonical_skills,
+)
+
+SKILLS = ['Python', 'Django', 'React', 'SQL', 'Docs']
+CATEGORIES = ['backend', 'frontend', 'Docs', '']
+
+
+def scalar_greedy(tasks_data, hours, profiles_data, workloads):
+    """The original V4.0 nested-loop scoring, kept here as the reference."""
+    workloads = list(workloads)
+    max_workload = max(workloads or [0.0])
+    picks = []
+    for task_data, task_hours in zip(tasks_data, hours):
+        required_skills = task_data.get('required_skills', [])
+        task_category = task_data.get('category', '').lower()
+        best, lowest_cost = None, float('inf')
+        for m, profile_data in enumerate(profiles_data):
+            workload_ratio = workloads[m] / max_workload if max_workload > 0 else 0
+            workload_cost = workload_ratio * WEIGHT_WORKLOAD
+            raw_skill_score = 0
+            member_skills = profile_data.get('skills', {})
+            if required_skills:
+                for skill_name in required_skills:
+                    raw_skill_score += member_skills.get(skill_name, 0)
+                max_possible = len(required_skills) * MAX_SKILL_LEVEL
+            else:
+                max_possible = 1
+            normalized_skill = raw_skill_score / max_possible
+            if not required_skills:
+                normalized_skill = 1.0
+            skill_cost = (1.0 - normalized_skill) * WEIGHT_SKILL
+            raw_preference_score = 0
+            if task_category:
+                raw_preference_score = profile_data.get('preferences', {}).get(task_category, 0)
+            normalized_preference = raw_preference_score / MAX_PREFERENCE_LEVEL
+            if not task_category:
+                normalized_preference = 1.0
+            pref_cost = (1.0 - normalized_preference) * WEIGHT_PREFERENCE
+            final_cost = workload_cost + skill_cost + pref_cost
+            if final_cost < lowest_cost:
+                lowest_cost, best = final_cost, m
+        picks.append((best, lowest_cost))
+        workloads[best] += task_hours
+        max_workload = max(workloads)
+    return picks, workloads
+
+
+def random_profile(rng):
+    return {
+        'skills': {s: rng.randint(0, 5) for s in rng.sample(SKILLS, rng.randint(0, len(SKILLS)))},
+        'preferences': {c.lower(): rng.randint(0, 5) for c in rng.sample(CATEGORIES[:3], rng.randint(0, 3))},
+    }
+
+
+def random_task_data(rng):
+    return {
+        'required_skills': rng.sample(SKILLS, rng.randint(0, 3)),
+        'category': rng.choice(CATEGORIES),
+    }
+
+
+class CostMatrixTests(TestCase):
+
+    def test_greedy_matches_scalar_reference(self):
+        rng = random.Random(7)
+        for _ in range(20):
+            profiles = [random_profile(rng) for _ in range(rng.randint(1, 12))]
+            tasks = [random_task_data(rng) for _ in range(rng.randint(1, 40))]
+            hours = [rng.randint(0, 12) for _ in tasks]
+            workloads = [float(rng.choice([0, 0, 3, 7.5, 20])) for _ in profiles]
+
+            expected, expected_workloads = scalar_greedy(tasks, hours, profiles, workloads)
+            vector_workloads = np.array(workloads, dtype=np.float64)
+            actual = greedy_assign(CostMatrix(tasks, profiles), np.array(hours, dtype=np.float64), vector_workloads)
+
+            self.assertEqual([m for m, _ in actual], [m for m, _ in expected])
+            self.assertEqual([c for _, c in actual], [c for _, c in expected])
+            self.assertEqual(vector_workloads.tolist(), expected_workloads)
+
+
+class OptimalAssignTests(TestCase):
+
+    def brute_force(self, costs, hours, capacity):
+        """Best (most tasks assigned, then lowest cost) by trying every assignment."""
+        best = None
+        task_count, member_count = costs.shape
+        for combo in itertools.product(range(-1, member_count), repeat=task_count):
+            load = np.zeros(member_count)
+            total, placed = 0.0, 0
+            for t, m in enumerate(combo):
+                if m >= 0:
+                    load[m] += hours[t]
+                    total += costs[t, m]
+                    placed += 1
+            if (load <= capacity + 1e-9).all():
+                key = (-placed, round(total, 9))
+                best = key if best is None or key < best else best
+        return best
+
+    def solve_random_batches(self, seed, hours_for):
+        """[(result key, brute-force key), ...] over 60 random batches; checks the caps."""
+        rng = random.Random(seed)
+        outcomes = []
+        for _ in range(60):
+            profiles = [random_profile(rng) for _ in range(rng.randint(1, 3))]
+            tasks = [random_task_data(rng) for _ in range(rng.randint(1, 5))]
+            hours = hours_for(rng, len(tasks))
+            workloads = np.array([float(rng.choice([0, 4, 8])) for _ in profiles])
+            cap = rng.choice([8, 12, 40])
+            cost_matrix = CostMatrix(tasks, profiles)
+            costs = assignment_costs(cost_matrix, workloads)
+            capacity = np.maximum(cap - workloads, 0.0)
+
+            result = optimal_assign(cost_matrix, hours, workloads.copy(), cap)
+
+            load = np.zeros(len(profiles))
+            for t, (m, _) in enumerate(result):
+                if m is not None:
+                    load[m] += hours[t]
+            self.assertTrue((load <= capacity + 1e-9).all())
+            placed = [(m, c) for m, c in result if m is not None]
+            outcomes.append(((-len(placed), round(sum(c for _, c in placed), 9)),
+                             self.brute_force(costs, hours, capacity)))
+        return outcomes
+
+    def test_equal_hours_match_brute_force(self):
+        # Equal sizes keep the LP integral: nothing is rounded, the result is optimal
+        outcomes = self.solve_random_batches(11, lambda rng, n: np.full(n, 4.0))
+        for got, best in outcomes:
+            self.assertEqual(got, best)
+
+    def test_mixed_hours_stay_near_brute_force(self):
+        # Whole tasks of mixed sizes under caps is NP-hard: the rounding is a heuristic
+        outcomes = self.solve_random_batches(11, lambda rng, n: np.array([float(rng.randint(1, 8)) for _ in range(n)]))
+        for got, best in outcomes:
+            self.assertEqual(got[0], best[0])  # Never fewer tasks placed
+        self.assertGreaterEqual(sum(got == best for got, best in outcomes), 57)
+
+    def test_rounding_does_not_strand_a_task_that_fits(self):
+        # Only member 0 has the skill; 6 + 4 hours each is the one way to place all four
+        profiles = [{'skills': {'a': 3}}, {'skills': {}}]
+        tasks = [{'required_skills': ['a']} for _ in range(4)]
+        hours = np.array([6.0, 6.0, 4.0, 4.0])
+        cost_matrix = CostMatrix(tasks, profiles)
+
+        result = optimal_assign(cost_matrix, hours, np.zeros(2), 10)
+
+        self.assertNotIn(None, [m for m, _ in result])
+        self.assertEqual(sorted(hours[t] for t, (m, _) in enumerate(result) if m == 0), [4.0, 6.0])
+        costs = assignment_costs(cost_matrix, np.zeros(2))
+        self.assertEqual((-4, round(sum(c for _, c in result), 9)),
+                         self.brute_force(costs, hours, np.full(2, 10.0)))
+
+    def test_order_independent(self):
+        rng = random.Random(5)
+        profiles = [random_profile(rng) for _ in range(6)]
+        tasks = [random_task_data(rng) for _ in range(30)]
+        hours = np.array([float(rng.randint(1, 8)) for _ in tasks])
+        forward = optimal_assign(CostMatrix(tasks, profiles), hours, np.zeros(6), 30)
+        backward = optimal_assign(CostMatrix(tasks[::-1], profiles), hours[::-1], np.zeros(6), 30)
+        self.assertAlmostEqual(sum(c for m, c in forward if m is not None),
+                               sum(c for m, c in backward if m is not None))
+
+
+class WeightedAssignmentTests(TestCase):
+
+    def make_member(self, username, profile_data, strikes=0):
+        user = User.objects.create_user(username=username, password='x')
+        EmployeeProfile.objects.create(user=user, profile_data=profile_data, strike_count=strikes)
+        return user
+
+    def test_assigns_by_skill_and_skips_struck_members(self):
+        backend = self.make_member('backend', {'skills': {'Python': 5}, 'preferences': {'backend': 5}})
+        frontend = self.make_member('frontend', {'skills': {'React': 5}, 'preferences': {'frontend': 5}})
+        fired = self.make_member('fired', {'skills': {'Python': 5, 'React': 5}}, strikes=5)
+        project = Project.objects.create(name='P', leader=backend)
+        project.members.add(backend, frontend, fired)
+        api = Task.objects.create(project=project, title='API', estimated_hours=4,
+                                  task_data={'required_skills': ['Python'], 'category': 'Backend'})
+        ui = Task.objects.create(project=project, title='UI', estimated_hours=4,
+                                 task_data={'required_skills': ['React'], 'category': 'Frontend'})
+
+        result = run_weighted_task_assignment(project.id)
+
+        self.assertEqual(result['status'], 'success')
+        api.refresh_from_db()
+        ui.refresh_from_db()
+        self.assertEqual(api.assigned_to, backend)
+        self.assertEqual(ui.assigned_to, frontend)
+        self.assertEqual(api.status, 'IN_PROGRESS')
+        self.assertIsNotNone(api.due_date)
+        self.assertEqual(result['rows_written'], 2)
+        self.assertIn('write_ms', result)
+
+    def test_concurrent_assignment_rolls_back_whole_run(self):
+        member = self.make_member('member', {'skills': {'Python': 5}})
+        rival = self.make_member('rival', {})
+        project = Project.objects.create(name='P', leader=member)
+        project.members.add(member)
+        first = Task.objects.create(project=project, title='first')
+        second = Task.objects.create(project=project, title='second')
+
+        real_cost_matrix = algorithms.CostMatrix
+
+        def rival_run_sneaks_in(*args, **kwargs):
+            # Another run assigns 'second' after we loaded the backlog.
+            Task.objects.filter(id=second.id).update(assigned_to=rival)
+            return real_cost_matrix(*args, **kwargs)
+
+        with mock.patch.object(algorithms, 'CostMatrix', side_effect=rival_run_sneaks_in):
+            result = run_weighted_task_assignment(project.id)
+
+        self.assertEqual(result['status'], 'error')
+        self.assertIn('Nothing was saved', result['message'])
+        first.refresh_from_db()
+        self.assertIsNone(first.assigned_to)
+
+    def test_scoring_runs_outside_the_write_transaction(self):
+        # On SQLite an (IMMEDIATE) transaction holds the database-wide write lock
+        member = self.make_member('member', {'skills': {'Python': 5}})
+        project = Project.objects.create(name='P', leader=member)
+        project.members.add(member)
+        Task.objects.create(project=project, title='t', estimated_hours=2)
+
+        depth = len(connection.atomic_blocks)
+        seen = []
+        real_choose_members = algorithms.choose_members
+
+        def record_depth(*args, **kwargs):
+            seen.append(len(connection.atomic_blocks))
+            return real_choose_members(*args, **kwargs)
+
+        with mock.patch.object(algorithms, 'choose_members', side_effect=record_depth):
+            result = run_weighted_task_assignment(project.id)
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(seen, [depth])
+
+
+class RunAssignmentViewTests(APITestCase):
+
+    def setUp(self):
+        self.leader = User.objects.create_user(username='leader', password='x')
+        EmployeeProfile.objects.create(user=self.leader, profile_data={'skills': {'Python': 3}})
+        self.project = Project.objects.create(name='P', leader=self.leader)
+        self.project.members.add(self.leader)
+        self.client.force_authenticate(self.leader)
+
+    def test_rejects_unknown_solver(self):
+        response = self.client.post(f'/api/projects/{self.project.id}/run_assignment/', {'solver': 'magic'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_non_finite_or_negative_hour_cap(self):
+        for cap in ('nan', 'inf', '-inf', '-1', 'lots'):
+            response = self.client.post(
+                f'/api/projects/{self.project.id}/run_assignment/',
+                {'solver': 'optimal', 'member_hour_cap': cap},
+                format='json',
+            )
+            self.assertEqual(response.status_code, 400, cap)
+            self.assertIn('member_hour_cap', response.data['error'])
+
+    def test_optimal_solver_leaves_tasks_over_cap_unassigned(self):
+        small = Task.objects.create(project=self.project, title='small', estimated_hours=3)
+        big = Task.objects.create(project=self.project, title='big', estimated_hours=8)
+        response = self.client.post(
+            f'/api/projects/{self.project.id}/run_assignment/',
+            {'solver': 'optimal', 'member_hour_cap': 5},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        small.refresh_from_db()
+        big.refresh_from_db()
+        self.assertEqual(small.assigned_to, self.leader)
+        self.assertIsNone(big.assigned_to)
+
+
+
+@override_settings(DASHBOARD_CACHE={'ENABLED': False}) # Measures the serializer itself
+class ProjectDashboardQueryTests(APITestCase):
+
+    def setUp(self):
+        self.leader = User.objects.create_user(username='leader', password='x')
+        EmployeeProfile.objects.create(user=self.leader)
+        self.project = Project.objects.create(name='P', leader=self.leader)
+        self.project.members.add(self.leader)
+        self.client.force_authenticate(self.leader)
+        self.other = Project.objects.create(name='Other', leader=self.leader)
+
+    def grow(self, members, tasks_per_member):
+        start = User.objects.count()
+        for i in range(members):
+            user = User.objects.create_user(username=f'member{start + i}', password='x')
+            EmployeeProfile.objects.create(user=user, strike_count=i % 3)
+            self.project.members.add(user)
+            for j in range(tasks_per_member):
+                Task.objects.create(project=self.project, title=f't{i}-{j}', estimated_hours=j + 1,
+                                    progress=(j * 40) % 120, assigned_to=user)
+            # Work on another project counts toward workload, but not the task list
+            Task.objects.create(project=self.other, title='elsewhere', estimated_hours=4, assigned_to=user)
+        Task.objects.create(project=self.project, title='unassigned', estimated_hours=2)
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(f'/api/projects/{self.project.id}/')
+        self.assertEqual(response.status_code, 200)
+        return len(captured), response.data
+
+    def test_query_count_is_constant_in_members_and_tasks(self):
+        self.grow(2, 2)
+        small, _ = self.count_queries()
+        self.grow(15, 6)
+        large, data = self.count_queries()
+        self.assertEqual(small, large)
+        self.assertEqual(len(data['members']), 18)
+
+    def test_dashboard_payload_matches_per_member_queries(self):
+        self.grow(4, 3)
+        _, data = self.count_queries()
+        for member in data['members']:
+            user = User.objects.get(id=member['id'])
+            expected_tasks = Task.objects.filter(project=self.project, assigned_to=user)
+            self.assertEqual([t['id'] for t in member['tasks']], [t.id for t in expected_tasks])
+            expected_workload = sum(
+                t.estimated_hours * (1.0 - t.progress / 100.0)
+                for t in Task.objects.filter(assigned_to=user, progress__lt=100)
+            )
+            self.assertAlmostEqual(member['remaining_workload'], expected_workload)
+            self.assertEqual(member['strike_count'], user.profile.strike_count)
+        self.assertEqual(len(data['tasks']), Task.objects.filter(project=self.project).count())
+
+    def test_add_member_response_includes_new_member(self):
+        newcomer = User.objects.create_user(username='newcomer', password='x')
+        EmployeeProfile.objects.create(user=newcomer)
+        response = self.client.post(f'/api/projects/{self.project.id}/add_member/', {'username': 'newcomer'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('newcomer', [m['username'] for m in response.data['members']])
+
+
+
+class WorkloadLedgerTests(TestCase):
+
+    def setUp(self):
+        self.users = []
+        for name in ('ann', 'bob', 'cat'):
+            user = User.objects.create_user(username=name, password='x')
+            EmployeeProfile.objects.create(user=user)
+            self.users.append(user)
+        self.project = Project.objects.create(name='P', leader=self.users[0])
+        self.project.members.add(*self.users)
+
+    def assertLedgerMatches(self):
+        expected = aggregate_remaining_workloads(u.id for u in self.users)
+        ledger = get_remaining_workloads(u.id for u in self.users)
+        for user in self.users:
+            self.assertAlmostEqual(ledger[user.id], expected[user.id], msg=user.username)
+
+    def test_every_kind_of_task_change_keeps_ledger_in_sync(self):
+        ann, bob, cat = self.users
+        task = Task.objects.create(project=self.project, title='a', estimated_hours=8, assigned_to=ann)
+        self.assertLedgerMatches()
+        self.assertEqual(get_remaining_workloads([ann.id])[ann.id], 8.0)
+
+        task.progress = 25
+        task.save()
+        self.assertLedgerMatches()
+        task.assigned_to = bob
+        task.save()
+        self.assertLedgerMatches()
+        task.estimated_hours = 12
+        task.save(update_fields=['estimated_hours'])
+        self.assertLedgerMatches()
+
+        # A field changed in memory but left out of update_fields isn't stored
+        task.progress = 75
+        task.save(update_fields=['status'])
+        self.assertLedgerMatches()
+        task.save()
+        self.assertLedgerMatches()
+
+        # Loaded with deferred fields, then re-assigned
+        deferred = Task.objects.only('id', 'title').get(id=task.id)
+        deferred.assigned_to = cat
+        deferred.save()
+        self.assertLedgerMatches()
+
+        other = Task.objects.create(project=self.project, title='b', estimated_hours=5, assigned_to=cat)
+        Task.objects.get(id=other.id).delete()
+        self.assertLedgerMatches()
+        done = Task.objects.get(id=task.id)
+        done.progress = 100
+        done.save()
+        self.assertLedgerMatches()
+        self.assertEqual(get_remaining_workloads([cat.id])[cat.id], 0.0)
+
+        Task.objects.create(project=self.project, title='c', estimated_hours=3, assigned_to=ann)
+        self.project.delete()
+        self.assertEqual(get_remaining_workloads(u.id for u in self.users), {u.id: 0.0 for u in self.users})
+
+    def test_assignment_run_updates_ledger(self):
+        for i in range(7):
+            Task.objects.create(project=self.project, title=f't{i}', estimated_hours=i + 1)
+        run_weighted_task_assignment(self.project.id)
+        self.assertFalse(Task.objects.filter(project=self.project, assigned_to=None).exists())
+        self.assertLedgerMatches()
+
+    def test_stale_profile_save_does_not_clobber_ledger(self):
+        ann = self.users[0]
+        stale = EmployeeProfile.objects.get(user=ann)
+        Task.objects.create(project=self.project, title='a', estimated_hours=6, assigned_to=ann)
+        stale.strike_count += 1
+        stale.save()
+        ann.profile.refresh_from_db()
+        self.assertEqual(ann.profile.strike_count, 1)
+        self.assertEqual(ann.profile.remaining_workload, 6.0)
+
+    def test_rebuild_command_checks_and_repairs(self):
+        ann, bob, _ = self.users
+        Task.objects.create(project=self.project, title='a', estimated_hours=4, assigned_to=ann)
+        call_command('rebuild_workload_ledger', '--check', stdout=StringIO())
+
+        # Queryset updates bypass the signals, so they drift the ledger
+        Task.objects.filter(assigned_to=ann).update(assigned_to=bob)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_workload_ledger', '--check', stdout=StringIO())
+        self.assertEqual(get_remaining_workloads([ann.id])[ann.id], 4.0)
+
+        call_command('rebuild_workload_ledger', stdout=StringIO())
+        self.assertLedgerMatches()
+        call_command('rebuild_workload_ledger', '--check', stdout=StringIO())
+
+
+
+class CheckDeadlinesTests(TestCase):
+
+    def setUp(self):
+        self.now = django_timezone.now()
+        self.project = Project.objects.create(name='P')
+        self.users = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'u{i}', password='x')
+            EmployeeProfile.objects.create(user=user, strike_count=i)
+            self.users.append(user)
+        self.no_profile = User.objects.create_user(username='ghost', password='x')
+
+    def task(self, user, hours_ago, status='IN_PROGRESS'):
+        return Task.objects.create(
+            project=self.project, title='t', assigned_to=user, status=status,
+            due_date=self.now - timedelta(hours=hours_ago),
+        )
+
+    def seed(self, per_user):
+        overdue = []
+        for user, n in zip(self.users, per_user):
+            overdue += [self.task(user, 1 + k) for k in range(n)]
+        untouched = [
+            self.task(self.users[0], -5),                 # not due yet
+            self.task(self.users[0], 5, status='DONE'),
+            self.task(self.users[1], 5, status='OVERDUE'),
+            self.task(None, 5),                           # unassigned
+            self.task(self.no_profile, 5),                # no profile to strike
+        ]
+        return overdue, untouched
+
+    def test_strikes_once_per_task_and_only_once(self):
+        overdue, untouched = self.seed([3, 0, 2])
+        before = {t.id: t.status for t in untouched}
+        out = StringIO()
+        call_command('check_deadlines', stdout=out)
+        self.assertIn('5 strike(s) assigned across 2 user(s)', out.getvalue())
+        self.assertIn('User now has 3 strike(s)', out.getvalue())
+
+        self.assertEqual(
+            set(Task.objects.filter(id__in=[t.id for t in overdue]).values_list('status', flat=True)), {'OVERDUE'}
+        )
+        self.assertEqual(dict(Task.objects.filter(id__in=before).values_list('id', 'status')), before)
+        strikes = [EmployeeProfile.objects.get(user=u).strike_count for u in self.users]
+        self.assertEqual(strikes, [3, 1, 4])
+
+        call_command('check_deadlines', stdout=StringIO())
+        self.assertEqual([EmployeeProfile.objects.get(user=u).strike_count for u in self.users], strikes)
+
+    def test_dry_run_writes_nothing(self):
+        overdue, _ = self.seed([2, 1, 0])
+        out = StringIO()
+        call_command('check_deadlines', '--dry-run', stdout=out)
+        self.assertIn('3 strike(s) would be assigned', out.getvalue())
+        self.assertFalse(Task.objects.filter(status='OVERDUE', id__in=[t.id for t in overdue]).exists())
+        self.assertEqual([EmployeeProfile.objects.get(user=u).strike_count for u in self.users], [0, 1, 2])
+
+    def test_query_count_does_not_grow_with_overdue_tasks(self):
+        self.seed([1, 1, 0])
+        with CaptureQueriesContext(connection) as small:
+            call_command('check_deadlines', '--quiet', stdout=StringIO())
+        self.seed([40, 40, 0])
+        with CaptureQueriesContext(connection) as large:
+            call_command('check_deadlines', '--quiet', stdout=StringIO())
+        self.assertEqual(len(small), len(large))
+
+    def test_conflicting_change_rolls_back_and_retries(self):
+        overdue, _ = self.seed([2, 0, 0])
+        real_update = QuerySet.update
+        calls = []
+
+        def racing_update(queryset, **kwargs):
+            if kwargs.get('status') == 'OVERDUE' and not calls:
+                calls.append(1)
+                Task.objects.filter(id=overdue[0].id).update(status='DONE')
+            return real_update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', racing_update):
+            summary = strike_overdue_tasks(self.now)
+        self.assertEqual(summary['strikes'], 2)
+        self.assertEqual(EmployeeProfile.objects.get(user=self.users[0]).strike_count, 2)
+
+
+
+class DeadlineQueueTests(TestCase):
+
+    def setUp(self):
+        self.now = django_timezone.now()
+        self.project = Project.objects.create(name='P')
+        self.user = User.objects.create_user(username='u', password='x')
+        EmployeeProfile.objects.create(user=self.user)
+
+    def task(self, hours_from_now, **kwargs):
+        fields = {'project': self.project, 'title': 't', 'assigned_to': self.user, 'status': 'IN_PROGRESS'}
+        fields.update(kwargs)
+        return Task.objects.create(due_date=self.now + timedelta(hours=hours_from_now), **fields)
+
+    def test_rebuild_loads_only_open_assigned_tasks_in_window(self):
+        late = self.task(-1)
+        soon = self.task(2)
+        self.task(48)                          # beyond the lookahead
+        self.task(-1, status='DONE')
+        self.task(-1, status='OVERDUE')
+        self.task(-1, assigned_to=None)
+        queue = DeadlineQueue(lookahead=timedelta(hours=24))
+        with self.assertNumQueries(1):
+            self.assertEqual(queue.rebuild(self.now), 2)
+        self.assertEqual(queue.next_due(), late.due_date)
+        self.assertEqual(queue.pop_due(self.now), [late.id])
+        self.assertEqual(queue.pop_due(self.now + timedelta(hours=3)), [soon.id])
+
+    def test_refresh_applies_only_changed_tasks(self):
+        moved = self.task(5)
+        finished = self.task(1)
+        queue = DeadlineQueue()
+        queue.rebuild(self.now)
+
+        moved.due_date = self.now + timedelta(hours=3)
+        moved.save(update_fields=['due_date'])
+        finished.progress = 100
+        finished.status = 'DONE'
+        finished.save()
+        added = self.task(2)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(queue.refresh(self.now), 3)
+        self.assertEqual(len(queue), 2)
+        self.assertEqual(queue.pop_due(self.now + timedelta(hours=4)), [added.id, moved.id])
+
+    def test_tick_strikes_exactly_the_expired_tasks(self):
+        expired = self.task(-1)
+        later = self.task(1)
+        queue = DeadlineQueue()
+        self.assertEqual(strike_due_tasks(queue, self.now), 1)
+        self.assertEqual(Task.objects.get(id=expired.id).status, 'OVERDUE')
+        self.assertEqual(Task.objects.get(id=later.id).status, 'IN_PROGRESS')
+
+        # Finished before its deadline: the stale queue entry strikes nothing
+        later.status = 'DONE'
+        later.progress = 100
+        later.save()
+        self.assertEqual(strike_due_tasks(queue, self.now + timedelta(hours=2)), 0)
+        self.assertEqual(EmployeeProfile.objects.get(user=self.user).strike_count, 1)
+
+    def test_bulk_writers_bump_updated_at(self):
+        task = self.task(-1)
+        before = Task.objects.get(id=task.id).updated_at
+        strike_overdue_tasks(django_timezone.now())
+        self.assertGreater(Task.objects.get(id=task.id).updated_at, before)
+
+    def test_daemon_command_single_tick(self):
+        self.task(-1)
+        out = StringIO()
+        call_command('run_deadline_daemon', '--once', stdout=out)
+        self.assertIn('1 strike(s) assigned', out.getvalue())
+        self.assertEqual(EmployeeProfile.objects.get(user=self.user).strike_count, 1)
+
+
+
+class BackgroundJobTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.leader = User.objects.create_user(username='leader', password='x')
+        EmployeeProfile.objects.create(user=self.leader, profile_data={'skills': {'Python': 3}})
+        self.project = Project.objects.create(name='P', leader=self.leader)
+        self.project.members.add(self.leader)
+        self.client.force_authenticate(self.leader)
+        for i in range(3):
+            Task.objects.create(project=self.project, title=f't{i}', estimated_hours=2)
+
+    def submit(self, action, **data):
+        return self.client.post(f'/api/projects/{self.project.id}/{action}/', {'background': True, **data}, format='json')
+
+    def test_submit_returns_202_and_worker_completes_job(self):
+        response = self.submit('run_assignment', solver='optimal')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'QUEUED')
+        self.assertEqual(response['Location'], f"/api/jobs/{response.data['id']}/")
+        self.assertTrue(Task.objects.filter(project=self.project, assigned_to=None).exists())
+
+        call_command('run_job_worker', '--processes', '0', '--burst', stdout=StringIO())
+
+        job = self.client.get(f"/api/jobs/{response.data['id']}/").data
+        self.assertEqual(job['status'], 'SUCCEEDED')
+        self.assertEqual(job['result']['rows_written'], 3)
+        self.assertEqual(job['params'], {'solver': 'optimal', 'member_hour_cap': None})
+        self.assertFalse(Task.objects.filter(project=self.project, assigned_to=None).exists())
+
+    def test_one_active_assignment_job_per_project(self):
+        first = self.submit('run_assignment')
+        second = self.submit('run_assignment')
+        self.assertEqual(second.status_code, 409)
+        self.assertEqual(second.data['job']['id'], first.data['id'])
+
+        # Scheduler jobs, and assignment jobs for other projects, aren't limited
+        self.assertEqual(self.submit('run_scheduler', duration_hours=1).status_code, 202)
+        other = Project.objects.create(name='Other', leader=self.leader)
+        other.members.add(self.leader)
+        response = self.client.post(f'/api/projects/{other.id}/run_assignment/', {'background': True}, format='json')
+        self.assertEqual(response.status_code, 202)
+
+        call_command('run_job_worker', '--processes', '0', '--burst', stdout=StringIO())
+        self.assertEqual(self.submit('run_assignment').status_code, 202)
+
+    def test_claims_are_exclusive_and_oldest_first(self):
+        ids = [self.submit('run_scheduler', duration_hours=h).data['id'] for h in (1, 2)]
+        self.assertEqual(claim_next_job('a'), ids[0])
+        self.assertEqual(claim_next_job('b'), ids[1])
+        self.assertIsNone(claim_next_job('c'))
+        self.assertEqual(Job.objects.get(id=ids[0]).worker, 'a')
+
+    def test_failures_are_recorded(self):
+        job_id = self.submit('run_scheduler', duration_hours=1).data['id']
+        with mock.patch.object(algorithms, 'run_exact_scheduler', side_effect=RuntimeError('boom')):
+            call_command('run_job_worker', '--processes', '0', '--burst', stdout=StringIO())
+        job = Job.objects.get(id=job_id)
+        self.assertEqual(job.status, 'FAILED')
+        self.assertIn('boom', job.error)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_broken_pool_requeues_the_claimed_job_and_starts_a_new_pool(self):
+        job_id = self.submit('run_assignment').data['id']
+        pools = []
+
+        class InlinePool:
+            """Stands in for ProcessPoolExecutor; the first one lost a process."""
+            def __init__(self, *args, **kwargs):
+                self.broken = not pools
+                self.shut_down = False
+                pools.append(self)
+
+            def submit(self, fn, job_id):
+                if self.broken:
+                    raise BrokenProcessPool('A process in the process pool was terminated abruptly')
+                future = Future()
+                future.set_result(run_job(job_id))
+                return future
+
+            def shutdown(self, wait=True, cancel_futures=False):
+                self.shut_down = True
+
+        out = StringIO()
+        with mock.patch.object(run_job_worker, 'ProcessPoolExecutor', InlinePool), \
+                mock.patch.object(run_job_worker.connections, 'close_all'): # Would close the test's connection
+            call_command('run_job_worker', '--processes', '2', '--burst', stdout=out)
+
+        self.assertIn(f'Job #{job_id}: requeued', out.getvalue())
+        self.assertEqual(Job.objects.get(id=job_id).status, 'SUCCEEDED')
+        self.assertEqual(len(pools), 2)
+        self.assertTrue(all(pool.shut_down for pool in pools))
+
+    def test_jobs_are_only_visible_to_project_members(self):
+        job_id = self.submit('run_scheduler', duration_hours=1).data['id']
+        outsider = User.objects.create_user(username='outsider', password='x')
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.client.get(f'/api/jobs/{job_id}/').status_code, 404)
+
+    def test_synchronous_call_is_unchanged(self):
+        response = self.client.post(f'/api/projects/{self.project.id}/run_assignment/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Job.objects.exists())
+
+
+
+class SchedulerCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.members = [User.objects.create_user(username=f'm{i}', password='x') for i in range(2)]
+        self.outsider = User.objects.create_user(username='outsider', password='x')
+        self.project = Project.objects.create(name='P', leader=self.members[0])
+        self.project.members.add(*self.members)
+        self.params = {'solver': 'exact', 'duration_hours': 1.0, 'top_k': 5, 'horizon_weeks': None}
+        patcher = mock.patch.object(
+            algorithms, 'run_exact_scheduler', return_value={'status': 'success', 'best_slot': None, 'alternatives': []}
+        )
+        self.scheduler = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_scheduler(self, **overrides):
+        return jobs.execute(Job.KIND_SCHEDULER, self.project.id, {**self.params, **overrides})
+
+    def add_slot(self, user):
+        start = django_timezone.now()
+        return AvailabilitySlot.objects.create(employee=user, start_time=start, end_time=start + timedelta(hours=1))
+
+    def test_identical_requests_hit_the_cache(self):
+        self.run_scheduler()
+        self.run_scheduler()
+        self.assertEqual(self.scheduler.call_count, 1)
+        self.run_scheduler(duration_hours=2.0)
+        self.assertEqual(self.scheduler.call_count, 2)
+
+    def test_member_availability_changes_invalidate(self):
+        self.run_scheduler()
+        slot = self.add_slot(self.members[1])
+        self.run_scheduler()
+        self.assertEqual(self.scheduler.call_count, 2)
+
+        slot.end_time += timedelta(hours=1)
+        slot.save()
+        self.run_scheduler()
+        slot.delete()
+        self.run_scheduler()
+        self.assertEqual(self.scheduler.call_count, 4)
+
+        # Someone outside the project changing their availability doesn't matter
+        self.add_slot(self.outsider)
+        self.run_scheduler()
+        self.assertEqual(self.scheduler.call_count, 4)
+
+    def test_changes_made_by_other_processes_invalidate(self):
+        # E.g. a job worker with its own cache: the web server's writes must reach it, and vice versa
+        self.run_scheduler()
+        with other_process():
+            self.add_slot(self.members[1])
+        self.run_scheduler()
+        with other_process():
+            self.project.members.add(self.outsider)
+        self.run_scheduler()
+        self.assertEqual(self.scheduler.call_count, 3)
+
+    def test_membership_changes_invalidate_from_either_side(self):
+        self.run_scheduler()
+        self.project.members.add(self.outsider)
+        self.run_scheduler()
+        self.outsider.projects.remove(self.project)
+        self.run_scheduler()
+        self.members[1].projects.clear()
+        self.run_scheduler()
+        self.assertEqual(self.scheduler.call_count, 4)
+
+    def test_errors_are_not_cached(self):
+        self.scheduler.return_value = {'status': 'error', 'message': 'No overlapping availability'}
+        self.run_scheduler()
+        self.run_scheduler()
+        self.assertEqual(self.scheduler.call_count, 2)
+
+
+class SchedulerCoalescingTests(TransactionTestCase):  # Its threads read the versions: no open write transaction
+
+    def setUp(self):
+        cache.clear()
+        leader = User.objects.create_user(username='leader', password='x')
+        self.project = Project.objects.create(name='P', leader=leader)
+        self.project.members.add(leader)
+        self.params = {'solver': 'exact', 'duration_hours': 1.0, 'top_k': 5, 'horizon_weeks': None}
+
+    def test_concurrent_identical_requests_compute_once(self):
+        calls = []
+
+        def slow_compute():
+            calls.append(1)
+            time_module.sleep(0.3)
+            return {'status': 'success', 'best_slot': 'x'}
+
+        week_start = algorithms.get_ist_week_start()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [
+                pool.submit(cached_scheduler_run, self.project.id, self.params, week_start, slow_compute)
+                for _ in range(8)
+            ]
+            outcomes = [f.result() for f in futures]
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual({result['best_slot'] for result, _ in outcomes}, {'x'})
+        self.assertEqual(sorted(outcome for _, outcome in outcomes).count('miss'), 1)
+
+
+
+class Rollback(Exception):
+    pass
+
+
+class AutoAssignTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.rng = random.Random(15)
+        self.leader = User.objects.create_user(username='leader', password='x')
+        EmployeeProfile.objects.create(user=self.leader, profile_data=random_profile(self.rng))
+        self.project = Project.objects.create(name='P', leader=self.leader, auto_assign=True)
+        self.project.members.add(self.leader)
+        self.client.force_authenticate(self.leader)
+
+    def add_members(self, count):
+        for _ in range(count):
+            user = User.objects.create_user(username=f'm{User.objects.count()}', password='x')
+            EmployeeProfile.objects.create(
+                user=user, profile_data=random_profile(self.rng), strike_count=self.rng.choice([0, 0, 0, 5])
+            )
+            self.project.members.add(user)
+            # Some existing work, so workloads differ
+            Task.objects.create(project=self.project, title='old', estimated_hours=self.rng.randint(1, 8),
+                                assigned_to=user, progress=self.rng.choice([0, 25, 50]))
+
+    def payload(self, count):
+        return [
+            {'project': self.project.id, 'title': f'new{i}', 'estimated_hours': self.rng.randint(1, 8),
+             'task_data': random_task_data(self.rng)}
+            for i in range(count)
+        ]
+
+    def full_run_assignees(self, payload):
+        """What a whole-project run_weighted_task_assignment would pick, then rolled back."""
+        try:
+            with transaction.atomic():
+                for row in payload:
+                    Task.objects.create(project=self.project, title=row['title'],
+                                        estimated_hours=row['estimated_hours'], task_data=row['task_data'])
+                run_weighted_task_assignment(self.project.id)
+                picks = {t.title: t.assigned_to_id for t in Task.objects.filter(title__startswith='new')}
+                raise Rollback()
+        except Rollback:
+            return picks
+
+    def test_bulk_create_matches_a_full_run(self):
+        self.add_members(6)
+        payload = self.payload(12)
+        expected = self.full_run_assignees(payload)
+
+        response = self.client.post('/api/tasks/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 12)
+        actual = {t.title: t.assigned_to_id for t in Task.objects.filter(title__startswith='new')}
+        self.assertEqual(actual, expected)
+        self.assertTrue(all(t.due_date and t.status == 'IN_PROGRESS' for t in Task.objects.filter(title__startswith='new')))
+        call_command('rebuild_workload_ledger', '--check', stdout=StringIO())
+
+    def test_single_create_matches_a_full_run(self):
+        self.add_members(4)
+        for row in self.payload(3):
+            expected = self.full_run_assignees([row])
+            response = self.client.post('/api/tasks/', row, format='json')
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(Task.objects.get(id=response.data['id']).assigned_to_id, expected[row['title']])
+        call_command('rebuild_workload_ledger', '--check', stdout=StringIO())
+
+    def test_query_count_does_not_grow_with_members(self):
+        def create_one():
+            with CaptureQueriesContext(connection) as captured:
+                self.assertEqual(self.client.post('/api/tasks/', self.payload(1)[0], format='json').status_code, 201)
+            return len(captured)
+
+        self.add_members(2)
+        create_one() # Warm the feature table
+        small = create_one()
+        self.add_members(15)
+        create_one()
+        self.assertEqual(create_one(), small)
+
+    def test_profile_change_refreshes_cached_features(self):
+        self.leader.profile.profile_data = {'skills': {}}
+        self.leader.profile.save()
+        expert = User.objects.create_user(username='expert', password='x')
+        EmployeeProfile.objects.create(user=expert, profile_data={'skills': {}})
+        self.project.members.add(expert)
+        row = {'project': self.project.id, 'title': 'py', 'estimated_hours': 1, 'task_data': {'required_skills': ['Python']}}
+        self.client.post('/api/tasks/', row, format='json') # Caches the (empty) skills
+
+        expert.profile.profile_data = {'skills': {'Python': 5}}
+        expert.profile.save()
+        response = self.client.post('/api/tasks/', {**row, 'title': 'py2'}, format='json')
+        self.assertEqual(Task.objects.get(id=response.data['id']).assigned_to, expert)
+
+    def test_auto_assign_off_leaves_tasks_unassigned(self):
+        self.project.auto_assign = False
+        self.project.save()
+        response = self.client.post('/api/tasks/', self.payload(3), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Task.objects.filter(project=self.project, assigned_to=None).count(), 3)
+
+    def test_bulk_create_validation(self):
+        other = Project.objects.create(name='Other', leader=self.leader)
+        mixed = self.payload(1) + [{'project': other.id, 'title': 'x', 'estimated_hours': 1}]
+        self.assertEqual(self.client.post('/api/tasks/', mixed, format='json').status_code, 400)
+        self.assertEqual(self.client.post('/api/tasks/', [], format='json').status_code, 400)
+        outsider = User.objects.create_user(username='outsider', password='x')
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.client.post('/api/tasks/', self.payload(2), format='json').status_code, 403)
+
+
+
+class BatchAssignmentTests(APITestCase):
+
+    def setUp(self):
+        self.rng = random.Random(16)
+        self.users = []
+        for i in range(8):
+            user = User.objects.create_user(username=f'u{i}', password='x')
+            EmployeeProfile.objects.create(user=user, profile_data=random_profile(self.rng),
+                                           strike_count=5 if i == 7 else 0)
+            self.users.append(user)
+        self.projects = []
+
+    def add_projects(self, count, tasks_per_project=5):
+        for _ in range(count):
+            project = Project.objects.create(name=f'p{len(self.projects)}')
+            # Overlapping teams: every project shares members with others
+            project.members.add(*self.rng.sample(self.users, self.rng.randint(2, 5)))
+            for i in range(tasks_per_project):
+                Task.objects.create(project=project, title=f't{i}', estimated_hours=self.rng.randint(1, 8),
+                                    task_data=random_task_data(self.rng))
+            self.projects.append(project)
+
+    def assignees(self):
+        return dict(Task.objects.values_list('id', 'assigned_to_id'))
+
+    def test_matches_sequential_per_project_runs(self):
+        self.add_projects(5)
+        try:
+            with transaction.atomic():
+                for project in self.projects:
+                    run_weighted_task_assignment(project.id)
+                expected = self.assignees()
+                raise Rollback()
+        except Rollback:
+            pass
+
+        result = run_batch_task_assignment()
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(self.assignees(), expected)
+        self.assertEqual(result['rows_written'], 25)
+        self.assertEqual([r['project_id'] for r in result['projects']], [p.id for p in self.projects])
+        self.assertTrue(all('ms' in r for r in result['projects']))
+        self.assertNotIn(self.users[7].id, set(self.assignees().values()))
+        call_command('rebuild_workload_ledger', '--check', stdout=StringIO())
+
+    def test_query_count_does_not_grow_with_projects(self):
+        self.add_projects(2)
+        with CaptureQueriesContext(connection) as small:
+            run_batch_task_assignment()
+        self.add_projects(10)
+        with CaptureQueriesContext(connection) as large:
+            run_batch_task_assignment()
+        self.assertEqual(len(small), len(large))
+
+    def test_scoring_runs_outside_the_write_transaction(self):
+        # One IMMEDIATE transaction over the whole batch would lock out every writer
+        self.add_projects(3)
+        depth = len(connection.atomic_blocks)
+        seen = []
+        real_choose_members = algorithms.choose_members
+
+        def record_depth(*args, **kwargs):
+            seen.append(len(connection.atomic_blocks))
+            return real_choose_members(*args, **kwargs)
+
+        with mock.patch.object(algorithms, 'choose_members', side_effect=record_depth):
+            result = run_batch_task_assignment()
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(seen, [depth] * 3)
+
+    def test_concurrent_write_rolls_back_the_whole_batch(self):
+        self.add_projects(2)
+        stolen = self.projects[1].tasks.first()
+        real_choose_members = algorithms.choose_members
+
+        def rival_run_sneaks_in(*args, **kwargs):
+            Task.objects.filter(id=stolen.id).update(assigned_to=self.users[0])
+            return real_choose_members(*args, **kwargs)
+
+        with mock.patch.object(algorithms, 'choose_members', side_effect=rival_run_sneaks_in):
+            result = run_batch_task_assignment()
+        self.assertEqual(result['status'], 'error')
+        self.assertIn('Nothing was saved', result['message'])
+        self.assertEqual(Task.objects.filter(assigned_to__isnull=False).count(), 1)
+
+    def test_selected_projects_only(self):
+        self.add_projects(3)
+        result = run_batch_task_assignment([self.projects[1].id])
+        self.assertEqual([r['project_id'] for r in result['projects']], [self.projects[1].id])
+        self.assertEqual(Task.objects.filter(assigned_to__isnull=False).count(), 5)
+
+    def test_admin_only_endpoint_and_command(self):
+        self.add_projects(2)
+        self.client.force_authenticate(self.users[0])
+        self.assertEqual(self.client.post('/api/assignment/batch/', {}, format='json').status_code, 403)
+
+        admin = User.objects.create_superuser(username='admin', password='x')
+        self.client.force_authenticate(admin)
+        response = self.client.post('/api/assignment/batch/', {'project_ids': [self.projects[0].id]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['rows_written'], 5)
+        self.assertEqual(self.client.post('/api/assignment/batch/', {'solver': 'magic'}, format='json').status_code, 400)
+        for cap in ('nan', 'inf', '-1'):
+            response = self.client.post('/api/assignment/batch/', {'member_hour_cap': cap}, format='json')
+            self.assertEqual(response.status_code, 400)
+        with self.assertRaises(CommandError):
+            call_command('run_batch_assignment', '--member-hour-cap', 'nan', stdout=StringIO())
+
+        out = StringIO()
+        call_command('run_batch_assignment', stdout=out)
+        self.assertIn(f'#{self.projects[1].id} p1', out.getvalue())
+        self.assertIn('5 task(s) assigned across 2 project(s)', out.getvalue())
+
+
+def loop_add_business_hours(start_dt, hours_to_add):
+    """The original day-by-day DateCalculator walk, kept as the reference."""
+    def next_start(dt):
+        next_day = dt.date() + timedelta(days=1)
+        while next_day.weekday() >= 5:
+            next_day += timedelta(days=1)
+        return datetime.combine(next_day, time(9, 0), tzinfo=dt.tzinfo)
+
+    current_dt, remaining_hours = start_dt, hours_to_add
+    if current_dt.weekday() >= 5 or current_dt.time() >= time(17, 0):
+        current_dt = next_start(current_dt)
+    elif current_dt.time() < time(9, 0):
+        current_dt = current_dt.replace(hour=9, minute=0, second=0, microsecond=0)
+    while remaining_hours > 0:
+        hours_left_in_day = (current_dt.replace(hour=17, minute=0, second=0, microsecond=0) - current_dt).total_seconds() / 3600.0
+        if hours_left_in_day >= remaining_hours:
+            current_dt += timedelta(hours=remaining_hours)
+            remaining_hours = 0
+        else:
+            remaining_hours -= hours_left_in_day
+            current_dt = next_start(current_dt)
+    return current_dt
+
+
+class SkillIndexTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='ana', password='x')
+        self.profile = EmployeeProfile.objects.create(
+            user=self.user, profile_data={'skills': {' Python ': 4, 'PYTHON': 2, 'React': 3, 'Bad': None}}
+        )
+        self.project = Project.objects.create(name='P', leader=self.user)
+        self.project.members.add(self.user)
+        self.client.force_authenticate(self.user)
+
+    def indexed(self, user):
+        return dict(MemberSkill.objects.filter(user=user).values_list('skill__name', 'level'))
+
+    def test_canonical_names_match_across_spellings(self):
+        self.assertEqual(canonical_skills(self.profile.profile_data['skills']), {'python': 4, 'react': 3})
+        matrix = CostMatrix([{'required_skills': ['python']}, {'required_skills': ['REACT ']}], [self.profile.profile_data])
+        self.assertAlmostEqual(matrix.skill_cost[0, 0], (1 - 4 / MAX_SKILL_LEVEL) * WEIGHT_SKILL)
+        self.assertAlmostEqual(matrix.skill_cost[1, 0], (1 - 3 / MAX_SKILL_LEVEL) * WEIGHT_SKILL)
+        self.assertEqual(self.indexed(self.user), {'python': 4.0, 'react': 3.0})
+        self.assertEqual(Skill.objects.get(name='python').display_name, 'Python')
+
+    def test_index_follows_profile_updates(self):
+        response = self.client.put('/api/auth/profile/', {'profile_data': {'skills': {'react': 5, 'SQL': 1}}}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.indexed(self.user), {'react': 5.0, 'sql': 1.0})
+
+        # Saving something else leaves the index alone
+        with CaptureQueriesContext(connection) as captured:
+            EmployeeProfile.objects.get(user=self.user).save(update_fields=['strike_count'])
+        self.assertFalse([q for q in captured if 'memberskill' in q['sql'].lower()])
+
+        EmployeeProfile.objects.filter(user=self.user).update(profile_data={})
+        call_command('rebuild_skill_index', stdout=StringIO())
+        self.assertEqual(self.indexed(self.user), {})
+
+    def test_pruned_greedy_matches_full_greedy(self):
+        rng = random.Random(17)
+        for round_ in range(15):
+            users = []
+            for i in range(rng.randint(1, 12)):
+                user = User.objects.create_user(username=f'r{round_}-{i}', password='x')
+                EmployeeProfile.objects.create(user=user, profile_data=random_profile(rng))
+                users.append(user)
+            profiles = [user.profile.profile_data for user in users]
+            tasks = [random_task_data(rng) for _ in range(rng.randint(1, 40))]
+            hours = np.array([rng.randint(0, 12) for _ in tasks], dtype=np.float64)
+            workloads = [float(rng.choice([0, 0, 3, 7.5, 20])) for _ in users]
+
+            matrix = CostMatrix(tasks, profiles)
+            full_workloads = np.array(workloads)
+            pruned_workloads = np.array(workloads)
+            full = greedy_assign(matrix, hours, full_workloads)
+            candidates = qualified_candidates(tasks, [user.id for user in users])
+            pruned = greedy_assign(matrix, hours, pruned_workloads, candidates)
+
+            self.assertEqual(pruned, full)
+            self.assertEqual(pruned_workloads.tolist(), full_workloads.tolist())
+
+    def test_search_endpoint(self):
+        bob = User.objects.create_user(username='bob', password='x')
+        EmployeeProfile.objects.create(user=bob, profile_data={'skills': {'python': 5}})
+        self.project.members.add(bob)
+        stranger = User.objects.create_user(username='eve', password='x')
+        EmployeeProfile.objects.create(user=stranger, profile_data={'skills': {'Python': 5, 'React': 5}})
+
+        response = self.client.get('/api/skills/search/?skills=PYTHON,react')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['username'] for r in response.data], ['ana', 'bob'])  # eve shares no project
+        self.assertEqual(response.data[0]['skills'], {'Python': 4.0, 'React': 3.0})
+
+        response = self.client.get('/api/skills/search/?skills=python&min_level=5')
+        self.assertEqual([r['username'] for r in response.data], ['bob'])
+        response = self.client.get('/api/skills/search/?skills=python,react&match=all')
+        self.assertEqual([r['username'] for r in response.data], ['ana'])
+        self.assertEqual(self.client.get('/api/skills/search/?skills=').status_code, 400)
+        self.assertEqual(self.client.get('/api/skills/search/?skills=x&project=999').status_code, 404)
+
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite's")
+class QueryPlanTests(TestCase):
+
+    def setUp(self):
+        self.now = django_timezone.now()
+        self.user = User.objects.create_user(username='u', password='x')
+        EmployeeProfile.objects.create(user=self.user)
+        self.project = Project.objects.create(name='P')
+        self.project.members.add(self.user)
+        Task.objects.bulk_create(
+            Task(project=self.project, title=f't{i}', assigned_to=self.user if i % 2 else None,
+                 status=['TODO', 'IN_PROGRESS', 'DONE'][i % 3], due_date=self.now + timedelta(hours=i - 25))
+            for i in range(50)
+        )
+
+    def assertUsesIndex(self, queryset, index_name):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            steps = [row[-1] for row in cursor.fetchall()]
+        task_steps = [step for step in steps if ' api_task ' in f'{step} ' or ' api_availabilityslot ' in f'{step} ']
+        self.assertTrue(task_steps, steps)
+        for step in task_steps:
+            self.assertNotIn('SCAN', step, steps)
+            self.assertIn(index_name, step, steps)
+
+    def test_workload_aggregate(self):
+        tasks = Task.objects.filter(assigned_to__isnull=False, progress__lt=100, assigned_to__id__in=[self.user.id])
+        rows = tasks.values('assigned_to').annotate(total=Sum(F('estimated_hours') * (1.0 - F('progress') / 100.0)))
+        self.assertUsesIndex(rows, 'COVERING INDEX task_assignee_progress_idx')
+
+    def test_unassigned_backlog_and_dashboard(self):
+        self.assertUsesIndex(self.project.tasks.filter(assigned_to=None), 'task_project_assignee_idx')
+        self.assertUsesIndex(
+            Task.objects.filter(project_id__in=[self.project.id], assigned_to=None).order_by('project_id', 'id'),
+            'task_project_assignee_idx',
+        )
+        self.assertUsesIndex(Task.objects.filter(assigned_to=self.user, project=self.project), 'task_project_assignee_idx')
+
+    def test_deadline_queries_use_the_partial_index(self):
+        self.assertUsesIndex(overdue_tasks(self.now), 'task_open_due_date_idx')
+        self.assertUsesIndex(pending_deadlines().filter(due_date__lt=self.now), 'task_open_due_date_idx')
+        # The index only holds open tasks, so results must not change
+        self.assertEqual(
+            set(overdue_tasks(self.now).values_list('id', flat=True)),
+            set(Task.objects.filter(due_date__lt=self.now, status__in=['TODO', 'IN_PROGRESS'],
+                                    assigned_to__isnull=False).values_list('id', flat=True)),
+        )
+
+    def test_scheduler_window(self):
+        slots = AvailabilitySlot.objects.filter(
+            employee__projects=self.project, end_time__gt=self.now, start_time__lt=self.now + timedelta(days=5),
+        ).values_list('employee_id', 'start_time', 'end_time')
+        self.assertUsesIndex(slots, 'slot_employee_start_idx')
+
+    def test_benchmark_command_leaves_no_trace(self):
+        out = StringIO()
+        call_command('benchmark_indexes', tasks=300, users=20, projects=3, repeat=1, stdout=out)
+        self.assertIn('overdue tasks', out.getvalue())
+        self.assertEqual(Task.objects.count(), 50)
+        with connection.cursor() as cursor:
+            names = {index for index in connection.introspection.get_constraints(cursor, 'api_task')}
+        self.assertIn('task_open_due_date_idx', names)
+
+
+class DatabaseProfileTests(TransactionTestCase):  # Routing depends on being outside a transaction
+
+    def test_development_is_the_default(self):
+        default = sqlite_databases('/srv', {})['default']
+        self.assertEqual(default['NAME'], '/srv/db.sqlite3')
+        self.assertEqual(default['CONN_MAX_AGE'], 0)
+        self.assertEqual(default['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        self.assertEqual(default['OPTIONS']['init_command'], '')
+
+    def test_production_profile_and_overrides(self):
+        databases = sqlite_databases('/srv', {
+            'DB_PROFILE': 'production', 'SQLITE_PATH': '/data/team.db', 'SQLITE_MMAP_SIZE_MB': '0',
+            'SQLITE_BUSY_TIMEOUT': '5', 'SQLITE_READ_REPLICA': 'same',
+        })
+        default, replica = databases['default'], databases[READ_REPLICA_ALIAS]
+        self.assertEqual(default['NAME'], '/data/team.db')
+        self.assertEqual(default['CONN_MAX_AGE'], 600)
+        self.assertTrue(default['CONN_HEALTH_CHECKS'])
+        self.assertEqual(default['OPTIONS']['timeout'], 5.0)
+        self.assertEqual(
+            default['OPTIONS']['init_command'],
+            'PRAGMA journal_mode=WAL;PRAGMA synchronous=NORMAL;PRAGMA cache_size=-65536',
+        )
+        self.assertEqual(replica['NAME'], 'file:/data/team.db?mode=ro')
+        self.assertEqual(replica['OPTIONS']['init_command'], 'PRAGMA query_only=1;PRAGMA cache_size=-65536')
+        self.assertEqual(replica['TEST'], {'MIRROR': 'default'})
+        with self.assertRaises(ValueError):
+            sqlite_databases('/srv', {'SQLITE_SYNCHRONOUS': 'sometimes'})
+
+    def test_reads_of_safe_requests_go_to_the_replica(self):
+        self.assertNotIn(READ_REPLICA_ALIAS, settings.DATABASES)  # Not configured in tests
+        with self.assertRaises(MiddlewareNotUsed):
+            ReadReplicaMiddleware(lambda request: None)
+
+        seen = []
+        def view(request):
+            seen.append((Task.objects.all().db, db_router.ReadReplicaRouter().db_for_write(Task)))
+            return None
+
+        replica_settings = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'file:x?mode=ro'}
+        with mock.patch.dict('django.conf.settings.DATABASES', {READ_REPLICA_ALIAS: replica_settings}), \
+                mock.patch.object(db_router, 'replica_configured', return_value=True):
+            middleware = ReadReplicaMiddleware(view)
+            middleware(RequestFactory().get('/api/projects/'))
+            middleware(RequestFactory().post('/api/tasks/'))
+            with db_router.read_replica(), transaction.atomic():
+                seen.append((Task.objects.all().db, None))  # Inside a write transaction: read our own writes
+        self.assertEqual(seen, [(READ_REPLICA_ALIAS, 'default'), ('default', 'default'), ('default', None)])
+        self.assertEqual(Task.objects.all().db, 'default')
+
+    def test_concurrency_benchmark_runs(self):
+        out = StringIO()
+        call_command('benchmark_db_concurrency', seconds=0.2, tasks=200, writers=1, readers=1, stdout=out)
+        for profile in ('bare', 'development', 'production'):
+            self.assertIn(profile, out.getvalue())
+
+
+class PerfDataTests(TestCase):
+
+    def snapshot(self, dataset):
+        return (
+            list(EmployeeProfile.objects.filter(user_id__in=dataset.user_ids).order_by('user__username')
+                 .values_list('user__username', 'profile_data', 'remaining_workload')),
+            list(Task.objects.filter(project_id__in=dataset.project_ids).order_by('title')
+                 .values_list('title', 'project__name', 'assigned_to__username', 'estimated_hours', 'progress', 'status', 'task_data')),
+            list(AvailabilitySlot.objects.filter(employee_id__in=dataset.user_ids).order_by('employee__username', 'start_time', 'end_time')
+                 .values_list('employee__username', 'start_time', 'end_time')),
+        )
+
+    def test_same_seed_same_data(self):
+        now = django_timezone.now()
+        snapshots = []
+        for _ in range(2):
+            try:
+                with transaction.atomic():
+                    dataset = seed_perf_data(30, 4, 300, 60, seed=3, now=now)
+                    snapshots.append(self.snapshot(dataset))
+                    raise Rollback()
+            except Rollback:
+                pass
+        self.assertEqual(snapshots[0], snapshots[1])
+        self.assertEqual(dataset.summary(), {'users': 30, 'projects': 4, 'tasks': 300, 'slots': 60})
+
+    def test_derived_data_is_consistent(self):
+        call_command('seed_perf_data', users=30, projects=4, tasks=300, slots=60, seed=8, stdout=StringIO())
+        self.assertEqual(Project.objects.filter(name__startswith='perf8_', members__isnull=True).count(), 0)
+        call_command('rebuild_workload_ledger', '--check', stdout=StringIO())
+        out = StringIO()
+        call_command('rebuild_skill_index', stdout=out)
+        self.assertIn('Re-indexed 0 profile(s)', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('seed_perf_data', users=1, seed=8, stdout=StringIO())
+        call_command('seed_perf_data', users=0, seed=8, clear=True, stdout=StringIO())
+        self.assertFalse(User.objects.filter(username__startswith='perf8_').exists())
+
+    def test_benchmark_suite_report(self):
+        tiny = {'users': 12, 'projects': 2, 'tasks': 120, 'slots': 40}
+        out = StringIO()
+        with mock.patch.dict('api.management.commands.benchmark_suite.SCALES', {'small': tiny}):
+            call_command('benchmark_suite', scales=['small'], repeat=1, stdout=out, stderr=StringIO())
+        report = json.loads(out.getvalue())
+        benchmarks = report['scales']['small']['benchmarks']
+        self.assertEqual(set(benchmarks), {
+            'run_weighted_task_assignment', 'run_genetic_scheduler', 'check_deadlines', 'project_detail', 'my_tasks',
+            'project_detail_not_modified', 'my_tasks_not_modified',
+        })
+        self.assertLess(benchmarks['project_detail_not_modified']['queries'], benchmarks['project_detail']['queries'])
+        self.assertEqual(benchmarks['project_detail_not_modified']['response_bytes'], 0)
+        for measured in benchmarks.values():
+            self.assertGreater(measured['queries'], 0)
+            self.assertGreater(measured['peak_memory_kb'], 0)
+            self.assertIn('median', measured['wall_ms'])
+        self.assertEqual(report['scales']['small']['dataset'], tiny)
+        self.assertFalse(User.objects.filter(username__startswith='suite').exists())  # Rolled back
+
+
+@override_settings(API_INSTRUMENTATION={'ENABLED': True})
+class InstrumentationTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        instrumentation.rolling_summary.clear()
+        self.leader = User.objects.create_user(username='leader', password='x')
+        EmployeeProfile.objects.create(user=self.leader, profile_data={'skills': {'Python': 3}})
+        self.project = Project.objects.create(name='P', leader=self.leader)
+        self.project.members.add(self.leader)
+        Task.objects.create(project=self.project, title='t', estimated_hours=2, task_data={'required_skills': ['Python']})
+        self.client.force_authenticate(self.leader)
+
+    def test_server_timing_header_and_log_line(self):
+        with self.assertLogs('api.instrumentation', level='INFO') as logs:
+            response = self.client.post(f'/api/projects/{self.project.id}/run_assignment/')
+        self.assertEqual(response.status_code, 200)
+        timing = response['Server-Timing']
+        for entry in ('total;dur=', 'db;dur=', 'queries"', 'load;dur=', 'score;dur=', 'persist;dur='):
+            self.assertIn(entry, timing)
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['endpoint'], 'POST project-run-assignment')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['user_id'], self.leader.id)
+        self.assertGreater(record['queries'], 0)
+        self.assertEqual(set(record['phases_ms']), {'load', 'score', 'persist'})
+        self.assertEqual(record['response_bytes'], len(response.content))
+
+    def test_admin_summary_endpoint(self):
+        for _ in range(3):
+            self.client.get(f'/api/projects/{self.project.id}/')
+        self.assertEqual(self.client.get('/api/instrumentation/summary/').status_code, 403)
+
+        admin = User.objects.create_user(username='admin', password='x', is_staff=True)
+        self.client.force_authenticate(admin)
+        body = self.client.get('/api/instrumentation/summary/').json()
+        self.assertTrue(body['enabled'])
+        detail = body['endpoints']['GET project-detail']
+        self.assertEqual(detail['count'], 3)
+        self.assertEqual(set(detail['queries']), {'p50', 'p95', 'p99', 'max'})
+
+    def test_summary_keeps_the_last_window_requests(self):
+        summary = instrumentation.RollingSummary()
+        for i in range(1, 11):
+            summary.add({'endpoint': 'GET x', 'total_ms': i, 'db_ms': 0, 'queries': i, 'response_bytes': None}, window=4)
+        entry = summary.summary()['GET x']
+        self.assertEqual(entry['count'], 4)
+        self.assertEqual(entry['total_ms'], {'p50': 8, 'p95': 10, 'p99': 10, 'max': 10})
+        self.assertNotIn('response_bytes', entry)
+
+    @override_settings(API_INSTRUMENTATION={'ENABLED': False})
+    def test_disabled_is_a_no_op(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            RequestInstrumentationMiddleware(lambda request: None)
+        self.assertIsNone(instrumentation.current_metrics())
+        with instrumentation.phase('score'):
+            instrumentation.start_phase('load')
+            instrumentation.end_phase()
+        response = self.client.get(f'/api/projects/{self.project.id}/')
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(instrumentation.rolling_summary.summary(), {})
+
+
+class DeltaSyncTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.leader = User.objects.create_user(username='leader', password='x')
+        self.member = User.objects.create_user(username='member', password='x')
+        self.newcomer = User.objects.create_user(username='newcomer', password='x')
+        for user in (self.leader, self.member, self.newcomer):
+            EmployeeProfile.objects.create(user=user, profile_data={'skills': {'Python': 3}})
+        self.project = Project.objects.create(name='P', leader=self.leader)
+        self.project.members.add(self.leader, self.member)
+        self.kept = Task.objects.create(project=self.project, title='kept', estimated_hours=4, assigned_to=self.leader)
+        self.doomed = Task.objects.create(project=self.project, title='doomed', estimated_hours=2)
+        self.untouched = Task.objects.create(project=self.project, title='untouched', estimated_hours=1)
+        self.client.force_authenticate(self.leader)
+
+    def changes(self, since):
+        response = self.client.get(f'/api/projects/{self.project.id}/changes/', {'since': since})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_changes_since_the_fetched_version(self):
+        version = self.client.get(f'/api/projects/{self.project.id}/').json()['sync_version']
+        self.assertEqual(self.changes(version)['tasks'], [])
+
+        self.client.post(f'/api/tasks/{self.kept.id}/set_progress/', {'progress': 50})
+        self.client.delete(f'/api/tasks/{self.doomed.id}/')
+        self.client.post(f'/api/projects/{self.project.id}/add_member/', {'username': 'newcomer'})
+        self.client.post(f'/api/projects/{self.project.id}/remove_member/', {'username': 'member'})
+
+        changes = self.changes(version)
+        self.assertFalse(changes['full'])
+        self.assertEqual([task['id'] for task in changes['tasks']], [self.kept.id])
+        self.assertEqual(changes['tasks'][0]['progress'], 50)
+        self.assertEqual(changes['deleted_tasks'], [self.doomed.id])
+        # The leader's workload moved with the progress; the newcomer joined
+        members = {member['username']: member for member in changes['members']}
+        self.assertEqual(set(members), {'leader', 'newcomer'})
+        self.assertEqual(members['leader']['remaining_workload'], 2.0)
+        self.assertEqual(changes['removed_members'], [self.member.id])
+
+        settled = self.changes(changes['version'])
+        self.assertEqual((settled['tasks'], settled['deleted_tasks'], settled['members'], settled['removed_members']), ([], [], [], []))
+
+    def test_bulk_writes_are_versioned_too(self):
+        version = self.changes(0)['version']
+        run_weighted_task_assignment(self.project.id)
+        changes = self.changes(version)
+        self.assertEqual({task['id'] for task in changes['tasks']}, {self.doomed.id, self.untouched.id})
+        # Both tasks went to the idle member; the leader's workload didn't move
+        self.assertEqual([(m['username'], m['remaining_workload']) for m in changes['members']], [('member', 3.0)])
+
+    def test_moved_task_is_a_tombstone_in_the_old_project(self):
+        other = Project.objects.create(name='Other', leader=self.leader)
+        version = self.changes(0)['version']
+        self.untouched.project = other
+        self.untouched.save()
+        self.assertEqual(self.changes(version)['deleted_tasks'], [self.untouched.id])
+
+    def test_cost_does_not_grow_with_the_project(self):
+        version = self.changes(0)['version']
+        self.client.post(f'/api/tasks/{self.kept.id}/set_progress/', {'progress': 25})
+        with CaptureQueriesContext(connection) as small:
+            self.changes(version)
+        Task.objects.bulk_create([Task(project=self.project, title=f'bulk{i}') for i in range(200)])
+        with CaptureQueriesContext(connection) as large:
+            changes = self.changes(version)
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(len(changes['tasks']), 1)  # bulk_create without a version: not a change
+
+    def test_stale_or_foreign_versions_ask_for_a_full_fetch(self):
+        self.assertEqual(self.client.get(f'/api/projects/{self.project.id}/changes/').status_code, 400)
+        version = self.changes(0)['version']
+        self.assertTrue(self.changes(version + 100)['full'])
+
+        SyncEvent.objects.update(created_at=django_timezone.now() - timedelta(days=60))
+        call_command('prune_sync_events', days=30, stdout=StringIO())
+        self.assertFalse(SyncEvent.objects.exists())
+        self.assertTrue(self.changes(0)['full'])
+        self.assertFalse(self.changes(version)['full'])
+
+
+def other_process():
+    """Runs a block the way another process would: with local-memory caches of its own."""
+    locmem = 'django.core.cache.backends.locmem.LocMemCache'
+    return override_settings(CACHES={
+        'default': {'BACKEND': locmem, 'LOCATION': 'other-process'},
+        'dashboards': {'BACKEND': locmem, 'LOCATION': 'other-process-dashboards'},
+    })
+
+
+class ConditionalGetTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.leader = User.objects.create_user(username='leader', password='x')
+        self.outsider = User.objects.create_user(username='outsider', password='x')
+        for user in (self.leader, self.outsider):
+            EmployeeProfile.objects.create(user=user, profile_data={'skills': {'Python': 3}})
+        self.project = Project.objects.create(name='P', leader=self.leader)
+        self.project.members.add(self.leader)
+        self.task = Task.objects.create(project=self.project, title='t', estimated_hours=4, assigned_to=self.leader)
+        self.client.force_authenticate(self.leader)
+
+    def revalidate(self, path, etag):
+        """Status of a conditional GET (and the queries it took)."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        return response.status_code, len(queries)
+
+    def test_unchanged_resources_are_304_after_one_query(self):
+        for path in (f'/api/projects/{self.project.id}/', '/api/auth/user/', '/api/tasks/my_tasks/', '/api/availability/'):
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response['ETag'].startswith('W/"'))
+            self.assertEqual(self.revalidate(path, response['ETag']), (304, 1))  # The token
+            self.assertEqual(self.revalidate(path, 'W/"something-else"')[0], 200)
+
+    def test_writes_change_the_etags(self):
+        project_path = f'/api/projects/{self.project.id}/'
+        etags = lambda: (self.client.get(project_path)['ETag'], self.client.get('/api/tasks/my_tasks/')['ETag'])
+
+        before = etags()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/tasks/{self.task.id}/set_progress/', {'progress': 50})
+        after_progress = etags()
+        self.assertNotEqual(before[0], after_progress[0])
+        self.assertNotEqual(before[1], after_progress[1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/projects/{self.project.id}/add_member/', {'username': 'outsider'})
+        after_membership = etags()
+        self.assertNotEqual(after_progress[0], after_membership[0])
+        self.assertEqual(after_progress[1], after_membership[1])  # The leader's own tasks didn't change
+
+        # A member's workload shows on the dashboard: their task elsewhere changes this project's ETag
+        elsewhere = Project.objects.create(name='Elsewhere', leader=self.outsider)
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(project=elsewhere, title='x', estimated_hours=2, assigned_to=self.outsider)
+        self.assertNotEqual(after_membership[0], etags()[0])
+
+        user_etag = self.client.get('/api/auth/user/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch('/api/auth/profile/', {'profile_data': {'skills': {'Go': 2}}}, format='json')
+        self.assertEqual(self.revalidate('/api/auth/user/', user_etag)[0], 200)
+
+        slots_etag = self.client.get('/api/availability/')['ETag']
+        now = django_timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            AvailabilitySlot.objects.create(employee=self.leader, start_time=now, end_time=now + timedelta(hours=1))
+        self.assertEqual(self.revalidate('/api/availability/', slots_etag)[0], 200)
+
+    def test_non_members_never_get_a_304(self):
+        path = f'/api/projects/{self.project.id}/'
+        etag = self.client.get(path)['ETag']
+        self.client.force_authenticate(self.outsider)
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response)
+        self.assertEqual(self.client.get(f'/api/projects/{self.project.id + 1000}/',
+                                         HTTP_IF_NONE_MATCH=etag).status_code, 404)
+
+    def test_each_shape_and_page_has_its_own_etag(self):
+        now = django_timezone.now()
+        for i in range(3):
+            AvailabilitySlot.objects.create(employee=self.leader, start_time=now + timedelta(hours=i),
+                                            end_time=now + timedelta(hours=i, minutes=30))
+        etag = lambda path: self.client.get(path)['ETag']
+
+        project_path = f'/api/projects/{self.project.id}/'
+        full = etag(project_path)
+        sparse = etag(f'{project_path}?fields=id,name')
+        self.assertNotEqual(full, sparse)
+        self.assertEqual(sparse, etag(f'{project_path}?fields=name,id'))
+        self.assertEqual(self.revalidate(f'{project_path}?fields=id', sparse)[0], 200)
+        self.assertEqual(self.revalidate(f'{project_path}?fields=name,id', sparse)[0], 304)
+
+        first = self.client.get('/api/availability/', {'page_size': 1})
+        second_path = first.data['next']
+        self.assertNotEqual(first['ETag'], etag(second_path))
+        self.assertEqual(self.revalidate(second_path, first['ETag'])[0], 200)
+        self.assertEqual(self.revalidate(second_path, etag(second_path))[0], 304)
+        self.assertNotEqual(etag('/api/availability/'), etag('/api/availability/?fields=id'))
+        self.assertNotEqual(etag('/api/tasks/my_tasks/'), etag('/api/tasks/my_tasks/?page_size=1'))
+
+    def test_writes_by_other_processes_change_the_etags(self):
+        project_path = f'/api/projects/{self.project.id}/'
+        Task.objects.filter(id=self.task.id).update(due_date=django_timezone.now() - timedelta(days=1))
+        project_etag = self.client.get(project_path)['ETag']
+        tasks_etag = self.client.get('/api/tasks/my_tasks/')['ETag']
+
+        with other_process():
+            call_command('check_deadlines', stdout=StringIO())
+
+        self.assertEqual(self.revalidate(project_path, project_etag)[0], 200)
+        self.assertEqual(self.revalidate('/api/tasks/my_tasks/', tasks_etag)[0], 200)
+
+    def test_rolled_back_writes_keep_the_etag(self):
+        etag = self.client.get(f'/api/projects/{self.project.id}/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.task.progress = 100
+                    self.task.save()
+                    raise Rollback()
+            except Rollback:
+                pass
+        self.assertEqual(self.revalidate(f'/api/projects/{self.project.id}/', etag)[0], 304)
+
+
+class PaginationAndFieldsetTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.leader = User.objects.create_user(username='leader', password='x')
+        self.members = [User.objects.create_user(username=f'm{i}', password='x') for i in range(3)]
+        for user in [self.leader, *self.members]:
+            EmployeeProfile.objects.create(user=user, profile_data={'skills': {'Python': 3}})
+        self.projects = []
+        for i in range(3):
+            project = Project.objects.create(name=f'P{i}', leader=self.leader)
+            project.members.add(self.leader, *self.members[:i + 1])
+            Task.objects.bulk_create([
+                Task(project=project, title=f't{i}-{n}', estimated_hours=2, assigned_to=self.members[n % (i + 1)])
+                for n in range(4)
+            ])
+            self.projects.append(project)
+        self.client.force_authenticate(self.leader)
+
+    def walk(self, path, **params):
+        """Every row of a paginated list, following the 'next' cursors."""
+        rows, pages = [], 0
+        response = self.client.get(path, params)
+        while True:
+            self.assertEqual(response.status_code, 200, response.data)
+            rows += response.data['results']
+            pages += 1
+            if not response.data['next']:
+                return rows, pages
+            response = self.client.get(response.data['next'])
+
+    def test_project_list_is_lightweight_with_member_counts(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/projects/')
+        self.assertEqual(len(queries), 1) # No prefetches, counts in a subquery
+        rows = response.data['results']
+        self.assertEqual([row['name'] for row in rows], ['P0', 'P1', 'P2'])
+        self.assertEqual([row['member_count'] for row in rows], [2, 3, 4])
+        self.assertNotIn('tasks', rows[0])
+        self.assertNotIn('members', rows[0])
+        self.assertEqual(rows[0]['leader_username'], 'leader')
+
+        # The detail still has the whole dashboard
+        detail = self.client.get(f'/api/projects/{self.projects[1].id}/').data
+        self.assertEqual(len(detail['tasks']), 4)
+        self.assertEqual(len(detail['members']), 3)
+        self.assertEqual(detail['member_count'], 3)
+
+    def test_expand_and_fields(self):
+        rows = self.client.get('/api/projects/', {'expand': 'members,tasks'}).data['results']
+        self.assertEqual(len(rows[2]['tasks']), 4)
+        self.assertEqual(sorted(member['username'] for member in rows[2]['members']), ['leader', 'm0', 'm1', 'm2'])
+        member_tasks = {member['username']: len(member['tasks']) for member in rows[2]['members']}
+        self.assertEqual(member_tasks, {'leader': 0, 'm0': 2, 'm1': 1, 'm2': 1})
+
+        rows = self.client.get('/api/projects/', {'expand': 'members'}).data['results']
+        self.assertNotIn('tasks', rows[0])
+        self.assertEqual(len(rows[0]['members'][1]['tasks']), 4)
+
+        rows = self.client.get('/api/projects/', {'fields': 'id,name'}).data['results']
+        self.assertEqual(set(rows[0]), {'id', 'name'})
+        detail = self.client.get(f'/api/projects/{self.projects[0].id}/', {'fields': 'id,member_count'}).data
+        self.assertEqual(detail, {'id': self.projects[0].id, 'member_count': 2})
+
+        for params in ({'fields': 'id,nope'}, {'expand': 'name'}):
+            response = self.client.get('/api/projects/', params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('error', response.data)
+
+    def test_querysets_select_only_the_requested_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            rows = self.client.get('/api/tasks/', {'fields': 'id,title'}).data['results']
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(set(rows[0]), {'id', 'title'})
+        sql = queries[0]['sql']
+        self.assertNotIn('task_data', sql)
+        self.assertNotIn('description', sql)
+
+        # The assignee comes from a join, not a query per task
+        with CaptureQueriesContext(connection) as queries:
+            rows = self.client.get('/api/tasks/', {'fields': 'id,assigned_to'}).data['results']
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(rows[0]['assigned_to'], 'm0')
+
+    def test_cursor_pages_cover_every_row_once(self):
+        tasks, pages = self.walk('/api/tasks/', page_size=5)
+        self.assertEqual(pages, 3)
+        self.assertEqual(sorted(task['id'] for task in tasks), sorted(Task.objects.values_list('id', flat=True)))
+
+        self.client.force_authenticate(self.members[0])
+        mine, pages = self.walk('/api/tasks/my_tasks/', page_size=2, fields='id,assigned_to')
+        self.assertEqual(len(mine), Task.objects.filter(assigned_to=self.members[0]).count())
+        self.assertEqual({task['assigned_to'] for task in mine}, {'m0'})
+
+    def test_jobs_are_listed_newest_first(self):
+        jobs_made = [Job.objects.create(kind='scheduler', project=self.projects[0]) for _ in range(3)]
+        rows, pages = self.walk('/api/jobs/', page_size=2, fields='id,status')
+        self.assertEqual(pages, 2)
+        self.assertEqual([row['id'] for row in rows], [job.id for job in reversed(jobs_made)])
+
+
+class DashboardCacheTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        caches['dashboards'].clear()
+        dashboard_cache.counters.clear()
+        self.leader = User.objects.create_user(username='leader', password='x')
+        self.member = User.objects.create_user(username='member', password='x')
+        self.outsider = User.objects.create_user(username='outsider', password='x')
+        for user in (self.leader, self.member, self.outsider):
+            EmployeeProfile.objects.create(user=user, profile_data={'skills': {'Python': 3}})
+        self.project = Project.objects.create(name='P', leader=self.leader)
+        self.project.members.add(self.leader, self.member)
+        self.task = Task.objects.create(project=self.project, title='t', estimated_hours=4, assigned_to=self.member)
+        self.path = f'/api/projects/{self.project.id}/'
+        self.client.force_authenticate(self.leader)
+
+    def fetch(self, **params):
+        response = self.client.get(self.path, params)
+        self.assertEqual(response.status_code, 200)
+        return response.get('X-Dashboard-Cache'), response.json()
+
+    def member_row(self, data, user):
+        return next(member for member in data['members'] if member['id'] == user.id)
+
+    def test_repeated_reads_are_hits_without_other_queries(self):
+        outcome, first = self.fetch()
+        self.assertEqual(outcome, 'miss')
+        with CaptureQueriesContext(connection) as queries:
+            outcome, second = self.fetch()
+        self.assertEqual((outcome, len(queries)), ('hit', 2))  # The token, for the ETag and for the key
+        self.assertEqual(first, second)
+        self.assertEqual(dashboard_cache.counters.summary(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_writes_that_show_on_the_dashboard_invalidate_it(self):
+        self.fetch()
+        self.client.force_authenticate(self.member) # Only the assignee reports progress
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/tasks/{self.task.id}/set_progress/', {'progress': 50})
+        self.assertEqual(response.status_code, 200)
+        self.client.force_authenticate(self.leader)
+        outcome, data = self.fetch()
+        self.assertEqual(outcome, 'miss')
+        self.assertEqual(data['tasks'][0]['progress'], 50)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'{self.path}add_member/', {'username': 'outsider'})
+        outcome, data = self.fetch()
+        self.assertEqual(outcome, 'miss')
+        self.assertEqual(len(data['members']), 3)
+
+        profile = EmployeeProfile.objects.get(user=self.member)
+        profile.strike_count = 2
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        outcome, data = self.fetch()
+        self.assertEqual(outcome, 'miss')
+        self.assertEqual(self.member_row(data, self.member)['strike_count'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_workload_deltas({self.member.id: 5.0})
+        outcome, data = self.fetch()
+        self.assertEqual(outcome, 'miss')
+        self.assertAlmostEqual(self.member_row(data, self.member)['remaining_workload'], 7.0)
+
+    def test_writes_by_other_processes_invalidate_it(self):
+        Task.objects.filter(id=self.task.id).update(due_date=django_timezone.now() - timedelta(days=1))
+        self.assertEqual(self.fetch()[0], 'miss')
+        self.assertEqual(self.fetch()[0], 'hit')
+
+        with other_process():
+            call_command('check_deadlines', stdout=StringIO())
+
+        outcome, data = self.fetch()
+        self.assertEqual(outcome, 'miss')
+        self.assertEqual(data['tasks'][0]['status'], 'OVERDUE')
+        self.assertEqual(self.member_row(data, self.member)['strike_count'], 1)
+
+    def test_writes_that_dont_show_keep_the_entry(self):
+        self.fetch()
+        profile = EmployeeProfile.objects.get(user=self.member)
+        profile.profile_data = {'skills': {'Go': 4}}
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+            self.member.last_login = django_timezone.now()
+            self.member.save(update_fields=['last_login'])
+            AvailabilitySlot.objects.create(employee=self.member, start_time=django_timezone.now(),
+                                            end_time=django_timezone.now() + timedelta(hours=1))
+        self.assertEqual(self.fetch()[0], 'hit')
+
+    def test_entries_are_per_viewer(self):
+        self.fetch()
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.fetch()[0], 'miss')
+        self.assertEqual(self.fetch()[0], 'hit')
+
+        # A non-member is turned away, and nothing is cached for them
+        self.client.force_authenticate(self.outsider)
+        self.assertEqual(self.client.get(self.path).status_code, 404)
+        self.assertEqual(self.client.get(self.path).status_code, 404)
+
+        # Nor does a removed member keep reading the cached copy
+        self.client.force_authenticate(self.leader)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'{self.path}remove_member/', {'username': 'member'})
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.client.get(self.path).status_code, 404)
+
+    def test_sparse_requests_bypass_the_cache(self):
+        outcome, data = self.fetch(fields='id,name')
+        self.assertIsNone(outcome)
+        self.assertEqual(set(data), {'id', 'name'})
+        self.assertEqual(dashboard_cache.counters.summary()['misses'], 0)
+
+    @override_settings(DASHBOARD_CACHE={'ENABLED': False})
+    def test_switch_turns_it_off(self):
+        self.fetch()
+        outcome, _ = self.fetch()
+        self.assertIsNone(outcome)
+        self.assertEqual(dashboard_cache.counters.summary(), {'hits': 0, 'misses': 0, 'hit_rate': None})
+
+    def test_counters_in_the_admin_summary(self):
+        self.fetch()
+        self.fetch()
+        admin = User.objects.create_user(username='admin', password='x', is_staff=True)
+        self.client.force_authenticate(admin)
+        body = self.client.get('/api/instrumentation/summary/').json()
+        self.assertEqual(body['dashboard_cache'], {'enabled': True, 'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+
+class DateCalculatorTests(TestCase):
+
+    def test_documented_examples(self):
+        calculator = DateCalculator()
+        thursday_10 = datetime(2025, 11, 13, 10, 0, tzinfo=dt_timezone.utc)
+        thursday_15 = datetime(2025, 11, 13, 15, 0, tzinfo=dt_timezone.utc)
+        friday_15 = datetime(2025, 11, 14, 15, 0, tzinfo=dt_timezone.utc)
+        self.assertEqual(calculator.add_business_hours(thursday_10, 2), datetime(2025, 11, 13, 12, 0, tzinfo=dt_timezone.utc))
+        self.assertEqual(calculator.add_business_hours(thursday_15, 4), datetime(2025, 11, 14, 11, 0, tzinfo=dt_timezone.utc))
+        self.assertEqual(calculator.add_business_hours(friday_15, 4), datetime(2025, 11, 17, 11, 0, tzinfo=dt_timezone.utc))
+        self.assertEqual(calculator.get_next_business_day_start(friday_15), datetime(2025, 11, 17, 9, 0, tzinfo=dt_timezone.utc))
+
+    def test_matches_day_by_day_walk(self):
+        rng = random.Random(3)
+        calculator = DateCalculator(BusinessCalendar())
+        starts, hours = [], []
+        for _ in range(2000):
+            starts.append(datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+                          + timedelta(days=rng.randint(0, 400), minutes=rng.choice([0, 15, 30]) + 60 * rng.randint(0, 23)))
+            hours.append(rng.choice([0, 0.5, 1, 2.5, 4, 7.75, 8, 9, 16, 40, 100]) * rng.choice([1, 1.25]))
+        expected = [loop_add_business_hours(s, h) for s, h in zip(starts, hours)]
+        self.assertEqual([calculator.add_business_hours(s, h) for s, h in zip(starts, hours)], expected)
+        self.assertEqual(calculator.add_business_hours_batch(starts, hours), expected)
+
+    def test_holidays_are_skipped(self):
+        calendar = BusinessCalendar(holidays=['2025-11-17'])  # The Monday after
+        friday_15 = datetime(2025, 11, 14, 15, 0, tzinfo=dt_timezone.utc)
+        tuesday_11 = datetime(2025, 11, 18, 11, 0, tzinfo=dt_timezone.utc)
+        self.assertEqual(calendar.add_business_hours(friday_15, 4), tuesday_11)
+        self.assertEqual(calendar.add_business_hours_batch([friday_15], [4]), [tuesday_11])
+        self.assertEqual(calendar.next_business_day(date(2025, 11, 14)), date(2025, 11, 18))
+
+
+class ExactSchedulerTests(TestCase):
+
+    def setUp(self):
+        rng = random.Random(9)
+        self.week_start = algorithms.get_ist_week_start()
+        self.project = Project.objects.create(name='P')
+        for i in range(6):
+            member = User.objects.create_user(username=f'm{i}', password='x')
+            self.project.members.add(member)
+            for _ in range(rng.randint(0, 6)):
+                start = self.week_start + timedelta(days=rng.randint(0, 4), minutes=rng.randint(7 * 60, 17 * 60))
+                AvailabilitySlot.objects.create(
+                    employee=member, start_time=start, end_time=start + timedelta(minutes=rng.randint(20, 300)))
+
+    def test_matches_ga_fitness_on_every_start_index(self):
+        for duration_hours in (0.5, 1, 2):
+            context = algorithms.SchedulerContext(self.project.id, int(duration_hours * 60))
+            expected = [algorithms.evaluate_meeting_time(context, [i])[0] for i in range(algorithms.WEEK_INCREMENTS)]
+            best_score = max(expected)
+
+            result = algorithms.run_exact_scheduler(self.project.id, duration_hours, top_k=3)
+
+            if best_score <= 0:
+                self.assertEqual(result['status'], 'error')
+                continue
+            best_index = expected.index(best_score)
+            self.assertEqual(result['best_slot']['fitness_score'], best_score)
+            self.assertEqual(result['best_slot']['start_time'],
+                             (self.week_start + timedelta(minutes=15 * best_index)).isoformat())
+            scores = [result['best_slot']['fitness_score']] + [s['fitness_score'] for s in result['alternatives']]
+            self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_is_deterministic(self):
+        first = algorithms.run_exact_scheduler(self.project.id, 1)
+        self.assertEqual(first, algorithms.run_exact_scheduler(self.project.id, 1))
+
+
+class SchedulerViewTests(APITestCase):
+
+    def setUp(self):
+        self.leader = User.objects.create_user(username='leader', password='x')
+        self.project = Project.objects.create(name='P', leader=self.leader)
+        self.project.members.add(self.leader)
+        self.client.force_authenticate(self.leader)
+
+    def run_scheduler(self, **data):
+        return self.client.post(f'/api/projects/{self.project.id}/run_scheduler/', data, format='json')
+
+    def test_rejects_non_finite_or_oversized_durations(self):
+        for solver in algorithms.SCHEDULER_SOLVERS:
+            for duration in ('nan', 'inf', '-inf', '1e300', '0', '-1', 'long'):
+                for background in (False, True):
+                    response = self.run_scheduler(solver=solver, duration_hours=duration, background=background)
+                    self.assertEqual(response.status_code, 400, (solver, duration, background))
+                    self.assertIn('duration_hours', response.data['error'])
+        self.assertFalse(Job.objects.exists())
+
+    def test_multi_week_horizon_rejects_them_too(self):
+        for duration in ('nan', 'inf', '1e300', str(algorithms.MAX_MEETING_HOURS + 0.25)):
+            for background in (False, True):
+                response = self.run_scheduler(duration_hours=duration, horizon_weeks=2, background=background)
+                self.assertEqual(response.status_code, 400, (duration, background))
+                self.assertIn('duration_hours', response.data['error'])
+        self.assertFalse(Job.objects.exists())
+
+        response = self.run_scheduler(duration_hours=algorithms.MAX_MEETING_HOURS,
+                                      horizon_weeks=algorithms.MAX_HORIZON_WEEKS)
+        self.assertNotEqual(response.status_code, 400)
+
+    def test_accepts_up_to_one_business_day(self):
+        response = self.run_scheduler(duration_hours=algorithms.MAX_MEETING_HOURS)
+        self.assertNotEqual(response.status_code, 400)
+        self.assertEqual(self.run_scheduler(duration_hours=algorithms.MAX_MEETING_HOURS + 0.25).status_code, 400)
+
+
+class SchedulerContextTests(TestCase):
+
+    def make_team(self, size, old_slots_each):
+        week_start = algorithms.get_ist_week_start()
+        project = Project.objects.create(name=f'team-{size}')
+        for i in range(size):
+            member = User.objects.create_user(username=f'{size}-{i}', password='x')
+            project.members.add(member)
+            AvailabilitySlot.objects.create(employee=member, start_time=week_start + timedelta(hours=9),
+                                            end_time=week_start + timedelta(hours=12))
+            AvailabilitySlot.objects.bulk_create(
+                AvailabilitySlot(employee=member, start_time=week_start - timedelta(weeks=w + 1),
+                                 end_time=week_start - timedelta(weeks=w + 1) + timedelta(hours=8))
+                for w in range(old_slots_each)
+            )
+        return project, week_start
+
+    def test_constant_query_count_and_window(self):
+        small, _ = self.make_team(2, 1)
+        large, week_start = self.make_team(20, 30)
+        with self.assertNumQueries(3):
+            algorithms.SchedulerContext(small.id, 60)
+        with self.assertNumQueries(3):
+            context = algorithms.SchedulerContext(large.id, 60)
+        self.assertEqual(len(context.availability_slots), 20)  # History stays in the database
+        start = week_start + timedelta(hours=10)
+        self.assertEqual(len(context.attendees(start, start + timedelta(hours=1))), 20)
+        self.assertEqual(context.attendees(start, start + timedelta(hours=3)), [])
+
+
+class GeneticSchedulerTests(TestCase):
+
+    def test_concurrent_runs_match_serial_runs(self):
+        rng = random.Random(4)
+        week_start = algorithms.get_ist_week_start()
+        contexts = []
+        for p in range(4):
+            project = Project.objects.create(name=f'P{p}')
+            for i in range(5):
+                member = User.objects.create_user(username=f'p{p}-m{i}', password='x')
+                project.members.add(member)
+                start = week_start + timedelta(days=rng.randint(0, 4), hours=rng.randint(9, 14))
+                AvailabilitySlot.objects.create(employee=member, start_time=start, end_time=start + timedelta(hours=3))
+            contexts.append(algorithms.SchedulerContext(project.id, 60))
+        individual_type = algorithms.creator.Individual
+
+        serial = [algorithms.GeneticScheduler(c, seed=c.project.id).run() for c in contexts]
+        jobs = contexts * 8
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            threaded = list(pool.map(lambda c: algorithms.GeneticScheduler(c, seed=c.project.id).run(), jobs))
+
+        self.assertEqual(threaded, serial * 8)
+        self.assertIs(algorithms.creator.Individual, individual_type)
+
+
+class SchedulerHorizonTests(TestCase):
+
+    def test_multi_week_horizon_skips_the_past_and_returns_alternatives(self):
+        IST = algorithms.get_ist_timezone()
+        wednesday_noon = datetime(2026, 10, 14, 12, 0, tzinfo=IST)
+        last_monday = datetime(2026, 10, 12, tzinfo=IST)
+        next_monday = last_monday + timedelta(weeks=1)
+        project = Project.objects.create(name='P')
+        a = User.objects.create_user(username='a', password='x')
+        b = User.objects.create_user(username='b', password='x')
+        project.members.add(a, b)
+        for member in (a, b):
+            for monday in (last_monday, next_monday):
+                AvailabilitySlot.objects.create(employee=member, start_time=monday + timedelta(hours=10),
+                                                end_time=monday + timedelta(hours=12))
+        AvailabilitySlot.objects.create(employee=a, start_time=next_monday + timedelta(days=1, hours=14),
+                                        end_time=next_monday + timedelta(days=1, hours=15))
+
+        with mock.patch('django.utils.timezone.now', return_value=wednesday_noon):
+            this_week = algorithms.run_exact_scheduler(project.id, 1, top_k=3)
+            result = algorithms.run_exact_scheduler(project.id, 1, top_k=3, horizon_weeks=2)
+
+        self.assertEqual(this_week['best_slot']['start_time'], (last_monday + timedelta(hours=10)).isoformat())
+        starts = [result['best_slot']['start_time']] + [s['start_time'] for s in result['alternatives']]
+        self.assertEqual(starts, [
+            (next_monday + timedelta(hours=10)).isoformat(),
+            (next_monday + timedelta(hours=11)).isoformat(),
+            (next_monday + timedelta(days=1, hours=14)).isoformat(),
+        ])
+        self.assertEqual([m['username'] for m in result['best_slot']['attendees']], ['a', 'b'])
+        self.assertEqual([m['username'] for m in result['alternatives'][1]['attendees']], ['a'])
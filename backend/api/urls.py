@@ -9,6 +9,7 @@ router = DefaultRouter()
 router.register(r'projects', views.ProjectViewSet, basename='project')
 router.register(r'tasks', views.TaskViewSet, basename='task')
 router.register(r'availability', views.AvailabilitySlotViewSet, basename='availability')
+router.register(r'jobs', views.JobViewSet, basename='job') # V5.0: background run status
 # Note: EmployeeProfile is handled by the UserDetailView, so we don't need a separate route for it yet.
 
 # The API URLs are now determined automatically by the router.
@@ -18,6 +19,15 @@ urlpatterns = [
     path('auth/login/', views.LoginView.as_view(), name='login'),
     path('auth/user/', views.UserDetailView.as_view(), name='user-detail'),
     path('auth/profile/', views.EmployeeProfileView.as_view(), name='user-profile'),
+
+    # --- V5.0: Admin-only cross-project batch assignment ---
+    path('assignment/batch/', views.BatchAssignmentView.as_view(), name='batch-assignment'),
+
+    # --- V5.0: Who has these skills? (skill index) ---
+    path('skills/search/', views.SkillSearchView.as_view(), name='skill-search'),
+
+    # --- V5.0: Per-endpoint latency / query percentiles (admin only) ---
+    path('instrumentation/summary/', views.InstrumentationSummaryView.as_view(), name='instrumentation-summary'),
     
     # --- New ViewSet URLs ---
     # This line includes all the URLs that the router automatically created.
@@ -1,4 +1,9 @@
-from datetime import datetime, time, timedelta
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
 from django.utils import timezone
 
 # --- Configuration ---
@@ -8,24 +13,167 @@ BUSINESS_END_HOUR = 17
 # Calculate the total number of business hours in a single day
 HOURS_PER_BUSINESS_DAY = BUSINESS_END_HOUR - BUSINESS_START_HOUR # This is 8 hours
 
+# --- V5.0 Closed-form business calendar ---
+# Non-working weekdays, as 'YYYY-MM-DD' strings (e.g. set BUSINESS_HOLIDAYS in settings.py).
+# Weekends are always skipped, so only weekday holidays need listing.
+BUSINESS_MICROSECONDS_PER_DAY = HOURS_PER_BUSINESS_DAY * 3600 * 1_000_000
+_BUSINESS_START_MICROSECONDS = BUSINESS_START_HOUR * 3600 * 1_000_000
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()  # Same epoch as numpy's datetime64
+_EPOCH_WEEKDAY_SHIFT = 3  # 1970-01-01 was a Thursday; shifting by 3 days puts Monday at 0
+
+
+class BusinessCalendar:
+    """
+    Maps datetimes to a "business ordinal" and back in O(1).
+
+    The ordinal counts business microseconds (9-to-5, Mon-Fri, minus holidays)
+    since an epoch Monday. Whole weeks are plain arithmetic (5 days per week),
+    and holidays are a sorted, precomputed table searched with bisect.
+    Adding business hours is then just ordinal addition.
+
+    All math is done on wall-clock time; the result keeps the tzinfo of the input.
+    """
+
+    def __init__(self, holidays=()):
+        # Precompute: business-day numbers of every weekday holiday, sorted.
+        table = sorted({
+            self._business_day_number(day)
+            for day in (date.fromisoformat(h) if isinstance(h, str) else h for h in holidays)
+            if day.weekday() < 5
+        })
+        self.holidays = np.array(table, dtype=np.int64)
+        # For the inverse mapping: holiday[i] - i is non-decreasing.
+        self._holiday_shift = self.holidays - np.arange(len(table), dtype=np.int64)
+        self._holiday_list = table
+        self._holiday_shift_list = self._holiday_shift.tolist()
+
+    # --- Day <-> business-day-number helpers ---
+
+    @staticmethod
+    def _business_day_number(day):
+        """Weekdays count 0, 1, 2, ...; a weekend maps to the following Monday."""
+        weeks, weekday = divmod(day.toordinal() - _EPOCH_ORDINAL + _EPOCH_WEEKDAY_SHIFT, 7)
+        return weeks * 5 + min(weekday, 5)
+
+    def _holidays_before(self, number):
+        """(how many holidays come before business day 'number', is 'number' itself a holiday)"""
+        before = bisect_left(self._holiday_list, number)
+        return before, before < len(self._holiday_list) and self._holiday_list[before] == number
+
+    def _day_from_business_index(self, index):
+        """Inverse of the holiday-adjusted business day index."""
+        number = index + bisect_right(self._holiday_shift_list, index)
+        weeks, weekday = divmod(number, 5)
+        return date.fromordinal(weeks * 7 + weekday - _EPOCH_WEEKDAY_SHIFT + _EPOCH_ORDINAL)
+
+    # --- Scalar API ---
+
+    def to_ordinal(self, dt):
+        """
+        Business ordinal of a (naive, wall-clock) datetime. Times outside
+        business hours snap forward: before 9:00 to 9:00, after 17:00 and
+        on weekends/holidays to 9:00 of the next business day.
+        """
+        day = dt.date()
+        number = self._business_day_number(day)
+        before, is_holiday = self._holidays_before(number)
+        index = number - before
+        if day.weekday() >= 5 or is_holiday:
+            return index * BUSINESS_MICROSECONDS_PER_DAY
+        since_midnight = ((dt.hour * 60 + dt.minute) * 60 + dt.second) * 1_000_000 + dt.microsecond
+        offset = min(max(since_midnight - _BUSINESS_START_MICROSECONDS, 0), BUSINESS_MICROSECONDS_PER_DAY)
+        return index * BUSINESS_MICROSECONDS_PER_DAY + offset
+
+    def from_ordinal(self, ordinal, at_day_end=False):
+        """
+        Naive wall-clock datetime of a business ordinal. An ordinal that falls
+        exactly between two days is 9:00 of the next day, or 17:00 of the
+        previous one when 'at_day_end' is set (a deadline ends the day).
+        """
+        index, offset = divmod(ordinal, BUSINESS_MICROSECONDS_PER_DAY)
+        if at_day_end and offset == 0:
+            index, offset = index - 1, BUSINESS_MICROSECONDS_PER_DAY
+        day = self._day_from_business_index(index)
+        return datetime.combine(day, time(BUSINESS_START_HOUR, 0)) + timedelta(microseconds=offset)
+
+    def next_business_day(self, day):
+        """The first business day strictly after 'day'."""
+        number = self._business_day_number(day + timedelta(days=1))
+        return self._day_from_business_index(number - self._holidays_before(number)[0])
+
+    def add_business_hours(self, start_dt, hours_to_add):
+        wall = start_dt.replace(tzinfo=None)
+        duration = max(round(hours_to_add * 3600 * 1_000_000), 0)
+        end = self.from_ordinal(self.to_ordinal(wall) + duration, at_day_end=duration > 0)
+        return end.replace(tzinfo=start_dt.tzinfo)
+
+    # --- Batch API ---
+
+    def add_business_hours_batch(self, start_dts, hours):
+        """
+        Vectorized add_business_hours: one deadline per (start, hours) pair,
+        computed with NumPy array arithmetic instead of a per-task loop.
+        """
+        if not len(start_dts):
+            return []
+        wall = np.array([dt.replace(tzinfo=None) for dt in start_dts], dtype='datetime64[us]')
+        duration = np.maximum(np.rint(np.asarray(hours, dtype=np.float64) * 3600 * 1_000_000), 0).astype(np.int64)
+
+        # Forward: datetime -> ordinal
+        days = wall.astype('datetime64[D]')
+        since_midnight = (wall - days).astype(np.int64)
+        weeks, weekday = np.divmod(days.astype(np.int64) + _EPOCH_WEEKDAY_SHIFT, 7)
+        number = weeks * 5 + np.minimum(weekday, 5)
+        before = np.searchsorted(self.holidays, number, side='left')
+        if len(self.holidays):
+            is_holiday = self.holidays[np.minimum(before, len(self.holidays) - 1)] == number
+        else:
+            is_holiday = np.zeros(len(number), dtype=bool)
+        business_day = (weekday < 5) & ~is_holiday
+        offset = np.where(
+            business_day,
+            np.clip(since_midnight - _BUSINESS_START_MICROSECONDS, 0, BUSINESS_MICROSECONDS_PER_DAY),
+            0,
+        )
+        ordinal = (number - before) * BUSINESS_MICROSECONDS_PER_DAY + offset + duration
+
+        # Inverse: ordinal -> datetime
+        index, offset = np.divmod(ordinal, BUSINESS_MICROSECONDS_PER_DAY)
+        at_day_end = (offset == 0) & (duration > 0)
+        index = index - at_day_end
+        offset = np.where(at_day_end, BUSINESS_MICROSECONDS_PER_DAY, offset)
+        number = index + np.searchsorted(self._holiday_shift, index, side='right')
+        weeks, weekday = np.divmod(number, 5)
+        end_days = (weeks * 7 + weekday - _EPOCH_WEEKDAY_SHIFT).astype('datetime64[D]')
+        end = end_days.astype('datetime64[us]') + (_BUSINESS_START_MICROSECONDS + offset).astype('timedelta64[us]')
+
+        return [e.replace(tzinfo=dt.tzinfo) for e, dt in zip(end.astype(object), start_dts)]
+
+
+@lru_cache(maxsize=1)
+def get_business_calendar():
+    """The shared calendar, built once from settings.BUSINESS_HOLIDAYS."""
+    return BusinessCalendar(getattr(settings, 'BUSINESS_HOLIDAYS', ()))
+
+
 class DateCalculator:
     """
     A utility class to handle business-aware date calculations.
     It knows about weekends and 9-to-5 business hours.
+
+    V5.0: A thin wrapper over BusinessCalendar, which does the work in
+    closed form instead of walking forward one day at a time.
     """
 
+    def __init__(self, calendar=None):
+        self.calendar = calendar or get_business_calendar()
+
     def get_next_business_day_start(self, dt):
         """
         Given a datetime, finds the 9:00 AM start of the next valid business day.
         If it's Friday, this will return 9:00 AM on Monday.
         """
-        # Move to the next day
-        next_day = dt.date() + timedelta(days=1)
-        
-        # Loop forward until we find a weekday (0=Mon, 1=Tue, ..., 6=Sun)
-        while next_day.weekday() >= 5: # 5=Saturday, 6=Sunday
-            next_day += timedelta(days=1)
-            
+        next_day = self.calendar.next_business_day(dt.date())
         # Return the 9:00 AM start of that business day, preserving timezone
         return datetime.combine(next_day, time(BUSINESS_START_HOUR, 0), tzinfo=dt.tzinfo)
 
@@ -34,45 +182,18 @@ class DateCalculator:
         The main "brain" function.
         Adds a number of business hours to a starting datetime.
         """
-        
-        # 0. Ensure we have a valid, timezone-aware start time
+        # Ensure we have a valid, timezone-aware start time
         if not timezone.is_aware(start_dt):
             # This is a fallback, but we should always use timezone-aware datetimes
             start_dt = timezone.make_aware(start_dt)
+        return self.calendar.add_business_hours(start_dt, hours_to_add)
 
-        current_dt = start_dt
-        remaining_hours = hours_to_add
-
-        # 1. Handle non-business start times
-        # If we start on a weekend, move to 9 AM next Monday
-        if current_dt.weekday() >= 5:
-            current_dt = self.get_next_business_day_start(current_dt)
-        # If we start after hours (e.g., 8 PM), move to 9 AM next business day
-        elif current_dt.time() >= time(BUSINESS_END_HOUR, 0):
-            current_dt = self.get_next_business_day_start(current_dt)
-        # If we start before hours (e.g., 7 AM), move to 9 AM this day
-        elif current_dt.time() < time(BUSINESS_START_HOUR, 0):
-            current_dt = current_dt.replace(hour=BUSINESS_START_HOUR, minute=0, second=0, microsecond=0)
-
-        # 2. Main loop: Add hours chunk by chunk
-        while remaining_hours > 0:
-            # How many hours are left in *this* business day?
-            # e.g., if it's 3:00 PM (15:00), and business ends at 5:00 PM (17:00),
-            # there are 2 hours left.
-            business_end_dt = current_dt.replace(hour=BUSINESS_END_HOUR, minute=0, second=0, microsecond=0)
-            hours_left_in_day = (business_end_dt - current_dt).total_seconds() / 3600.0
-
-            if hours_left_in_day >= remaining_hours:
-                # This is the easy case: We can fit all remaining hours in today.
-                current_dt += timedelta(hours=remaining_hours)
-                remaining_hours = 0
-            else:
-                # This is the "spill-over" case:
-                # We use up all remaining hours today and move to the next day.
-                remaining_hours -= hours_left_in_day
-                current_dt = self.get_next_business_day_start(current_dt)
-        
-        return current_dt
+    def add_business_hours_batch(self, start_dts, hours):
+        """
+        V5.0: Deadlines for a whole array of start times and durations at once.
+        """
+        start_dts = [dt if timezone.is_aware(dt) else timezone.make_aware(dt) for dt in start_dts]
+        return self.calendar.add_business_hours_batch(start_dts, hours)
 
 # --- Example Usage (You can delete this part, it's just for testing) ---
 if __name__ == "__main__":
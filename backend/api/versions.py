@@ -0,0 +1,43 @@
+# api/versions.py
+
+# --- V5.0 SHARED RESOURCE VERSIONS ---
+# The version stamps behind the ETags (etags.py), the dashboard cache keys
+# (dashboard_cache.py) and the scheduler cache keys (cache.py), kept in the
+# database (models.ResourceVersion) so the web server, the deadline cron and
+# daemon, the job workers and run_batch_assignment all see the same values.
+#
+# bump_versions() joins the caller's transaction: readers can't see the new
+# version before the rows it covers, and a rollback undoes both. Every bump
+# in one call gets the same, fresh SyncCounter value, so a version only ever
+# goes up and one bump is three queries however many resources it touches.
+
+from django.db import transaction
+
+from .models import ResourceVersion, SyncCounter
+
+
+def bump_versions(pairs):
+    """pairs: (kind, object_id) tuples. None ids are skipped."""
+    pairs = {(kind, object_id) for kind, object_id in pairs if object_id is not None}
+    if not pairs:
+        return
+    with transaction.atomic(savepoint=False):
+        version = SyncCounter.next_version()
+        ResourceVersion.objects.bulk_create(
+            [ResourceVersion(kind=kind, object_id=object_id, version=version) for kind, object_id in sorted(pairs)],
+            update_conflicts=True,
+            unique_fields=['kind', 'object_id'],
+            update_fields=['version'],
+        )
+
+
+def get_version(kind, object_id):
+    return get_versions(object_id, kind)[0]
+
+
+def get_versions(object_id, *kinds):
+    """The current version of 'object_id' for each of 'kinds' (one query)."""
+    found = dict(
+        ResourceVersion.objects.filter(kind__in=kinds, object_id=object_id).values_list('kind', 'version')
+    )
+    return [found.get(kind, 0) for kind in kinds]
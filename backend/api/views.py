@@ -1,20 +1,41 @@
 # api/views.py
 
+import math
+
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from django.utils import timezone # --- V2.0: Needed for deadline checks ---
+from django.db import transaction
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework import generics, permissions, status, viewsets
 from rest_framework.response import Response
+from rest_framework.serializers import ListSerializer
 from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.authtoken.models import Token
-from .models import Project, Task, AvailabilitySlot, EmployeeProfile
+from .models import Project, Task, AvailabilitySlot, EmployeeProfile, Job, SyncCounter
 from .serializers import (
     RegisterSerializer, UserSerializer, ProjectSerializer, 
-    TaskSerializer, AvailabilitySlotSerializer, EmployeeProfileSerializer,ProfileUpdateSerializer
+    TaskSerializer, AvailabilitySlotSerializer, EmployeeProfileSerializer,ProfileUpdateSerializer,
+    JobSerializer, SyncMemberSerializer, DashboardTaskSerializer
 )
-from . import algorithms
+from . import algorithms, jobs
+from .dashboard_cache import cached_project_data, counters as dashboard_cache_counters, dashboard_cache_settings
+from .etags import bump_etags, project_etag, user_etag
+from .fieldsets import SparseFieldsetViewMixin
+from .instrumentation import instrumentation_settings, rolling_summary
+from .skills import search_members
+from .sync import current_sync_version, project_changes
 from .utils import DateCalculator # --- V2.0: Import our new utility ---
+from .workload import record_bulk_task_changes
+
+def wants_background(request):
+    """V5.0: True if the client asked for a queued run ('background': true)."""
+    return str(request.data.get('background', '')).lower() in ('true', '1', 'yes')
+
 
 # --- Auth Views (No Changes) ---
 
@@ -46,25 +67,98 @@ class LoginView(APIView):
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
+# V5.0: If-None-Match -> 304 without serializing (see etags.py)
+@method_decorator(condition(etag_func=user_etag), name='get')
 class UserDetailView(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = UserSerializer
     def get_object(self):
         return self.request.user
 
+def with_member_counts(projects):
+    """
+    V5.0: annotates 'member_count' with a subquery. (A Count('members') would
+    reuse the join of user.projects and count only the requesting user.)
+    """
+    counts = (
+        Project.members.through.objects.filter(project=OuterRef('pk'))
+        .order_by().values('project').annotate(n=Count('pk')).values('n')
+    )
+    return projects.annotate(member_count=Coalesce(Subquery(counts), 0))
+
+
 # --- ProjectViewSet (Modified) ---
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows projects to be viewed or edited.
+    [V5.0] The list is cursor-paginated and lightweight: ?expand=members,tasks
+    adds the dashboard, ?fields= picks fields (see fieldsets.py).
     """
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return self.request.user.projects.all()
+        if self.action == 'changes':
+            return self.request.user.projects.all() # Reads only the changed rows itself
+        projects = self.trim_queryset(self.request.user.projects.all())
+        if self.wants_field('leader_username'):
+            projects = projects.select_related('leader')
+        if self.wants_field('member_count'):
+            projects = with_member_counts(projects)
+        # --- V5.0: Prefetch everything the Leader Dashboard reads ---
+        # (tasks with their assignee for 'assigned_to', members with their
+        # profile for 'strike_count') so ProjectSerializer never queries per row.
+        # Only what the response shows: the list leaves both out by default.
+        if self.wants_field('tasks'):
+            projects = projects.prefetch_related(Prefetch('tasks', queryset=Task.objects.select_related('assigned_to')))
+        elif self.wants_field('members'):
+            # The members' task lists only need the dashboard columns
+            dashboard_columns = ['project', 'assigned_to', *DashboardTaskSerializer.Meta.fields]
+            projects = projects.prefetch_related(Prefetch('tasks', queryset=Task.objects.only(*dashboard_columns)))
+        if self.wants_field('members'):
+            projects = projects.prefetch_related(Prefetch('members', queryset=User.objects.select_related('profile')))
+        return projects
     
+    # --- V5.0 DELTA SYNC ---
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['sync_version'] = getattr(self, 'sync_version', None)
+        return context
+
+    @method_decorator(condition(etag_func=project_etag)) # V5.0: 304 after one token query (see etags.py)
+    def retrieve(self, request, *args, **kwargs):
+        def serialize():
+            # The version goes out with the project, so it must be read BEFORE the rows
+            self.sync_version = current_sync_version()
+            return super(ProjectViewSet, self).retrieve(request, *args, **kwargs).data
+
+        # --- V5.0 DASHBOARD RESPONSE CACHE (see dashboard_cache.py) ---
+        # Only the full dashboard is cached. A hit skips get_object(), which is
+        # safe: entries are per viewer, and losing membership bumps the token.
+        pk = str(kwargs.get(self.lookup_field, ''))
+        if not pk.isdigit() or {'fields', 'expand'} & set(request.query_params):
+            return Response(serialize())
+        data, outcome = cached_project_data(int(pk), request.user.id, serialize)
+        response = Response(data)
+        if outcome is not None:
+            response['X-Dashboard-Cache'] = outcome
+        return response
+
+    @action(detail=True, methods=['get'])
+    def changes(self, request, pk=None):
+        """
+        GET ?since=<sync_version>: the tasks and members that changed since
+        that version, plus the ids of deleted tasks and removed members (see
+        sync.project_changes). "full": true means re-fetch the project.
+        """
+        since = request.query_params.get('since', '')
+        if not since.isdigit():
+            return Response({"error": "Give ?since=<sync_version>."}, status=status.HTTP_400_BAD_REQUEST)
+        project = self.get_object()
+        return Response(project_changes(project, int(since), TaskSerializer, SyncMemberSerializer))
+
     # --- V2.0 MODIFICATION ---
     # We now set the 'leader' on creation.
     def perform_create(self, serializer):
@@ -83,7 +177,31 @@ class ProjectViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def run_assignment(self, request, pk=None):
         project = self.get_object()
-        result = algorithms.run_weighted_task_assignment(project.id)
+
+        # --- V5.0: Selectable solver ('greedy' or 'optimal') ---
+        solver = request.data.get('solver', 'greedy')
+        if solver not in algorithms.ASSIGNMENT_SOLVERS:
+            return Response(
+                {"error": f"Invalid solver. Must be one of: {', '.join(algorithms.ASSIGNMENT_SOLVERS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        member_hour_cap = request.data.get('member_hour_cap')
+        if member_hour_cap is not None:
+            try:
+                member_hour_cap = float(member_hour_cap)
+                if not math.isfinite(member_hour_cap) or member_hour_cap < 0:
+                    raise ValueError()
+            except (TypeError, ValueError):
+                return Response(
+                    {"error": "Invalid member_hour_cap. Must be a non-negative number of hours."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        params = {'solver': solver, 'member_hour_cap': member_hour_cap}
+        if wants_background(request):
+            return self.submit_background_job(Job.KIND_ASSIGNMENT, project, params)
+
+        result = jobs.execute(Job.KIND_ASSIGNMENT, project.id, params)
         if result['status'] == 'error':
             return Response(result, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         return Response(result, status=status.HTTP_200_OK)
@@ -92,11 +210,61 @@ class ProjectViewSet(viewsets.ModelViewSet):
     def run_scheduler(self, request, pk=None):
         project = self.get_object()
         duration = request.data.get('duration_hours', 1) 
-        result = algorithms.run_genetic_scheduler(project.id, duration)
+
+        # --- V5.0: Exact bitmap sweep by default; the GA is still selectable ---
+        solver = request.data.get('solver', 'exact')
+        if solver not in algorithms.SCHEDULER_SOLVERS:
+            return Response(
+                {"error": f"Invalid solver. Must be one of: {', '.join(algorithms.SCHEDULER_SOLVERS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        horizon_weeks = request.data.get('horizon_weeks')
+        try:
+            duration = float(duration)
+            top_k = int(request.data.get('top_k', algorithms.DEFAULT_TOP_K))
+            if not math.isfinite(duration) or not 0 < duration <= algorithms.MAX_MEETING_HOURS or top_k < 1:
+                raise ValueError()
+            if horizon_weeks is not None:
+                horizon_weeks = int(horizon_weeks)
+                if not 1 <= horizon_weeks <= algorithms.MAX_HORIZON_WEEKS:
+                    raise ValueError()
+        except (TypeError, ValueError):
+            return Response(
+                {"error": (
+                    f"duration_hours must be a positive number up to {algorithms.MAX_MEETING_HOURS:g}, "
+                    f"top_k a positive integer and horizon_weeks between 1 and {algorithms.MAX_HORIZON_WEEKS}."
+                )},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        params = {'solver': solver, 'duration_hours': duration, 'top_k': top_k, 'horizon_weeks': horizon_weeks}
+        if wants_background(request):
+            return self.submit_background_job(Job.KIND_SCHEDULER, project, params)
+
+        result = jobs.execute(Job.KIND_SCHEDULER, project.id, params)
         if result['status'] == 'error':
             return Response(result, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         return Response(result, status=status.HTTP_200_OK)
 
+    # --- V5.0: Background jobs ---
+    def submit_background_job(self, kind, project, params):
+        """
+        Queues the run for 'manage.py run_job_worker' and answers 202 right
+        away; the client polls /api/jobs/<id>/ for the result.
+        """
+        try:
+            job = jobs.submit_job(kind, project, self.request.user, params)
+        except jobs.JobAlreadyActive as e:
+            return Response(
+                {"error": str(e), "job": JobSerializer(e.job).data},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(
+            JobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': f'/api/jobs/{job.id}/'}
+        )
+
     @action(detail=True, methods=['post'])
     def add_member(self, request, pk=None):
         project = self.get_object()
@@ -108,7 +276,9 @@ class ProjectViewSet(viewsets.ModelViewSet):
         except User.DoesNotExist:
             return Response({'error': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
         project.members.add(user_to_add)
-        serializer = self.get_serializer(project)
+        # V5.0: re-fetch so the response isn't built from the stale prefetch
+        self.sync_version = current_sync_version()
+        serializer = self.get_serializer(self.get_object())
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'])
@@ -126,20 +296,30 @@ class ProjectViewSet(viewsets.ModelViewSet):
         if project.members.count() == 1:
             return Response({'error': 'You cannot remove the last member of a project.'}, status=status.HTTP_400_BAD_REQUEST)
         project.members.remove(user_to_remove)
-        serializer = self.get_serializer(project)
+        # V5.0: re-fetch so the response isn't built from the stale prefetch
+        self.sync_version = current_sync_version()
+        serializer = self.get_serializer(self.get_object())
         return Response(serializer.data, status=status.HTTP_200_OK)
     
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows tasks to be viewed or edited.
+    [V5.0] Lists (and my_tasks) are cursor-paginated; ?fields= picks fields.
     """
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Task.objects.filter(project__members=self.request.user)
+        return self.select_fields(Task.objects.filter(project__members=self.request.user))
+
+    def select_fields(self, tasks):
+        # V5.0: only the requested columns, and the assignee in the same query (no N+1)
+        tasks = self.trim_queryset(tasks)
+        if self.wants_field('assigned_to'):
+            tasks = tasks.select_related('assigned_to')
+        return tasks
     
     # --- V2.0 NEW METHOD (Permission Check) ---
     def create(self, request, *args, **kwargs):
@@ -148,9 +328,13 @@ class TaskViewSet(viewsets.ModelViewSet):
         Only the Project Leader can create tasks.
         """
         # 1. Get the project ID from the incoming data
-        project_id = request.data.get('project')
-        if not project_id:
+        #    (V5.0: a list of tasks is accepted too, all for the same project)
+        rows = request.data if isinstance(request.data, list) else [request.data]
+        if not rows or not all(hasattr(row, 'get') and row.get('project') for row in rows):
             return Response({"error": "Project ID is required."}, status=status.HTTP_400_BAD_REQUEST)
+        if len({str(row.get('project')) for row in rows}) > 1:
+            return Response({"error": "All tasks in one request must belong to the same project."}, status=status.HTTP_400_BAD_REQUEST)
+        project_id = rows[0].get('project')
         
         # 2. Get the project object
         try:
@@ -166,8 +350,44 @@ class TaskViewSet(viewsets.ModelViewSet):
             )
         
         # 4. If the check passes, proceed with creation as normal
+        self.creating_for_project = project
         return super().create(request, *args, **kwargs)
 
+    def get_serializer(self, *args, **kwargs):
+        # V5.0: POSTing a list creates many tasks in one request
+        if isinstance(kwargs.get('data'), list):
+            kwargs['many'] = True
+        return super().get_serializer(*args, **kwargs)
+
+    def perform_create(self, serializer):
+        """
+        [V5.0] Lists are inserted with one bulk INSERT. If the project has
+        'auto_assign' on, the new tasks are assigned BEFORE they're inserted
+        (see algorithms.auto_assign_new_tasks), so there's no second write.
+        """
+        project = self.creating_for_project
+        many = isinstance(serializer, ListSerializer)
+        if not many and not project.auto_assign:
+            serializer.save()
+            return
+
+        rows = serializer.validated_data if many else [serializer.validated_data]
+        tasks = [Task(**row) for row in rows]
+        with transaction.atomic():
+            if project.auto_assign:
+                algorithms.auto_assign_new_tasks(project, tasks)
+            if many:
+                sync_version = SyncCounter.next_version() # bulk_create skips save()
+                for task in tasks:
+                    task.sync_version = sync_version
+                Task.objects.bulk_create(tasks)
+                # bulk_create sends no signals: add the new work to the ledger ourselves
+                record_bulk_task_changes(tasks, [None] * len(tasks))
+                bump_etags([project.id], (task.assigned_to_id for task in tasks))
+            else:
+                tasks[0].save()
+        serializer.instance = tasks if many else tasks[0]
+
     # --- V4.0 NEW METHOD (Permission Check) ---
     def destroy(self, request, *args, **kwargs):
         """
@@ -266,19 +486,135 @@ class TaskViewSet(viewsets.ModelViewSet):
 
     # --- (No changes to your @action: my_tasks) ---
     @action(detail=False, methods=['get'])
+    @method_decorator(condition(etag_func=user_etag)) # V5.0: 304 after one token query (see etags.py)
     def my_tasks(self, request):
         my_tasks = Task.objects.filter(assigned_to=request.user, status__in=['TODO', 'IN_PROGRESS'])
-        serializer = self.get_serializer(my_tasks, many=True)
-        return Response(serializer.data)
+        # V5.0: paginated like the other lists (see pagination.py)
+        page = self.paginate_queryset(self.select_fields(my_tasks))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+# --- V5.0: Cross-project batch assignment (admin only) ---
+class BatchAssignmentView(APIView):
+    """
+    POST {"project_ids": [..] (optional, default: all), "solver": "greedy"|"optimal",
+          "member_hour_cap": <hours> (optional)}
+    Runs algorithms.run_batch_task_assignment and returns its per-project report.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request, *args, **kwargs):
+        solver = request.data.get('solver', 'greedy')
+        if solver not in algorithms.ASSIGNMENT_SOLVERS:
+            return Response(
+                {"error": f"Invalid solver. Must be one of: {', '.join(algorithms.ASSIGNMENT_SOLVERS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        project_ids = request.data.get('project_ids')
+        member_hour_cap = request.data.get('member_hour_cap')
+        try:
+            if project_ids is not None:
+                project_ids = [int(project_id) for project_id in project_ids]
+            if member_hour_cap is not None:
+                member_hour_cap = float(member_hour_cap)
+                if not math.isfinite(member_hour_cap) or member_hour_cap < 0:
+                    raise ValueError()
+        except (TypeError, ValueError):
+            return Response(
+                {"error": "project_ids must be a list of ids and member_hour_cap a non-negative number."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        result = algorithms.run_batch_task_assignment(project_ids, solver=solver, member_hour_cap=member_hour_cap)
+        if result['status'] == 'error':
+            return Response(result, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response(result, status=status.HTTP_200_OK)
+
+
+# --- V5.0: Skill search ---
+class SkillSearchView(APIView):
+    """
+    GET ?skills=Python,Django&match=any|all&min_level=1&project=<id>
+    Members holding those skills (names are matched case-insensitively),
+    best match first, answered from the skill index. Only users who share a
+    project with the requester are searched; ?project= narrows it to one.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        skills = [name for name in request.query_params.get('skills', '').split(',') if name.strip()]
+        match = request.query_params.get('match', 'any')
+        if not skills or match not in ('any', 'all'):
+            return Response(
+                {"error": "Give ?skills=a,b and (optionally) match=any or match=all."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            min_level = float(request.query_params.get('min_level', 1))
+        except ValueError:
+            return Response({"error": "min_level must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+
+        projects = request.user.projects.all()
+        project_id = request.query_params.get('project')
+        if project_id is not None:
+            if not project_id.isdigit() or not projects.filter(id=project_id).exists():
+                return Response({"error": "Not a project you are a member of."}, status=status.HTTP_404_NOT_FOUND)
+            projects = projects.filter(id=project_id)
+        users = User.objects.filter(projects__in=projects).distinct()
+
+        return Response(search_members(skills, match=match, min_level=min_level, users=users))
+
+
+# --- V5.0: Request instrumentation summary (admin only) ---
+class InstrumentationSummaryView(APIView):
+    """
+    GET: p50/p95/p99/max of total time, DB time, query count and response size
+    per endpoint over the last SUMMARY_WINDOW requests this process served
+    (see instrumentation.py). Empty unless API_INSTRUMENTATION is enabled.
+    Also this process's dashboard cache hits / misses (see dashboard_cache.py).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        config = instrumentation_settings()
+        return Response({
+            "enabled": config['ENABLED'],
+            "window": config['SUMMARY_WINDOW'],
+            "endpoints": rolling_summary.summary(),
+            "dashboard_cache": {
+                "enabled": dashboard_cache_settings()['ENABLED'],
+                **dashboard_cache_counters.summary(),
+            },
+        })
+
+
+# --- V5.0: JobViewSet ---
+class JobViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Status and result of background assignment / scheduler runs,
+    for projects the user is a member of. Filter with ?project=<id>.
+    Newest first, cursor-paginated; ?fields= picks fields.
+    """
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = '-created_at'
+
+    def get_queryset(self):
+        queryset = self.trim_queryset(Job.objects.filter(project__members=self.request.user)).order_by('-created_at')
+        project_id = self.request.query_params.get('project')
+        if project_id is not None:
+            queryset = queryset.filter(project_id=project_id)
+        return queryset
 
 # --- AvailabilitySlotViewSet (No Changes) ---
-class AvailabilitySlotViewSet(viewsets.ModelViewSet):
+@method_decorator(condition(etag_func=user_etag), name='list') # V5.0 (see etags.py)
+class AvailabilitySlotViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = AvailabilitySlot.objects.all()
     serializer_class = AvailabilitySlotSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return AvailabilitySlot.objects.filter(employee=self.request.user)
+        return self.trim_queryset(AvailabilitySlot.objects.filter(employee=self.request.user))
 
     def perform_create(self, serializer):
         serializer.save(employee=self.request.user)
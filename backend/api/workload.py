@@ -0,0 +1,136 @@
+# api/workload.py
+
+# --- V5.0 SHARED WORKLOAD LEDGER ---
+# The "remaining workload" figure used by the algorithm and the dashboards:
+# estimated_hours * (1 - progress / 100), summed over a user's unfinished tasks.
+#
+# It is kept denormalised on EmployeeProfile.remaining_workload and updated
+# by DELTA whenever a task changes (signals.py for save()/delete(), and an
+# explicit apply_workload_deltas() call wherever tasks are bulk-written).
+# Reads are then a field lookup instead of a SUM over the task table.
+# aggregate_remaining_workloads() is the from-scratch SUM, kept as the source
+# of truth for 'manage.py rebuild_workload_ledger'.
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Sum, F, FloatField, Case, When, Value
+from django.db.models.functions import Coalesce
+
+from .etags import bump_user_etags
+from .models import EmployeeProfile, SyncCounter, Task
+
+# Ledger and SUM may differ by float rounding noise, never by more than this
+LEDGER_TOLERANCE = 1e-6
+
+
+def task_workload(assigned_to_id, estimated_hours, progress):
+    """One task's contribution to its assignee's remaining workload."""
+    if assigned_to_id is None or progress >= 100:
+        return 0.0
+    return float(estimated_hours) * (1.0 - progress / 100.0)
+
+
+def workload_snapshot(task):
+    """
+    (assigned_to_id, estimated_hours, progress) as currently held on 'task',
+    or None if any of them is deferred (reading it would cost a query).
+    """
+    values = task.__dict__
+    if 'assigned_to_id' not in values or 'estimated_hours' not in values or 'progress' not in values:
+        return None
+    return (values['assigned_to_id'], values['estimated_hours'], values['progress'])
+
+
+def snapshot_task(task):
+    """Record what 'task' currently contributes, so the next save can diff against it."""
+    task._workload_snapshot = workload_snapshot(task)
+
+
+def apply_workload_deltas(deltas):
+    """
+    Add {user_id: delta_hours} to the ledger in ONE UPDATE.
+    Uses F() so concurrent deltas for the same user add up instead of racing.
+    The profiles get a new sync version and new ETags (dashboards show the workload).
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if user_id is not None and delta}
+    if not deltas:
+        return 0
+
+    with transaction.atomic(savepoint=False):
+        bump_user_etags(deltas, with_projects=True)
+        return EmployeeProfile.objects.filter(user_id__in=deltas).update(
+            remaining_workload=F('remaining_workload') + Case(
+                *[When(user_id=user_id, then=Value(delta)) for user_id, delta in deltas.items()],
+                default=Value(0.0),
+                output_field=FloatField(),
+            ),
+            sync_version=SyncCounter.next_version(),
+        )
+
+
+def record_bulk_task_changes(tasks, old_snapshots):
+    """
+    Ledger upkeep for code that writes tasks with bulk_update() (which sends
+    no signals). 'old_snapshots' are the workload_snapshot()s taken before
+    the tasks were modified; the new values are read off 'tasks'.
+    """
+    deltas = defaultdict(float)
+    for task, old in zip(tasks, old_snapshots):
+        new = workload_snapshot(task)
+        if old is not None:
+            deltas[old[0]] -= task_workload(*old)
+        deltas[new[0]] += task_workload(*new)
+        task._workload_snapshot = new
+    return apply_workload_deltas(deltas)
+
+
+def get_remaining_workloads(user_ids):
+    """
+    {user_id: remaining_workload} for every id in 'user_ids', read from the
+    ledger in ONE query. Users with no profile (or no open tasks) get 0.0.
+    Callers that already hold the profiles should read
+    'profile.remaining_workload' directly instead.
+    """
+    user_ids = list(user_ids)
+    workloads = {user_id: 0.0 for user_id in user_ids}
+    if not user_ids:
+        return workloads
+
+    workloads.update(
+        EmployeeProfile.objects.filter(user_id__in=user_ids).values_list('user_id', 'remaining_workload')
+    )
+    return workloads
+
+
+def aggregate_remaining_workloads(user_ids=None):
+    """
+    The from-scratch figure: {user_id: remaining_workload} from ONE grouped
+    aggregate over the task table. With user_ids=None, covers every user
+    with open work.
+    """
+    tasks = Task.objects.filter(assigned_to__isnull=False, progress__lt=100) # Only count tasks that are not 100% done
+    if user_ids is None:
+        workloads = {}
+    else:
+        user_ids = list(user_ids)
+        workloads = {user_id: 0.0 for user_id in user_ids}
+        if not user_ids:
+            return workloads
+        tasks = tasks.filter(assigned_to__id__in=user_ids)
+
+    workload_data = tasks.values(
+        'assigned_to' # Group by user
+    ).annotate(
+        total_remaining_workload=Coalesce(
+            Sum(
+                # Remaining work for *each* task: hours * (1 - progress_percent)
+                F('estimated_hours') * (1.0 - F('progress') / 100.0),
+                output_field=FloatField()
+            ),
+            0.0 # Use Coalesce to turn NULL sums (no tasks) into 0.0
+        )
+    ).values_list('assigned_to', 'total_remaining_workload')
+
+    workloads.update(workload_data)
+    return workloads
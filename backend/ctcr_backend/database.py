@@ -0,0 +1,135 @@
+"""
+V5.0: SQLite connection profiles for ctcr_backend.settings.
+
+'development' (the default) keeps the old behaviour: rollback journal,
+one connection per request. 'production' (DB_PROFILE=production) switches to
+WAL, synchronous=NORMAL, a bigger page cache, memory-mapped reads and
+persistent connections. Every value can be overridden on its own:
+
+    DB_PROFILE             development | production
+    SQLITE_PATH            database file (default: <BASE_DIR>/db.sqlite3)
+    SQLITE_JOURNAL_MODE    e.g. WAL, DELETE            (production: WAL)
+    SQLITE_SYNCHRONOUS     OFF | NORMAL | FULL | EXTRA  (production: NORMAL)
+    SQLITE_BUSY_TIMEOUT    seconds a writer waits for the lock (default: 20)
+    SQLITE_CACHE_SIZE_MB   page cache per connection    (production: 64)
+    SQLITE_MMAP_SIZE_MB    memory-mapped I/O            (production: 256)
+    DB_CONN_MAX_AGE        seconds to keep a connection (production: 600)
+    SQLITE_READ_REPLICA    '' (off), 'same' (a read-only connection to the
+                           same file; with WAL, readers never block the
+                           writer), or the path of a replicated copy.
+
+With a read replica configured, api.middleware.ReadReplicaMiddleware sends
+the reads of GET/HEAD/OPTIONS requests to the READ_REPLICA_ALIAS connection
+(see api.db_router).
+"""
+
+from pathlib import Path
+
+READ_REPLICA_ALIAS = 'replica'
+
+PROFILES = {
+    'development': {
+        'journal_mode': None,       # SQLite's own default (DELETE)
+        'synchronous': None,        # SQLite's own default (FULL)
+        'busy_timeout': 20,
+        'cache_size_mb': None,
+        'mmap_size_mb': None,
+        'conn_max_age': 0,
+    },
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',    # Safe with WAL: a power loss can only drop the last commits
+        'busy_timeout': 20,
+        'cache_size_mb': 64,
+        'mmap_size_mb': 256,
+        'conn_max_age': 600,
+    },
+}
+
+JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+SYNCHRONOUS_MODES = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+
+
+def sqlite_config(environ):
+    """The effective profile: DB_PROFILE's defaults plus any per-setting overrides."""
+    profile = environ.get('DB_PROFILE', 'development').lower()
+    if profile not in PROFILES:
+        raise ValueError(f"DB_PROFILE must be one of: {', '.join(PROFILES)} (got '{profile}').")
+    config = dict(PROFILES[profile], profile=profile)
+
+    def override(key, env_name, cast):
+        value = environ.get(env_name, '').strip()
+        if value:
+            config[key] = cast(value)
+
+    override('journal_mode', 'SQLITE_JOURNAL_MODE', str.upper)
+    override('synchronous', 'SQLITE_SYNCHRONOUS', str.upper)
+    override('busy_timeout', 'SQLITE_BUSY_TIMEOUT', float)
+    override('cache_size_mb', 'SQLITE_CACHE_SIZE_MB', int)
+    override('mmap_size_mb', 'SQLITE_MMAP_SIZE_MB', int)
+    override('conn_max_age', 'DB_CONN_MAX_AGE', int)
+
+    if config['journal_mode'] is not None and config['journal_mode'] not in JOURNAL_MODES:
+        raise ValueError(f"SQLITE_JOURNAL_MODE must be one of: {', '.join(sorted(JOURNAL_MODES))}.")
+    if config['synchronous'] is not None and config['synchronous'] not in SYNCHRONOUS_MODES:
+        raise ValueError(f"SQLITE_SYNCHRONOUS must be one of: {', '.join(sorted(SYNCHRONOUS_MODES))}.")
+    return config
+
+
+def sqlite_pragmas(config, read_only=False):
+    """The PRAGMAs run on every new connection. Journal settings are the writer's business."""
+    pragmas = []
+    if not read_only:
+        if config['journal_mode']:
+            pragmas.append(f"PRAGMA journal_mode={config['journal_mode']}")
+        if config['synchronous']:
+            pragmas.append(f"PRAGMA synchronous={config['synchronous']}")
+    else:
+        pragmas.append("PRAGMA query_only=1")
+    if config['cache_size_mb']:
+        pragmas.append(f"PRAGMA cache_size=-{config['cache_size_mb'] * 1024}") # Negative = KiB
+    if config['mmap_size_mb']:
+        pragmas.append(f"PRAGMA mmap_size={config['mmap_size_mb'] * 1024 * 1024}")
+    return pragmas
+
+
+def sqlite_databases(base_dir, environ):
+    """DATABASES for settings.py, built from the environment."""
+    config = sqlite_config(environ)
+    path = environ.get('SQLITE_PATH') or str(Path(base_dir) / 'db.sqlite3')
+
+    databases = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': path,
+            'CONN_MAX_AGE': config['conn_max_age'],
+            'CONN_HEALTH_CHECKS': config['conn_max_age'] > 0,
+            # Background job workers write from several processes at once.
+            # IMMEDIATE takes the write lock at BEGIN (instead of failing with
+            # "database is locked" when a reader tries to upgrade), and 'timeout'
+            # is how long a writer waits for it.
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': config['busy_timeout'],
+                'init_command': ';'.join(sqlite_pragmas(config)),
+            },
+        }
+    }
+
+    replica = environ.get('SQLITE_READ_REPLICA', '').strip()
+    if replica:
+        replica_path = path if replica.lower() == 'same' else replica
+        databases[READ_REPLICA_ALIAS] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            # Opened read-only at the file level, not just by convention
+            'NAME': f'file:{Path(replica_path).resolve().as_posix()}?mode=ro',
+            'CONN_MAX_AGE': config['conn_max_age'],
+            'CONN_HEALTH_CHECKS': config['conn_max_age'] > 0,
+            'OPTIONS': {
+                'timeout': config['busy_timeout'],
+                'init_command': ';'.join(sqlite_pragmas(config, read_only=True)),
+            },
+            # Tests run against the one test database
+            'TEST': {'MIRROR': 'default'},
+        }
+    return databases
@@ -15,6 +15,8 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 
+from .database import sqlite_databases
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -47,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestInstrumentationMiddleware', # V5.0: Only active with API_INSTRUMENTATION=1
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -55,6 +58,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ReadReplicaMiddleware', # V5.0: Only active with SQLITE_READ_REPLICA
 ]
 
 ROOT_URLCONF = 'ctcr_backend.urls'
@@ -80,11 +84,69 @@ WSGI_APPLICATION = 'ctcr_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# V5.0: Built from the environment (see ctcr_backend/database.py).
+# DB_PROFILE=production turns on WAL, synchronous=NORMAL, a larger page
+# cache, mmap and persistent connections; SQLITE_READ_REPLICA adds a
+# read-only alias that GET requests read from.
+DATABASES = sqlite_databases(BASE_DIR, os.environ)
+
+DATABASE_ROUTERS = ['api.db_router.ReadReplicaRouter']
+
+
+# V5.0: Scheduler results are cached here (see api/cache.py). A local
+# in-memory cache needs no external service; point this at a shared backend
+# (file-based, Redis, ...) to share results and coalescing across processes.
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'teamsync',
+    },
+    # V5.0: Serialized project dashboards (see api/dashboard_cache.py), kept
+    # apart so big payloads don't evict the scheduler results. Their keys
+    # carry the project's ETag version from the database, so writes made by
+    # other processes invalidate them either way; DASHBOARD_CACHE_DIR just
+    # stores them as files, shared by every process on the machine.
+    'dashboards': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['DASHBOARD_CACHE_DIR'],
+    } if os.environ.get('DASHBOARD_CACHE_DIR') else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'teamsync-dashboards',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
+# V5.0: Project detail responses are cached per project and viewer until a
+# write changes them. DASHBOARD_CACHE=0 turns the cache off for debugging.
+DASHBOARD_CACHE = {
+    'ENABLED': os.environ.get('DASHBOARD_CACHE', '1').lower() not in ('0', 'false', 'no'),
+    'ALIAS': 'dashboards',
+    'TIMEOUT': 10 * 60,
+}
+
+
+# V5.0: Per-request query counts, DB time and algorithm phase timings
+# (see api/instrumentation.py). Off unless API_INSTRUMENTATION=1; when off
+# the middleware removes itself and the phase hooks are no-ops.
+API_INSTRUMENTATION = {
+    'ENABLED': os.environ.get('API_INSTRUMENTATION', '').lower() in ('1', 'true', 'yes'),
+    'SERVER_TIMING': True,   # Server-Timing response header
+    'LOG': True,             # One JSON line per request on the 'api.instrumentation' logger
+    'SUMMARY_WINDOW': 1000,  # Requests kept per endpoint for /api/instrumentation/summary/ (0 = off)
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'instrumentation': {'class': 'logging.StreamHandler', 'formatter': 'message'},
+    },
+    'loggers': {
+        'api.instrumentation': {'handlers': ['instrumentation'], 'level': 'INFO', 'propagate': False},
+    },
 }
 
 
@@ -145,5 +207,7 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    # V5.0: every list endpoint is cursor-paginated (see api/pagination.py)
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.ApiCursorPagination',
 }
\ No newline at end of file
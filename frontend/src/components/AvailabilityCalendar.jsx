@@ -9,6 +9,7 @@ import interactionPlugin from '@fullcalendar/interaction';
 import { Card } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
 import { Trash } from 'lucide-react';
+import { fetchAllPages } from '@/lib/pagination';
 
 export default function AvailabilityCalendar() {
     const [events, setEvents] = useState([]);
@@ -16,8 +17,8 @@ export default function AvailabilityCalendar() {
 
     const fetchAvailability = async () => {
         try {
-            const response = await api.get('/availability/');
-            const formattedEvents = response.data.map(slot => ({
+            const slots = await fetchAllPages(api, '/availability/');
+            const formattedEvents = slots.map(slot => ({
                 id: slot.id,
                 title: 'Available',
                 start: slot.start_time,
@@ -0,0 +1,17 @@
+// src/lib/pagination.js
+
+// --- V5.0 CURSOR PAGINATION ---
+// List endpoints return one page at a time: { next, previous, results }.
+// fetchAllPages follows the 'next' links (absolute URLs, which axios uses
+// as they are) and returns every row.
+
+export async function fetchAllPages(api, url, params = {}) {
+    const rows = [];
+    let response = await api.get(url, { params });
+    rows.push(...response.data.results);
+    while (response.data.next) {
+        response = await api.get(response.data.next);
+        rows.push(...response.data.results);
+    }
+    return rows;
+}
@@ -0,0 +1,34 @@
+// src/lib/projectSync.js
+
+// --- V5.0 DELTA SYNC ---
+// Merges a GET /projects/:id/changes/?since=<sync_version> response into the
+// project we already hold, instead of re-fetching the whole project.
+// Each member's task list is rebuilt from the merged task rows.
+
+const DASHBOARD_TASK_FIELDS = ['id', 'title', 'estimated_hours', 'progress', 'status', 'due_date'];
+
+const pick = (row, fields) => Object.fromEntries(fields.map(field => [field, row[field]]));
+
+export function applyProjectChanges(project, changes) {
+    const deletedTasks = new Set(changes.deleted_tasks);
+    const tasksById = new Map(project.tasks.map(task => [task.id, task]));
+    deletedTasks.forEach(taskId => tasksById.delete(taskId));
+    changes.tasks.forEach(task => tasksById.set(task.id, task));
+    const tasks = [...tasksById.values()].sort((a, b) => a.id - b.id);
+
+    const removedMembers = new Set(changes.removed_members);
+    const membersById = new Map(
+        project.members.filter(member => !removedMembers.has(member.id)).map(member => [member.id, member])
+    );
+    changes.members.forEach(member => membersById.set(member.id, { ...membersById.get(member.id), ...member }));
+
+    // 'assigned_to' on a task row is the assignee's username
+    const members = [...membersById.values()].map(member => ({
+        ...member,
+        tasks: tasks
+            .filter(task => task.assigned_to === member.username)
+            .map(task => pick(task, DASHBOARD_TASK_FIELDS)),
+    }));
+
+    return { ...project, tasks, members, sync_version: changes.version };
+}
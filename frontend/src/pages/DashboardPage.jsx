@@ -5,6 +5,7 @@ import { useAuth } from '../context/AuthContext';
 import { Link } from 'react-router-dom';
 import { toast } from 'sonner';
 import { motion } from 'framer-motion';
+import { fetchAllPages } from '@/lib/pagination';
 
 // UI Components
 import { Card, CardHeader, CardTitle, CardContent } from '@/components/ui/card';
@@ -78,12 +79,11 @@ export default function DashboardPage() {
                 await refreshUser();
 
                 // 2. Fetch "My Tasks"
-                const tasksRes = await api.get('/tasks/my_tasks/');
-                setMyTasks(tasksRes.data);
+                setMyTasks(await fetchAllPages(api, '/tasks/my_tasks/'));
 
-                // 3. Fetch Projects count
-                const projectsRes = await api.get('/projects/');
-                setProjectsCount(projectsRes.data.length);
+                // 3. Fetch Projects count (V5.0: ids only, the list is paginated)
+                const projects = await fetchAllPages(api, '/projects/', { fields: 'id' });
+                setProjectsCount(projects.length);
 
             } catch (err) {
                 console.error("Failed to load dashboard", err);
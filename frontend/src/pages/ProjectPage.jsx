@@ -1,6 +1,6 @@
 // src/pages/ProjectPage.jsx
 
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useAuth } from '../context/AuthContext';
 import { useParams, Link } from 'react-router-dom';
 import { toast } from "sonner"; 
@@ -18,6 +18,7 @@ import { Label } from '@/components/ui/label';
 // Custom Components
 import AddTaskSheet from '@/components/AddTaskSheet';
 import AvailabilityCalendar from '@/components/AvailabilityCalendar';
+import { applyProjectChanges } from '@/lib/projectSync';
 
 // Icons
 import { Users, FileText, Clock, Brain, Trash2, CalendarCheck } from 'lucide-react';
@@ -80,10 +81,14 @@ export default function ProjectPage() {
     const { api, user: loggedInUser } = useAuth();
     const { id } = useParams();
 
+    // V5.0: The version our copy of the project is at (see syncProject)
+    const syncVersion = useRef(null);
+
     const fetchProject = async () => {
         setError(null);
         try {
             const response = await api.get(`/projects/${id}/`);
+            syncVersion.current = response.data.sync_version;
             setProject(response.data);
         } catch (err) {
             setError('Failed to fetch project details.');
@@ -92,13 +97,27 @@ export default function ProjectPage() {
         }
     };
 
+    // V5.0: After a change, fetch only what changed since our version
+    // (falls back to a full fetch if the server says we're too far behind).
+    const syncProject = async () => {
+        if (syncVersion.current == null) return fetchProject();
+        try {
+            const { data } = await api.get(`/projects/${id}/changes/`, { params: { since: syncVersion.current } });
+            if (data.full) return fetchProject();
+            syncVersion.current = data.version;
+            setProject(prev => applyProjectChanges(prev, data));
+        } catch (err) {
+            fetchProject();
+        }
+    };
+
     const handleRunAssignment = async () => {
         const toastId = toast.loading("Running algorithm...");
         try {
             const response = await api.post(`/projects/${id}/run_assignment/`);
             const messages = response.data.message.split('\n');
             toast.success("Assignment complete!", { id: toastId });
-            fetchProject(); 
+            syncProject(); 
         } catch (err) {
             toast.error("Algorithm failed.", { id: toastId });
         }
@@ -236,7 +255,7 @@ export default function ProjectPage() {
                     <TabsContent value="dashboard" className="mt-6">
                         <div className="flex justify-end mb-4">
                             {isProjectLeader && (
-                                <AddMemberDialog projectId={project.id} onMemberAdded={fetchProject} />
+                                <AddMemberDialog projectId={project.id} onMemberAdded={syncProject} />
                             )}
                         </div>
                         
@@ -262,7 +281,7 @@ export default function ProjectPage() {
                                                 <RemoveMemberButton
                                                     projectId={project.id}
                                                     username={member.username}
-                                                    onMemberRemoved={fetchProject}
+                                                    onMemberRemoved={syncProject}
                                                 />
                                             )}
                                         </div>
@@ -312,7 +331,7 @@ export default function ProjectPage() {
                         <div className="flex justify-between items-center mb-4">
                             <h3 className="text-lg font-semibold text-slate-900">Task Backlog</h3>
                             {isProjectLeader && (
-                                <AddTaskSheet projectId={project.id} onTaskCreated={fetchProject} />
+                                <AddTaskSheet projectId={project.id} onTaskCreated={syncProject} />
                             )}
                         </div>
                         <Card className="bg-white border-slate-200 shadow-sm overflow-hidden">
@@ -339,7 +358,7 @@ export default function ProjectPage() {
                                             <TableCell className="text-slate-600">{formatDate(task.due_date)}</TableCell>
                                             <TableCell className="text-slate-600">{task.estimated_hours}h</TableCell>
                                             {isProjectLeader && (
-                                                <TableCell className="text-right"><DeleteTaskButton taskId={task.id} onTaskDeleted={fetchProject} /></TableCell>
+                                                <TableCell className="text-right"><DeleteTaskButton taskId={task.id} onTaskDeleted={syncProject} /></TableCell>
                                             )}
                                         </TableRow>
                                     )) : (
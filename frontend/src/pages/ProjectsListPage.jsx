@@ -5,6 +5,7 @@ import { useAuth } from '../context/AuthContext';
 import { Link } from 'react-router-dom';
 import { toast } from 'sonner';
 import { motion } from 'framer-motion';
+import { fetchAllPages } from '@/lib/pagination';
 
 // UI Components
 import { Button } from '@/components/ui/button';
@@ -30,8 +31,7 @@ export default function ProjectsListPage() {
 
     const fetchProjects = async () => {
         try {
-            const response = await api.get('/projects/');
-            setProjects(response.data);
+            setProjects(await fetchAllPages(api, '/projects/'));
         } catch (err) {
             toast.error('Failed to load projects.');
         } finally {
@@ -184,7 +184,7 @@ export default function ProjectsListPage() {
                                                     <div className="flex items-center justify-between pt-4 border-t border-slate-100 mt-auto">
                                                         <div className="flex items-center gap-2 text-xs text-slate-500 font-medium">
                                                             <Users className="w-3.5 h-3.5" /> 
-                                                            {project.members?.length || 0} Members
+                                                            {project.member_count || 0} Members
                                                         </div>
                                                         <div className="text-slate-400 group-hover:text-slate-900 text-sm font-medium flex items-center gap-1 transition-colors">
                                                             Enter <ArrowRight className="w-3 h-3 group-hover:translate-x-1 transition-transform" />